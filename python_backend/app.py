@@ -1,19 +1,38 @@
 import os
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, send_file
 from flask_cors import CORS
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, jwt_required
 from datetime import timedelta
+from werkzeug.datastructures import FileStorage
 import google.generativeai as genai
 from dotenv import load_dotenv
 import logging
+import json
+import sys
+import shutil
+import tempfile
+import threading
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # Import our modules
 from services.auth_service import AuthService
 from services.resume_parser import ResumeParser
 from services.ml_analyzer import MLAnalyzer
 from services.gemini_service import GeminiService
-from services.data_visualizer import DataVisualizer
+from services.gemini_cache import GeminiResponseCache
+from services.data_visualizer import DataVisualizer, CHARTS, CHART_FORMATS
+from services.render_service import RenderService, IMAGE_FORMATS
+from services.asset_store import AssetStore
+from services.analysis_pipeline import AnalysisPipeline, analysis_version, calculate_overall_score
+from services.analysis_cache import AnalysisCache
+from services.analysis_store import AnalysisStore, InvalidCursor
+from services.job_queue import JobQueue
+from services.batch_analyzer import BatchAnalyzer
 
 # Load environment variables
 load_dotenv()
@@ -39,8 +58,75 @@ jwt = JWTManager(app)
 auth_service = AuthService(mongo.db)
 resume_parser = ResumeParser()
 ml_analyzer = MLAnalyzer()
-gemini_service = GeminiService(os.getenv('GEMINI_API_KEY'))
-data_visualizer = DataVisualizer()
+gemini_cache = GeminiResponseCache(
+    max_entries=int(os.getenv('GEMINI_CACHE_SIZE', '512')),
+    cache_dir=os.getenv('GEMINI_CACHE_DIR', 'cache/gemini'),
+    collection=mongo.db.gemini_responses if os.getenv('GEMINI_CACHE_BACKEND', 'mongo') == 'mongo' else None,
+    ttl_days=float(os.getenv('GEMINI_CACHE_TTL_DAYS', '7'))
+)
+gemini_service = GeminiService(os.getenv('GEMINI_API_KEY'), response_cache=gemini_cache)
+render_service = RenderService(
+    workers=int(os.getenv('RENDER_WORKERS', '2')),
+    timeout=float(os.getenv('RENDER_TIMEOUT', '20'))
+)
+asset_store = AssetStore(
+    root=os.getenv('VISUALIZATION_ASSET_DIR', 'static/visualizations'),
+    retention_days=float(os.getenv('VISUALIZATION_ASSET_RETENTION_DAYS', '30'))
+)
+data_visualizer = DataVisualizer(
+    initial_charts=[name.strip() for name in os.getenv('VISUALIZATION_INITIAL_CHARTS', '').split(',') if name.strip()],
+    cache_size=int(os.getenv('VISUALIZATION_CACHE_SIZE', '256')),
+    render_service=render_service,
+    image_format=os.getenv('VISUALIZATION_IMAGE_FORMAT', 'png'),
+    asset_store=asset_store,
+    chart_format=os.getenv('VISUALIZATION_CHART_FORMAT', 'plotly')
+)
+analysis_cache = AnalysisCache(
+    mongo.db.analysis_cache,
+    version=analysis_version(resume_parser, gemini_service),
+    max_entries=int(os.getenv('ANALYSIS_CACHE_SIZE', '256')),
+    ttl_days=float(os.getenv('ANALYSIS_CACHE_TTL_DAYS', '30'))
+)
+analysis_store = AnalysisStore(
+    mongo.db.resume_analyses,
+    details_collection=mongo.db.resume_analysis_details,
+    raw_text_collection=mongo.db.resume_raw_texts,
+    split_writes=os.getenv('ANALYSIS_STORAGE', 'split') == 'split',
+    codec=os.getenv('ANALYSIS_TEXT_CODEC', 'zstd'),
+    default_page_size=int(os.getenv('HISTORY_PAGE_SIZE', '20')),
+    max_page_size=int(os.getenv('HISTORY_MAX_PAGE_SIZE', '100'))
+)
+analysis_pipeline = AnalysisPipeline(resume_parser, ml_analyzer, gemini_service, mongo.db, cache=analysis_cache,
+                                     store=analysis_store)
+job_queue = JobQueue()
+batch_analyzer = BatchAnalyzer(
+    workers=int(os.getenv('BATCH_WORKERS', '0')) or None,
+    store=analysis_store,
+    gemini_service=gemini_service,
+    ml_analyzer=ml_analyzer
+)
+
+def ensure_indexes():
+    """Create the MongoDB indexes the app's queries rely on; safe to run on every start"""
+    gemini_cache.ensure_indexes()
+    analysis_cache.ensure_indexes()
+    analysis_store.ensure_indexes()
+
+# Render workers are started by a forkserver (or spawned) process that imports the main module
+# (this app, or start.py importing it) as __mp_main__; only the serving process starts workers
+# and background threads, so the process workers fork from stays single-threaded
+if '__mp_main__' not in sys.modules:
+    render_service.start()
+    asset_store.start_garbage_collector(int(os.getenv('VISUALIZATION_ASSET_GC_INTERVAL', '3600')))
+    ensure_indexes()
+    
+    # Index resumes stored since the last corpus sync without blocking startup, then keep
+    # compacting the corpus off the request threads
+    threading.Thread(
+        target=lambda: ml_analyzer.corpus.run_sync(analysis_store),
+        name='corpus-sync',
+        daemon=True
+    ).start()
 
 # Configure Google Gemini
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
@@ -67,6 +153,11 @@ def health_check():
             'gemini_api': 'configured' if GEMINI_API_KEY else 'not configured',
             'ml_models': 'ready'
         },
+        'analysis_cache': analysis_cache.stats(),
+        'gemini_cache': gemini_cache.stats(),
+        'gemini_circuit': gemini_service.breaker.stats(),
+        'chart_cache': data_visualizer.stats(),
+        'render_service': render_service.stats(),
         'features': [
             'Resume Parsing',
             'ML Analysis',
@@ -203,6 +294,21 @@ def get_profile():
             'error': str(e)
         }), 500
 
+def spooled_upload(file):
+    """Copy an upload so it outlives the request, in chunks, spilling to disk like the parser does"""
+    os.makedirs(resume_parser.spool_dir, exist_ok=True)
+    spool = tempfile.SpooledTemporaryFile(max_size=resume_parser.memory_limit_bytes, dir=resume_parser.spool_dir)
+    shutil.copyfileobj(file.stream, spool, 64 * 1024)
+    spool.seek(0)
+    return FileStorage(stream=spool, filename=file.filename, content_type=file.content_type)
+
+def analyze_spooled_upload(upload, user_id, on_stage=None):
+    """Background job: analyze a spooled upload, then delete the copy"""
+    try:
+        return analysis_pipeline.run(upload, user_id, on_stage)
+    finally:
+        upload.close()
+
 # Resume Analysis Routes (Protected)
 @app.route('/api/resume/upload', methods=['POST'])
 @jwt_required()
@@ -224,40 +330,33 @@ def upload_resume():
                 'message': 'No file selected'
             }), 400
         
-        # Parse resume
-        logger.info(f"Parsing resume for user: {user_id}")
-        parsed_data = resume_parser.parse_resume(file)
-        
-        if not parsed_data['success']:
-            return jsonify(parsed_data), 400
-        
-        # Perform ML analysis
-        logger.info("Performing ML analysis")
-        ml_analysis = ml_analyzer.analyze_resume(parsed_data['data'])
-        
-        # Get Gemini AI analysis
-        logger.info("Getting Gemini AI analysis")
-        gemini_analysis = gemini_service.analyze_resume(parsed_data['data'])
-        
-        # Create comprehensive analysis
-        comprehensive_analysis = {
-            'user_id': user_id,
-            'parsed_data': parsed_data['data'],
-            'ml_analysis': ml_analysis,
-            'gemini_analysis': gemini_analysis,
-            'overall_score': calculate_overall_score(ml_analysis, gemini_analysis),
-            'timestamp': str(datetime.utcnow())
-        }
+        # Job mode: return a job id right away and analyze in the background
+        if request.args.get('mode') == 'async' or request.form.get('async') == 'true':
+            upload = spooled_upload(file)
+            job_id = job_queue.enqueue(user_id, AnalysisPipeline.STAGES, analyze_spooled_upload, upload, user_id)
+            
+            return jsonify({
+                'success': True,
+                'message': 'Resume analysis queued',
+                'data': {
+                    'job_id': job_id,
+                    'status_url': f'/api/resume/jobs/{job_id}'
+                }
+            }), 202
+        
+        result = analysis_pipeline.run(file, user_id)
         
-        # Save to database
-        analysis_id = mongo.db.resume_analyses.insert_one(comprehensive_analysis).inserted_id
+        if not result['success']:
+            return jsonify(result), 400
         
         return jsonify({
             'success': True,
             'message': 'Resume analyzed successfully',
             'data': {
-                'analysis_id': str(analysis_id),
-                'analysis': comprehensive_analysis
+                'analysis_id': result['analysis_id'],
+                'analysis': result['analysis'],
+                'cached': result['analysis']['cached'],
+                'recomputed_sections': result['analysis'].get('recomputed_sections')
             }
         })
         
@@ -269,6 +368,137 @@ def upload_resume():
             'error': str(e)
         }), 500
 
+@app.route('/api/resume/upload/stream', methods=['POST'])
+@jwt_required()
+def upload_resume_stream():
+    """Upload and analyze resume, streaming results as server-sent events"""
+    try:
+        user_id = get_jwt_identity()
+        
+        if 'file' not in request.files:
+            return jsonify({
+                'success': False,
+                'message': 'No file uploaded'
+            }), 400
+        
+        file = request.files['file']
+        if file.filename == '':
+            return jsonify({
+                'success': False,
+                'message': 'No file selected'
+            }), 400
+        
+        # Copy the upload before streaming; the request body is gone once the response starts
+        upload = spooled_upload(file)
+        
+        def generate():
+            try:
+                for event, data in analysis_pipeline.stream(upload, user_id):
+                    if event == 'complete':
+                        data = {'analysis_id': data['analysis_id'], 'analysis': data['analysis']}
+                    yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            except Exception as e:
+                logger.error(f"Resume stream error: {str(e)}")
+                yield f"event: error\ndata: {json.dumps({'success': False, 'error': str(e)})}\n\n"
+            finally:
+                upload.close()
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
+    except Exception as e:
+        logger.error(f"Resume stream upload error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Resume analysis failed',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/resume/batch', methods=['POST'])
+@jwt_required()
+def upload_resume_batch():
+    """Analyze many resumes (files and/or zip archives), streaming NDJSON results"""
+    try:
+        user_id = get_jwt_identity()
+        
+        files = [file for file in request.files.getlist('files') if file.filename]
+        if not files:
+            return jsonify({
+                'success': False,
+                'message': 'No files uploaded'
+            }), 400
+        
+        # Spool everything before streaming; the request body is gone once the response starts.
+        # The batch reads the spooled copies one at a time, so they never all sit in memory.
+        uploads = [(file.filename, spooled_upload(file)) for file in files]
+        with_gemini = request.args.get('gemini') == 'true' or request.form.get('gemini') == 'true'
+        logger.info(f"Batch analysis of {len(uploads)} uploads for user: {user_id}")
+        
+        def generate():
+            try:
+                for result in batch_analyzer.analyze(uploads, user_id, with_gemini=with_gemini):
+                    yield json.dumps(result, default=str) + '\n'
+            finally:
+                for _, upload in uploads:
+                    upload.close()
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+    except Exception as e:
+        logger.error(f"Batch upload error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Batch analysis failed',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/resume/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job_status(job_id):
+    """Get stage-by-stage status and partial results of a queued analysis"""
+    try:
+        user_id = get_jwt_identity()
+        job = job_queue.get(job_id, user_id)
+        
+        if not job:
+            return jsonify({
+                'success': False,
+                'message': 'Job not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'job': job
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Job status error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get job status',
+            'error': str(e)
+        }), 500
+
+def api_response(payload, status=200):
+    """JSON response, or msgpack when the client sends Accept: application/msgpack"""
+    if msgpack is not None and \
+            request.accept_mimetypes.best_match(['application/json', 'application/msgpack']) == 'application/msgpack':
+        return Response(msgpack.packb(payload, default=str, use_bin_type=True), status=status,
+                        mimetype='application/msgpack')
+    response = jsonify(payload)
+    response.status_code = status
+    return response
+
+def requested_chart_format():
+    """?format=compact or ?format=plotly; None uses the configured default"""
+    chart_format = request.args.get('format')
+    return chart_format if chart_format in CHART_FORMATS else None
+
 @app.route('/api/resume/analyze/<analysis_id>', methods=['GET'])
 @jwt_required()
 def get_analysis(analysis_id):
@@ -276,11 +506,8 @@ def get_analysis(analysis_id):
     try:
         user_id = get_jwt_identity()
         
-        from bson import ObjectId
-        analysis = mongo.db.resume_analyses.find_one({
-            '_id': ObjectId(analysis_id),
-            'user_id': user_id
-        })
+        # Raw resume text is stored separately and only loaded with ?include=raw_text
+        analysis = analysis_store.load(analysis_id, user_id, include_raw_text=request.args.get('include') == 'raw_text')
         
         if not analysis:
             return jsonify({
@@ -288,14 +515,25 @@ def get_analysis(analysis_id):
                 'message': 'Analysis not found'
             }), 404
         
-        # Generate visualizations
-        visualizations = data_visualizer.create_resume_visualizations(analysis)
+        # Render only the charts the first view shows; ?charts=a,b or ?charts=all picks others
+        requested = request.args.get('charts')
+        if requested == 'all':
+            charts = list(CHARTS)
+        elif requested is not None:
+            charts = [name for name in requested.split(',') if name in CHARTS]
+        else:
+            charts = data_visualizer.initial_charts
+        visualizations = data_visualizer.create_resume_visualizations(analysis, charts, requested_chart_format())
         
-        return jsonify({
+        return api_response({
             'success': True,
             'data': {
                 'analysis': analysis,
-                'visualizations': visualizations
+                'visualizations': visualizations,
+                'charts': {
+                    name: f'/api/resume/analyze/{analysis_id}/charts/{name}'
+                    for name in CHARTS if name not in visualizations
+                }
             }
         })
         
@@ -307,50 +545,218 @@ def get_analysis(analysis_id):
             'error': str(e)
         }), 500
 
-@app.route('/api/resume/history', methods=['GET'])
+@app.route('/api/resume/analyze/<analysis_id>/charts/<chart_name>', methods=['GET'])
 @jwt_required()
-def get_resume_history():
-    """Get user's resume analysis history"""
+def get_analysis_chart(analysis_id, chart_name):
+    """Get one visualization of a resume analysis"""
     try:
         user_id = get_jwt_identity()
         
-        analyses = list(mongo.db.resume_analyses.find(
-            {'user_id': user_id},
-            {'_id': 1, 'overall_score': 1, 'timestamp': 1}
-        ).sort('timestamp', -1))
+        if chart_name not in CHARTS:
+            return jsonify({
+                'success': False,
+                'message': f'Unknown chart: {chart_name}',
+                'charts': list(CHARTS)
+            }), 404
+        
+        # A cached render only needs the ownership check; otherwise load just the fields the chart reads
+        chart_format = requested_chart_format()
+        chart = data_visualizer.cached_chart(analysis_id, chart_name, chart_format)
+        fields = ['_id'] if chart is not None else data_visualizer.chart_fields(chart_name)
+        analysis = analysis_store.load(analysis_id, user_id, fields)
+        
+        if not analysis:
+            return jsonify({
+                'success': False,
+                'message': 'Analysis not found'
+            }), 404
+        
+        if chart is None:
+            chart = data_visualizer.create_chart(chart_name, analysis, analysis_id, check_cache=False,
+                                                 chart_format=chart_format)
+        
+        return api_response({
+            'success': True,
+            'data': {
+                'chart': chart_name,
+                'visualization': chart
+            }
+        })
+        
+    except Exception as e:
+        logger.error(f"Get analysis chart error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get chart',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/visualizations/layouts', methods=['GET'])
+def get_chart_layouts():
+    """Shared Plotly template and per-chart layouts for compact charts, keyed by layout_version"""
+    try:
+        layouts = data_visualizer.chart_layouts()
+        response = api_response({'success': True, 'data': layouts})
+        response.set_etag(layouts['version'])
+        response.cache_control.public = True
+        response.cache_control.max_age = 3600
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        logger.error(f"Chart layouts error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get chart layouts',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/visualizations/<asset_name>', methods=['GET'])
+def get_visualization_asset(asset_name):
+    """Serve a rendered chart image; names are content hashes, so responses never change"""
+    try:
+        path = asset_store.path(asset_name)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Asset not found'}), 404
+    
+    if not os.path.exists(path):
+        return jsonify({'success': False, 'message': 'Asset not found'}), 404
+    
+    # conditional=True answers If-None-Match / If-Modified-Since with 304 Not Modified
+    response = send_file(
+        os.path.abspath(path),
+        mimetype=IMAGE_FORMATS[asset_name.rsplit('.', 1)[1]],
+        conditional=True,
+        etag=asset_name.split('.')[0],
+        max_age=31536000
+    )
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/api/resume/similar/<analysis_id>', methods=['GET'])
+@jwt_required()
+def get_similar_resumes(analysis_id):
+    """Find the user's stored resumes most similar to one analysis"""
+    try:
+        user_id = get_jwt_identity()
+        k = min(int(request.args.get('k', 5)), 50)
+        
+        analysis = analysis_store.load(analysis_id, user_id, ['parsed_data.raw_text'])
+        
+        if not analysis:
+            return jsonify({
+                'success': False,
+                'message': 'Analysis not found'
+            }), 404
+        
+        similar = ml_analyzer.find_similar_resumes(
+            analysis['parsed_data'].get('raw_text', ''),
+            k=k,
+            user_id=user_id,
+            exclude_id=analysis_id
+        )
         
         return jsonify({
             'success': True,
             'data': {
-                'analyses': analyses,
-                'count': len(analyses)
+                'similar': similar
             }
         })
         
     except Exception as e:
-        logger.error(f"Resume history error: {str(e)}")
+        logger.error(f"Similar resumes error: {str(e)}")
         return jsonify({
             'success': False,
-            'message': 'Failed to get resume history',
+            'message': 'Failed to find similar resumes',
+            'error': str(e)
+        }), 500
+
+@app.route('/api/resume/job-match', methods=['POST'])
+@jwt_required()
+def match_job_description():
+    """Match a job description against one analysis, or rank all of the user's resumes"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json() or {}
+        
+        if not data.get('job_description'):
+            return jsonify({
+                'success': False,
+                'message': 'job_description is required'
+            }), 400
+        
+        resume_text = None
+        if data.get('analysis_id'):
+            analysis = analysis_store.load(data['analysis_id'], user_id, ['parsed_data.raw_text'])
+            if not analysis:
+                return jsonify({
+                    'success': False,
+                    'message': 'Analysis not found'
+                }), 404
+            resume_text = analysis['parsed_data'].get('raw_text', '')
+        
+        result = ml_analyzer.match_job_description(
+            data['job_description'],
+            resume_text=resume_text,
+            k=min(int(data.get('k', 10)), 50),
+            user_id=user_id
+        )
+        
+        return jsonify({
+            'success': True,
+            'data': result
+        })
+        
+    except Exception as e:
+        logger.error(f"Job match error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to match job description',
             'error': str(e)
         }), 500
 
-def calculate_overall_score(ml_analysis, gemini_analysis):
-    """Calculate overall resume score from ML and Gemini analyses"""
+@app.route('/api/resume/history', methods=['GET'])
+@jwt_required()
+def get_resume_history():
+    """Get user's resume analysis history, newest first, a page at a time.
+
+    ?limit= sets the page size (capped), ?cursor= continues from a previous page's next_cursor,
+    and ?include_total=true adds the user's total analysis count.
+    """
     try:
-        ml_score = ml_analysis.get('overall_score', 0)
-        gemini_score = gemini_analysis.get('score', 0)
+        user_id = get_jwt_identity()
+        
+        page = analysis_store.history_page(user_id, request.args.get('limit'), request.args.get('cursor'))
+        
+        data = {
+            'analyses': page['analyses'],
+            'count': len(page['analyses']),
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more']
+        }
+        if request.args.get('include_total') == 'true':
+            data['total'] = analysis_store.count(user_id)
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+        
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid cursor',
+            'error': str(e)
+        }), 400
         
-        # Weighted average (60% Gemini, 40% ML)
-        overall_score = (gemini_score * 0.6 + ml_score * 0.4)
-        return round(overall_score, 2)
-    except:
-        return 0
+    except Exception as e:
+        logger.error(f"Resume history error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Failed to get resume history',
+            'error': str(e)
+        }), 500
 
 if __name__ == '__main__':
-    # Import datetime here to avoid circular imports
-    from datetime import datetime
-    
     # Create uploads directory
     os.makedirs('uploads', exist_ok=True)
     
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Batch analysis CLI for Resume Builder Python Backend
+
+Usage:
+    python batch_analyze.py resumes/ archive.zip cv.pdf > results.ndjson
+    python batch_analyze.py resumes/ --save --user-id <id>
+    python batch_analyze.py resumes/ --gemini    # batched Gemini analysis, needs GEMINI_API_KEY
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from dotenv import load_dotenv
+
+from services.batch_analyzer import BatchAnalyzer, SUPPORTED_EXTENSIONS
+
+# Configure logging (stdout is reserved for NDJSON results)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    stream=sys.stderr
+)
+logger = logging.getLogger(__name__)
+
+def collect_files(paths):
+    """Yield (filename, open file) for resume files and zip archives, walking directories.
+
+    Each file stays open until the next one is requested, so the batch reads them one at a time.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(SUPPORTED_EXTENSIONS + ('.zip',)):
+                        yield from collect_files([os.path.join(root, name)])
+        elif os.path.isfile(path):
+            with open(path, 'rb') as f:
+                yield path, f
+        else:
+            logger.warning(f"⚠️  Skipping missing path: {path}")
+
+def main():
+    """Main batch analysis function"""
+    parser = argparse.ArgumentParser(description='Analyze many resumes in parallel and print NDJSON results')
+    parser.add_argument('paths', nargs='+', help='Resume files, zip archives or directories')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--save', action='store_true', help='Insert analyses into MongoDB resume_analyses')
+    parser.add_argument('--user-id', default=None, help='Owner of the saved analyses')
+    parser.add_argument('--gemini', action='store_true', help='Also run Gemini analysis, several resumes per call')
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    store = None
+    if args.save:
+        import pymongo
+        from services.analysis_store import AnalysisStore
+        mongo_uri = os.getenv('MONGO_URI', 'mongodb://localhost:27017/resume_builder_ml')
+        db = pymongo.MongoClient(mongo_uri).get_default_database()
+        store = AnalysisStore(
+            db.resume_analyses,
+            details_collection=db.resume_analysis_details,
+            raw_text_collection=db.resume_raw_texts,
+            split_writes=os.getenv('ANALYSIS_STORAGE', 'split') == 'split',
+            codec=os.getenv('ANALYSIS_TEXT_CODEC', 'zstd')
+        )
+        logger.info("✅ Saving analyses to MongoDB")
+
+    gemini_service = None
+    if args.gemini:
+        from services.gemini_service import GeminiService
+        gemini_service = GeminiService(os.getenv('GEMINI_API_KEY'))
+
+    analyzer = BatchAnalyzer(workers=args.workers, store=store, gemini_service=gemini_service)
+    failed = 0
+    try:
+        for result in analyzer.analyze(collect_files(args.paths), args.user_id, with_gemini=args.gemini):
+            if result.get('success') is False:
+                failed += 1
+            sys.stdout.write(json.dumps(result, default=str) + '\n')
+            sys.stdout.flush()
+    finally:
+        analyzer.shutdown()
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        logger.info("\n🛑 Batch analysis interrupted by user")
+        sys.exit(1)
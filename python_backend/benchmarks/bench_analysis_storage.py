@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stored bytes per analysis, one legacy document vs the split summary/details/raw text layout
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from services.analysis_store import AnalysisStore, compress_text, decompress_text, zstandard
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+ANALYSES = 200
+
+BULLETS = [
+    "Led a team of 6 engineers to deliver a Python and React platform used by 2 million customers.",
+    "Improved API latency by 35% by redesigning the PostgreSQL schema and adding Redis caching.",
+    "Developed machine learning models with TensorFlow and Pandas for churn prediction.",
+    "Managed AWS infrastructure with Docker, Kubernetes and Terraform across 3 regions.",
+    "Created data analytics dashboards in Tableau for the finance and sales teams.",
+]
+
+class _Collection:
+    """Collects inserted documents instead of writing them to MongoDB"""
+
+    def __init__(self):
+        self.documents = []
+
+    def insert_many(self, documents, ordered=False):
+        self.documents.extend(documents)
+
+def build_analysis(rng):
+    """Stored analysis shaped like the upload pipeline's document"""
+    jobs = rng.randint(2, 8)
+    raw_text = "\n".join(
+        f"Senior Software Engineer, Example Corp {2010 + job} - {2012 + job}\n" +
+        "\n".join(f"• {rng.choice(BULLETS)}" for _ in range(5))
+        for job in range(jobs)
+    )
+    return {
+        'user_id': f'user{rng.randrange(100)}',
+        'parsed_data': {
+            'raw_text': raw_text,
+            'skills': ['Python', 'React', 'PostgreSQL', 'Redis', 'AWS', 'Docker', 'Kubernetes'],
+            'experience': [{'title': 'Senior Software Engineer', 'company': 'Example Corp',
+                            'duration': f'{2010 + job} - {2012 + job}', 'description': rng.choice(BULLETS) * 3}
+                           for job in range(jobs)],
+            'text_analysis': {'pos_distribution': {f'TAG{tag}': rng.random() for tag in range(36)},
+                              'word_count': len(raw_text.split())}
+        },
+        'ml_analysis': {'features': {f'feature_{index}': rng.random() for index in range(13)},
+                        'overall_score': rng.uniform(40, 90)},
+        'gemini_analysis': {'score': rng.randint(40, 95), 'strengths': [rng.choice(BULLETS) for _ in range(5)],
+                            'improvements': [rng.choice(BULLETS) for _ in range(5)],
+                            'detailed_feedback': ' '.join(rng.choice(BULLETS) for _ in range(12))},
+        'overall_score': rng.uniform(40, 90),
+        'degraded_stages': [],
+        'section_fingerprints': {name: f'{rng.getrandbits(64):016x}' for name in ('experience', 'education', 'skills')},
+        'cached': False,
+        'created_at': datetime.utcnow(),
+        'timestamp': str(datetime.utcnow())
+    }
+
+def bytes_per_document(documents):
+    return sum(len(bson.encode(document)) for document in documents) / len(documents)
+
+def main():
+    rng = random.Random(3)
+    analyses = [build_analysis(rng) for _ in range(ANALYSES)]
+
+    legacy = _Collection()
+    AnalysisStore(legacy).insert_many([dict(analysis) for analysis in analyses])
+    summaries, details, raw_texts = _Collection(), _Collection(), _Collection()
+    AnalysisStore(summaries, details, raw_texts).insert_many([dict(analysis) for analysis in analyses])
+
+    logger.info(f"{'collection':<34} {'bytes/analysis':>15}")
+    logger.info(f"{'legacy resume_analyses':<34} {bytes_per_document(legacy.documents):>15,.0f}")
+    logger.info(f"{'split resume_analyses (summary)':<34} {bytes_per_document(summaries.documents):>15,.0f}")
+    logger.info(f"{'split resume_analysis_details':<34} {bytes_per_document(details.documents):>15,.0f}")
+    logger.info(f"{'split resume_raw_texts':<34} {bytes_per_document(raw_texts.documents):>15,.0f}")
+
+    texts = [analysis['parsed_data']['raw_text'] for analysis in analyses]
+    raw_bytes = sum(len(text.encode()) for text in texts)
+    logger.info(f"\n{'codec':<6} {'ratio':>7} {'compress ms':>12} {'decompress ms':>14}")
+    for codec in ('zlib', 'zstd'):
+        if codec == 'zstd' and zstandard is None:
+            logger.info("zstd    zstandard not installed")
+            continue
+        start = time.perf_counter()
+        compressed = [compress_text(text, codec) for text in texts]
+        compress_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for used_codec, data in compressed:
+            decompress_text(used_codec, data)
+        decompress_seconds = time.perf_counter() - start
+        ratio = raw_bytes / sum(len(data) for _, data in compressed)
+        logger.info(f"{codec:<6} {ratio:>6.1f}x {compress_seconds * 1000 / len(texts):>12.3f} "
+                    f"{decompress_seconds * 1000 / len(texts):>14.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ResumeCorpus similarity queries over a synthetic 100k-resume index
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.resume_corpus import ResumeCorpus
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DOCUMENTS = 100000
+WORDS_PER_DOCUMENT = 250
+VOCABULARY = 20000
+USERS = 500
+QUERIES = 200
+BATCH = 5000
+
+def build_vocabulary(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(VOCABULARY)]
+
+def zipf_words(rng, vocabulary, count):
+    """Sample words with a long-tailed distribution, like real resume text"""
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return rng.choices(vocabulary, weights=weights, k=count)
+
+def main():
+    rng = random.Random(11)
+    vocabulary = build_vocabulary(rng)
+    models_path = tempfile.mkdtemp(prefix='corpus-bench-')
+
+    try:
+        corpus = ResumeCorpus(models_path, autosave_every=DOCUMENTS + 1)
+
+        fit_seconds = 0
+        for offset in range(0, DOCUMENTS, BATCH):
+            texts = [' '.join(zipf_words(rng, vocabulary, WORDS_PER_DOCUMENT)) for _ in range(BATCH)]
+            ids = [f'doc{offset + i}' for i in range(BATCH)]
+            users = [f'user{rng.randrange(USERS)}' for _ in range(BATCH)]
+            start = time.perf_counter()
+            corpus.partial_fit(texts, ids, users)
+            fit_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        corpus.save()
+        save_seconds = time.perf_counter() - start
+
+        # Fresh instance: the matrix is memory-mapped from disk
+        start = time.perf_counter()
+        loaded = ResumeCorpus(models_path)
+        len(loaded)
+        load_seconds = time.perf_counter() - start
+
+        queries = [' '.join(zipf_words(rng, vocabulary, WORDS_PER_DOCUMENT)) for _ in range(QUERIES)]
+        job_descriptions = [' '.join(zipf_words(rng, vocabulary, 80)) for _ in range(QUERIES)]
+
+        def time_queries(func):
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                func(query)
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            return timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+        similar = time_queries(lambda text: loaded.most_similar(text, k=10))
+        similar_user = time_queries(lambda text: loaded.most_similar(text, k=10, user_id='user7'))
+        job_queries = iter(job_descriptions * 2)
+        job = time_queries(lambda text: loaded.match_job_description(next(job_queries), k=10))
+
+        logger.info(f"{DOCUMENTS} documents, {WORDS_PER_DOCUMENT} words each")
+        logger.info(f"incremental fit: {fit_seconds:7.1f} s   save: {save_seconds:5.1f} s   mmap load: {load_seconds * 1000:6.1f} ms")
+        logger.info(f"{'query':<28} {'p50 ms':>8} {'p95 ms':>8}")
+        logger.info(f"{'most_similar':<28} {similar[0]:>8.2f} {similar[1]:>8.2f}")
+        logger.info(f"{'most_similar (one user)':<28} {similar_user[0]:>8.2f} {similar_user[1]:>8.2f}")
+        logger.info(f"{'match_job_description':<28} {job[0]:>8.2f} {job[1]:>8.2f}")
+    finally:
+        shutil.rmtree(models_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: in-memory PDF/DOCX extraction vs the uploads/ temp file round-trip
+"""
+
+import os
+import sys
+import time
+import logging
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+from docx import Document
+from werkzeug.datastructures import FileStorage
+
+from services.resume_parser import ResumeParser
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+REPEATS = 20
+PAGE_COUNTS = [1, 5, 25]
+
+RESUME_LINE = "Senior Software Engineer at Example Corp 2018 - present. Led a team of 8 engineers and improved latency by 40%."
+
+def build_pdf(pages):
+    """Create a PDF with the given number of text-filled pages"""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), (RESUME_LINE + "\n") * 40, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def build_docx(paragraphs):
+    """Create a DOCX with the given number of paragraphs"""
+    doc = Document()
+    for _ in range(paragraphs):
+        doc.add_paragraph(RESUME_LINE)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def legacy_extract(parser, data, filename):
+    """The original path: save into uploads/, reopen from disk, then delete"""
+    file = FileStorage(stream=BytesIO(data), filename=filename)
+    file_path = os.path.join('uploads', filename)
+    file.save(file_path)
+    if filename.endswith('.pdf'):
+        doc = fitz.open(file_path)
+        text = ""
+        for page in doc:
+            text += page.get_text()
+        doc.close()
+    else:
+        text = "".join(paragraph.text + "\n" for paragraph in Document(file_path).paragraphs)
+    os.remove(file_path)
+    return text
+
+def in_memory_extract(parser, data, filename):
+    """The current path: read the upload stream and extract from bytes"""
+    file = FileStorage(stream=BytesIO(data), filename=filename)
+    source = parser._read_upload(file, filename)
+    if filename.endswith('.pdf'):
+        return parser._extract_text_from_pdf(source)
+    return parser._extract_text_from_docx(source)
+
+def time_call(func, *args):
+    """Return the median wall time in milliseconds over REPEATS runs"""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+def main():
+    os.makedirs('uploads', exist_ok=True)
+    parser = ResumeParser()
+
+    samples = [(f'resume_{pages}p.pdf', build_pdf(pages)) for pages in PAGE_COUNTS]
+    samples += [(f'resume_{pages}p.docx', build_docx(pages * 40)) for pages in PAGE_COUNTS]
+
+    logger.info(f"{'file':<20} {'size KB':>8} {'temp file ms':>13} {'in-memory ms':>13} {'speedup':>8}")
+    for filename, data in samples:
+        legacy_ms = time_call(legacy_extract, parser, data, filename)
+        memory_ms = time_call(in_memory_extract, parser, data, filename)
+        logger.info(f"{filename:<20} {len(data) / 1024:>8.1f} {legacy_ms:>13.2f} {memory_ms:>13.2f} {legacy_ms / memory_ms:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
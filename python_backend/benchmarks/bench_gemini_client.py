@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: AsyncGeminiClient against the fake model, compared with the blocking retry loop
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.gemini_client import AsyncGeminiClient
+from fake_gemini import FakeGeminiModel
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logging.getLogger('services.gemini_client').setLevel(logging.CRITICAL)
+
+REQUESTS = 200
+LATENCY = 0.2
+RATE_LIMIT_RATIO = 0.15
+REQUESTS_PER_MINUTE = 6000
+CONCURRENCY = 16
+
+def blocking_call(model, prompt, max_retries=3):
+    """The previous GeminiService retry loop: time.sleep holds the thread while backing off"""
+    for attempt in range(max_retries):
+        try:
+            return model.generate_content(prompt).text
+        except Exception:
+            if attempt < max_retries - 1:
+                time.sleep(2 ** attempt)
+    return None
+
+def run_blocking():
+    model = FakeGeminiModel(latency=LATENCY, rate_limit_ratio=RATE_LIMIT_RATIO)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(lambda i: blocking_call(model, f'resume {i}'), range(REQUESTS)))
+    return time.perf_counter() - start, results, model
+
+def run_async():
+    model = FakeGeminiModel(latency=LATENCY, rate_limit_ratio=RATE_LIMIT_RATIO)
+    client = AsyncGeminiClient(model, requests_per_minute=REQUESTS_PER_MINUTE, max_concurrency=CONCURRENCY,
+                               base_delay=0.25)
+
+    async def run_all():
+        return await asyncio.gather(*(client.generate(f'resume {i}') for i in range(REQUESTS)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+    client.close()
+    return elapsed, results, model, client
+
+def run_cancellation():
+    """Cancelling an awaiting caller must cancel its request on the client loop"""
+    model = FakeGeminiModel(latency=5.0, jitter=0)
+    client = AsyncGeminiClient(model, requests_per_minute=600, max_concurrency=4)
+
+    async def cancel_one():
+        task = asyncio.ensure_future(client.generate('slow resume'))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        start = time.perf_counter()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(cancel_one())
+    time.sleep(0.05)
+    in_flight = model.in_flight
+    client.close()
+    return elapsed, in_flight
+
+def main():
+    logger.info(f"{REQUESTS} requests, fake latency {LATENCY}s, {RATE_LIMIT_RATIO:.0%} 429s, concurrency {CONCURRENCY}")
+
+    elapsed, results, model = run_blocking()
+    logger.info(f"blocking retries : {elapsed:7.2f}s  ok={sum(r is not None for r in results)}  "
+                f"upstream calls={model.calls}  threads={CONCURRENCY}")
+
+    elapsed, results, model, client = run_async()
+    logger.info(f"async client     : {elapsed:7.2f}s  ok={sum(r is not None for r in results)}  "
+                f"upstream calls={model.calls}  peak in flight={model.peak_in_flight}  "
+                f"429s={client.stats['rate_limited']}  retries={client.stats['retries']}  threads=1")
+
+    elapsed, in_flight = run_cancellation()
+    logger.info(f"cancellation     : caller released in {elapsed * 1000:.1f} ms, upstream calls still in flight={in_flight}")
+
+if __name__ == '__main__':
+    main()
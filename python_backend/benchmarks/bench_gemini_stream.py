@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time to first useful field when streaming a Gemini analysis vs waiting for the full answer
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.gemini_service import GeminiService
+from services.gemini_cache import GeminiResponseCache
+from services.gemini_client import AsyncGeminiClient
+from fake_gemini import FakeGeminiModel
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Roughly the time Gemini takes to produce a full ~4k-token analysis
+LATENCY = 8.0
+RUNS = 3
+
+SAMPLE_ANALYSIS = {
+    'overall_score': 74,
+    'category_scores': {'content_quality': 72, 'structure_format': 80, 'skills_relevance': 75,
+                        'experience_depth': 68, 'achievements_impact': 61, 'ats_compatibility': 83},
+    'strengths': [f'Strength {i}: concrete, quantified example from the work history' for i in range(6)],
+    'weaknesses': [f'Weakness {i}: specific and actionable improvement area' for i in range(6)],
+    'detailed_feedback': {key: 'Detailed feedback paragraph. ' * 20 for key in ('content', 'structure', 'impact', 'keywords')},
+    'recommendations': [f'Recommendation {i}: prioritized by expected impact' for i in range(8)],
+    'industry_fit': {'primary_industry': 'Technology', 'alternative_industries': ['Finance', 'Consulting'],
+                     'industry_specific_advice': 'Advice for the target industry. ' * 8},
+    'missing_elements': ['Summary section', 'Certifications'],
+    'keyword_analysis': {'strong_keywords': ['python', 'aws'], 'missing_keywords': ['kubernetes'], 'ats_score': 78},
+    'career_level_assessment': {'experience_level': 'Mid', 'career_progression': 'Steady',
+                                'leadership_indicators': 'Led a team of four'},
+    'competitive_advantage': ['Cross-functional delivery', 'Cloud cost reductions']
+}
+
+def build_service(cache_dir):
+    service = GeminiService(None, response_cache=GeminiResponseCache(max_entries=1, cache_dir=cache_dir))
+    service.model = FakeGeminiModel(latency=LATENCY, jitter=0, response_text=json.dumps(SAMPLE_ANALYSIS, indent=2))
+    service.client = AsyncGeminiClient(service.model, service.GENERATION_CONFIG, requests_per_minute=6000)
+    return service
+
+def main():
+    parsed = {'raw_text': 'Software engineer with five years of experience', 'skills': ['python']}
+
+    for run in range(RUNS):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            service = build_service(cache_dir)
+            start = time.perf_counter()
+            service.analyze_resume(parsed)
+            blocking = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            service = build_service(cache_dir)
+            start = time.perf_counter()
+            first_field = {}
+            for event, data in service.stream_analysis(parsed):
+                if event == 'field':
+                    first_field.setdefault(data['key'], time.perf_counter() - start)
+            streamed = time.perf_counter() - start
+
+        logger.info(f"run {run + 1}: blocking first byte {blocking:.2f}s | streaming: "
+                    f"score {first_field['overall_score']:.2f}s, "
+                    f"category_scores {first_field['category_scores']:.2f}s, "
+                    f"strengths {first_field['strengths']:.2f}s, "
+                    f"recommendations {first_field['recommendations']:.2f}s, complete {streamed:.2f}s")
+
+if __name__ == '__main__':
+    main()
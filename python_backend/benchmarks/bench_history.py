@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resume history over 1M stored analyses, unbounded string-timestamp sort vs
+keyset pages on the (user_id, created_at) index. Needs a MongoDB at MONGO_URI; it writes
+to a scratch database that is dropped afterwards.
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymongo
+from bson import ObjectId
+from services.analysis_store import AnalysisStore
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DOCUMENTS = 1000000
+USERS = 2000
+HEAVY_USER_ANALYSES = 20000
+INSERT_BATCH = 10000
+PAGE_SIZE = 20
+DEEP_PAGES = 200
+DATABASE = 'resume_history_bench'
+
+def build_documents(rng):
+    """Analyses spread over USERS, plus one heavy user; stored like the upload pipeline does"""
+    start = datetime(2023, 1, 1)
+    for index in range(DOCUMENTS):
+        user_id = 'heavy' if index < HEAVY_USER_ANALYSES else f'user{rng.randrange(USERS)}'
+        created_at = start + timedelta(seconds=rng.randrange(60 * 86400 * 365))
+        yield {
+            '_id': ObjectId(),
+            'user_id': user_id,
+            'overall_score': round(rng.uniform(30, 95), 1),
+            'created_at': created_at,
+            'timestamp': str(created_at),
+            # Stand-in for the parsed resume and analyses stored alongside the summary fields
+            'parsed_data': {'raw_text': 'x' * rng.randint(2000, 6000)}
+        }
+
+def timed(action, repeats=5):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = action()
+    return (time.perf_counter() - start) / repeats, result
+
+def main():
+    rng = random.Random(5)
+    client = pymongo.MongoClient(os.getenv('MONGO_URI', 'mongodb://localhost:27017'))
+    client.drop_database(DATABASE)
+    collection = client[DATABASE].resume_analyses
+
+    try:
+        start = time.perf_counter()
+        batch = []
+        for document in build_documents(rng):
+            batch.append(document)
+            if len(batch) >= INSERT_BATCH:
+                collection.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.insert_many(batch, ordered=False)
+        logger.info(f"inserted {DOCUMENTS:,} analyses in {time.perf_counter() - start:.1f}s")
+
+        # Before: the old endpoint, no index, every analysis of the user sorted on the string timestamp
+        def old_history():
+            return list(collection.find(
+                {'user_id': 'heavy'},
+                {'_id': 1, 'overall_score': 1, 'timestamp': 1}
+            ).sort('timestamp', -1).allow_disk_use(True))
+        seconds, analyses = timed(old_history, repeats=3)
+        logger.info(f"{'unbounded, no index':<28} {seconds * 1000:>9.1f} ms {len(analyses):>7,} analyses")
+
+        store = AnalysisStore(collection, default_page_size=PAGE_SIZE)
+        start = time.perf_counter()
+        store.ensure_indexes()
+        logger.info(f"ensure_indexes in {time.perf_counter() - start:.1f}s")
+
+        seconds, page = timed(lambda: store.history_page('heavy'))
+        logger.info(f"{'first page':<28} {seconds * 1000:>9.1f} ms {len(page['analyses']):>7,} analyses")
+
+        cursor = None
+        start = time.perf_counter()
+        for _ in range(DEEP_PAGES):
+            page = store.history_page('heavy', cursor=cursor)
+            cursor = page['next_cursor']
+        per_page = (time.perf_counter() - start) / DEEP_PAGES
+        seconds, page = timed(lambda: store.history_page('heavy', cursor=cursor))
+        logger.info(f"{'page ' + str(DEEP_PAGES + 1) + ' via cursor':<28} {seconds * 1000:>9.1f} ms "
+                    f"(avg {per_page * 1000:.1f} ms/page over the walk)")
+
+        seconds, total = timed(lambda: store.count('heavy'))
+        logger.info(f"{'total count (on request)':<28} {seconds * 1000:>9.1f} ms {total:>7,} analyses")
+
+        plan = collection.find({'user_id': 'heavy'}, {'_id': 1}).sort(
+            [('created_at', -1), ('_id', -1)]).limit(PAGE_SIZE + 1).explain()
+        stats = plan.get('executionStats', {})
+        logger.info(f"first page examined {stats.get('totalDocsExamined')} documents, "
+                    f"{stats.get('totalKeysExamined')} index keys")
+    finally:
+        client.drop_database(DATABASE)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Gemini analysis prompt size and latency, indent=2 JSON sections vs the token-budgeted compiler
+
+Latency uses the real API when GEMINI_API_KEY is set; otherwise it is modelled by the fake model
+with a per-input-token cost.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.resume_parser import ResumeParser
+from services.gemini_service import GeminiService
+from services.gemini_cache import GeminiResponseCache
+from services.gemini_client import AsyncGeminiClient
+from services.prompt_builder import estimate_tokens
+from services.text_document import TokenizedDocument
+from bench_nlp_pipeline import build_resume
+from fake_gemini import FakeGeminiModel
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+RESUMES = 50
+LATENCY_SAMPLES = 5
+# Fake model cost: fixed overhead plus prefill time per input token
+BASE_LATENCY = 1.0
+SECONDS_PER_INPUT_TOKEN = 0.0005
+
+def legacy_prompt(service, parsed_data):
+    """The previous prompt: indent=2 JSON for every section and the first 3000 raw characters"""
+    prompt = service._create_analysis_prompt(parsed_data)
+    head, rest = prompt.split('PERSONAL INFORMATION:', 1)
+    tail = rest[rest.index('ANALYSIS REQUIREMENTS:'):]
+    data = f"""PERSONAL INFORMATION:
+{json.dumps(parsed_data.get('personal_info', {}), indent=2)}
+
+EDUCATION:
+{json.dumps(parsed_data.get('education', []), indent=2)}
+
+WORK EXPERIENCE:
+{json.dumps(parsed_data.get('experience', []), indent=2)}
+
+SKILLS:
+{json.dumps(parsed_data.get('skills', []), indent=2)}
+
+QUANTIFIABLE ACHIEVEMENTS:
+{json.dumps(parsed_data.get('metrics', []), indent=2)}
+
+FULL RESUME TEXT:
+{parsed_data.get('raw_text', '')[:3000]}  # Limit to avoid token limits
+
+"""
+    return head + data + tail
+
+def parse(parser, text):
+    """Structured sections only; the prompt does not use NLTK-derived fields"""
+    document = TokenizedDocument(text)
+    return {
+        'raw_text': text,
+        'personal_info': parser._extract_personal_info(document),
+        'education': parser._extract_education(document),
+        'experience': parser._extract_experience(document),
+        'skills': parser._extract_skills(document),
+        'metrics': parser._extract_metrics(document)
+    }
+
+def measure_latency(service, prompts):
+    timings = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        service.client.generate_sync(prompt)
+        timings.append(time.perf_counter() - start)
+    return sum(timings) / len(timings)
+
+def main():
+    rng = random.Random(3)
+    parser = ResumeParser()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        service = GeminiService(os.getenv('GEMINI_API_KEY'), response_cache=GeminiResponseCache(cache_dir=cache_dir))
+    logging.getLogger('services.gemini_service').setLevel(logging.WARNING)
+
+    corpus = [parse(parser, build_resume(rng)) for _ in range(RESUMES)]
+    legacy = [legacy_prompt(service, parsed) for parsed in corpus]
+    start = time.perf_counter()
+    compiled = [service.build_analysis_prompt(parsed) for parsed in corpus]
+    compile_ms = (time.perf_counter() - start) / RESUMES * 1000
+
+    legacy_tokens = [estimate_tokens(prompt) for prompt in legacy]
+    compact_tokens = [estimate_tokens(prompt) for prompt, _ in compiled]
+    logger.info(f"{RESUMES} resumes, avg {sum(len(p['experience']) for p in corpus) / RESUMES:.0f} parsed experience entries")
+    logger.info(f"indent=2 prompt : {sum(map(len, legacy)) / RESUMES:8.0f} chars  ~{sum(legacy_tokens) / RESUMES:6.0f} tokens")
+    logger.info(f"compiled prompt : {sum(len(p) for p, _ in compiled) / RESUMES:8.0f} chars  ~{sum(compact_tokens) / RESUMES:6.0f} tokens"
+                f"  ({compile_ms:.2f} ms to compile)")
+
+    report = compiled[0][1]
+    for name, stats in report.items():
+        if name != 'total_tokens':
+            logger.info(f"  {name:14s} ~{stats['tokens']:5d} tokens  {stats['items']:3d} kept  {stats['dropped']:3d} dropped")
+
+    if service.model is None:
+        service.model = FakeGeminiModel(latency=0, jitter=0)
+        service.client = AsyncGeminiClient(service.model, service.GENERATION_CONFIG, requests_per_minute=6000)
+        generate = service.model.generate_content_async
+
+        async def priced(prompt, generation_config=None):
+            service.model.latency = BASE_LATENCY + estimate_tokens(prompt) * SECONDS_PER_INPUT_TOKEN
+            return await generate(prompt, generation_config)
+        service.model.generate_content_async = priced
+        logger.info("latency (fake model, no GEMINI_API_KEY):")
+    else:
+        logger.info("latency (Gemini API):")
+
+    logger.info(f"  indent=2 prompt : {measure_latency(service, legacy[:LATENCY_SAMPLES]):.2f}s avg")
+    logger.info(f"  compiled prompt : {measure_latency(service, [p for p, _ in compiled[:LATENCY_SAMPLES]]):.2f}s avg")
+
+if __name__ == '__main__':
+    main()
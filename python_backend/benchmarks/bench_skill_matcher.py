@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Aho-Corasick skill matcher vs the per-skill substring loop
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_matcher import SkillMatcher
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+SKILL_COUNTS = [100, 1000, 20000]
+REPEATS = 5
+
+def generate_skills(count, rng):
+    """Generate a synthetic skills taxonomy of one to three word entries"""
+    skills = set()
+    while len(skills) < count:
+        words = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(rng.randint(1, 3))]
+        skills.add(' '.join(words).title())
+    return list(skills)
+
+def generate_resume_text(skills, rng, words=1500):
+    """Build resume-sized text that mentions a sample of the skills"""
+    filler = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(words)]
+    for skill in rng.sample(skills, min(40, len(skills))):
+        filler.insert(rng.randint(0, len(filler)), skill)
+    return ' '.join(filler)
+
+def legacy_scan(skills, text):
+    """The original ResumeParser._extract_skills loop"""
+    text_lower = text.lower()
+    return [skill for skill in skills if skill.lower() in text_lower]
+
+def time_call(func, *args):
+    """Return the best wall time in milliseconds over REPEATS runs"""
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    rng = random.Random(42)
+    logger.info(f"{'skills':>8} {'loop ms':>10} {'automaton ms':>14} {'build ms':>10} {'speedup':>9}")
+
+    for count in SKILL_COUNTS:
+        skills = generate_skills(count, rng)
+        text = generate_resume_text(skills, rng)
+
+        build_start = time.perf_counter()
+        matcher = SkillMatcher(skills)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        loop_ms = time_call(legacy_scan, skills, text)
+        automaton_ms = time_call(matcher.find_skills, text)
+
+        logger.info(f"{count:>8} {loop_ms:>10.2f} {automaton_ms:>14.2f} {build_ms:>10.1f} {loop_ms / automaton_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    logging.getLogger('services.skill_matcher').setLevel(logging.WARNING)
+    main()
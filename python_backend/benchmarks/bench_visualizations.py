@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: analysis GET visualization cost, all eight charts vs the initial view with the render cache,
+and bytes per analysis for the full Plotly JSON vs the compact chart format (JSON and msgpack)
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.data_visualizer import DataVisualizer, CHARTS
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+REPEATS = 5
+
+def build_analysis(index):
+    """Stored analysis document with the fields the charts read"""
+    return {
+        '_id': f'analysis-{index}',
+        'ml_analysis': {
+            'overall_score': 72.5,
+            'industry_classification': {'industry_scores': {'technology': 0.42, 'finance': 0.18, 'healthcare': 0.05,
+                                                            'marketing': 0.11, 'education': 0.02}}
+        },
+        'gemini_analysis': {
+            'score': 78,
+            'category_scores': {'content_quality': 80, 'formatting': 70, 'keywords': 65, 'experience': 85,
+                                'skills': 75, 'achievements': 60}
+        },
+        'parsed_data': {
+            'skills': ['Python', 'JavaScript', 'SQL', 'Docker', 'Kubernetes', 'React', 'AWS', 'Pandas',
+                       'TensorFlow', 'Leadership', 'Communication', 'PostgreSQL'],
+            'experience': [{'title': f'Software Engineer {level}', 'company': 'Example Corp'} for level in range(4)],
+            'text_analysis': {'word_count': 640, 'unique_words': 310, 'sentence_count': 38, 'avg_sentence_length': 16.8}
+        }
+    }
+
+def payload_bytes(visualizations):
+    return len(json.dumps(visualizations, default=str).encode())
+
+def main():
+    visualizer = DataVisualizer()
+    visualizer.create_resume_visualizations(build_analysis(-1))
+
+    def measure(label, render):
+        start = time.perf_counter()
+        for index in range(REPEATS):
+            visualizations = render(index)
+        elapsed = (time.perf_counter() - start) / REPEATS
+        logger.info(f"{label:<28} {elapsed * 1000:>9.1f} ms {payload_bytes(visualizations):>10,} bytes")
+
+    logger.info(f"{'request':<28} {'latency':>12} {'payload':>16}")
+    # Distinct ids so every render misses the cache, as every GET did before
+    measure('all charts (before)', lambda index: visualizer.create_resume_visualizations(
+        build_analysis(f'all-{index}'), list(CHARTS)))
+    measure('initial view, cold', lambda index: visualizer.create_resume_visualizations(
+        build_analysis(f'cold-{index}'), visualizer.initial_charts))
+    measure('initial view, cached', lambda index: visualizer.create_resume_visualizations(
+        build_analysis('cold-0'), visualizer.initial_charts))
+
+    for name in CHARTS:
+        start = time.perf_counter()
+        chart = visualizer.create_chart(name, build_analysis(f'chart-{name}'))
+        elapsed = time.perf_counter() - start
+        logger.info(f"  {name:<26} {elapsed * 1000:>9.1f} ms {payload_bytes(chart):>10,} bytes")
+
+    logger.info(f"render cache: {visualizer.stats()}")
+
+    # Plotly charts only: the word cloud is an image URL once an asset store is configured
+    plotly_charts = [name for name in CHARTS if name != 'wordcloud']
+    logger.info(f"\n{'bytes per analysis':<28} {'json':>10} {'msgpack':>10}")
+    for chart_format in ('plotly', 'compact'):
+        for label, charts in (('initial view', visualizer.initial_charts), ('all plotly charts', plotly_charts)):
+            visualizations = visualizer.create_resume_visualizations(
+                build_analysis(f'{chart_format}-{label}'), charts, chart_format)
+            packed = f"{len(msgpack.packb(visualizations, use_bin_type=True)):>10,}" if msgpack else f"{'n/a':>10}"
+            logger.info(f"{chart_format + ', ' + label:<28} {payload_bytes(visualizations):>10,} {packed}")
+    layouts = visualizer.chart_layouts()
+    logger.info(f"layouts {layouts['version']} (fetched once per version): {payload_bytes(layouts):,} bytes")
+
+if __name__ == "__main__":
+    main()
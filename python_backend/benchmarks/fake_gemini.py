@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for google.generativeai.GenerativeModel with configurable latency and 429 rate
+"""
+
+import asyncio
+import random
+import time
+
+class FakeRateLimitError(Exception):
+    """Mimics the SDK's ResourceExhausted error"""
+    code = 429
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeGeminiModel:
+    """Answers every prompt with a canned JSON analysis after `latency` seconds.
+
+    `rate_limit_ratio` of calls fail with a 429 instead, drawn from a seeded RNG so
+    benchmark runs are repeatable.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.1, rate_limit_ratio=0.0, seed=7, response_text=None, chunk_size=64):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.response_text = response_text
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _next_outcome(self):
+        self.calls += 1
+        delay = max(0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        return delay, self.rng.random() < self.rate_limit_ratio
+
+    def _response(self, prompt):
+        if self.response_text is not None:
+            return FakeResponse(self.response_text)
+        return FakeResponse('{"overall_score": 72, "category_scores": {"content_quality": 70}, '
+                            f'"strengths": ["prompt of {len(prompt)} chars"], "recommendations": []}}')
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        delay, rate_limited = self._next_outcome()
+        if stream:
+            return self._stream(prompt, delay, rate_limited)
+        time.sleep(delay)
+        if rate_limited:
+            raise FakeRateLimitError('429 Resource has been exhausted (e.g. check quota).')
+        return self._response(prompt)
+
+    def _stream(self, prompt, delay, rate_limited):
+        """Yield the response in chunks spread evenly over the total latency"""
+        if rate_limited:
+            raise FakeRateLimitError('429 Resource has been exhausted (e.g. check quota).')
+        text = self._response(prompt).text
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield FakeResponse(chunk)
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        delay, rate_limited = self._next_outcome()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        if rate_limited:
+            raise FakeRateLimitError('429 Resource has been exhausted (e.g. check quota).')
+        return self._response(prompt)
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import hashlib
+import logging
+import copy
+
+logger = logging.getLogger(__name__)
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a fixed number of entries"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class AnalysisCache:
+    """Content-addressed cache of full resume analyses with memory and MongoDB tiers"""
+
+    def __init__(self, collection=None, version='', max_entries=256, ttl_days=30):
+        self.memory = LRUCache(max_entries)
+        self.collection = collection
+        self.version = version
+        self.ttl_seconds = int(ttl_days * 86400)
+        self._counters = {'memory_hits': 0, 'mongo_hits': 0, 'misses': 0, 'stores': 0}
+        self._lock = threading.Lock()
+
+    def ensure_indexes(self):
+        """Create the TTL index and drop entries written under an older analyzer/prompt version"""
+        if self.collection is None:
+            return
+        try:
+            self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+            stale = self.collection.delete_many({'version': {'$ne': self.version}}).deleted_count
+            if stale:
+                logger.info(f"Dropped {stale} cached analyses from older versions")
+        except Exception as e:
+            logger.warning(f"Analysis cache index setup failed: {str(e)}")
+
+    def make_key(self, file, chunk_size=64 * 1024):
+        """Key an upload by the SHA-256 of its bytes plus the analysis version.
+
+        The file is hashed in chunks, so a large upload is never held in memory, and
+        rewound afterwards for the parser.
+        """
+        content_hash = hashlib.sha256()
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            content_hash.update(chunk)
+        file.seek(0)
+        return f"{content_hash.hexdigest()}:{self.version}"
+
+    def get(self, key):
+        """Return a cached analysis or None, checking memory before MongoDB"""
+        analysis = self.memory.get(key)
+        if analysis is not None:
+            self._count('memory_hits')
+            return copy.deepcopy(analysis)
+
+        if self.collection is not None:
+            try:
+                document = self.collection.find_one({'_id': key})
+                if document:
+                    self.memory.set(key, document['analysis'])
+                    self._count('mongo_hits')
+                    return copy.deepcopy(document['analysis'])
+            except Exception as e:
+                logger.warning(f"Analysis cache lookup failed: {str(e)}")
+
+        self._count('misses')
+        return None
+
+    def set(self, key, analysis):
+        """Store an analysis in both tiers"""
+        self.memory.set(key, copy.deepcopy(analysis))
+        self._count('stores')
+
+        if self.collection is not None:
+            try:
+                self.collection.replace_one(
+                    {'_id': key},
+                    {
+                        '_id': key,
+                        'version': self.version,
+                        'analysis': analysis,
+                        'created_at': datetime.utcnow()
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Analysis cache store failed: {str(e)}")
+
+    def invalidate_all(self):
+        """Drop every cached analysis, e.g. after the skills database or prompt changed"""
+        self.memory.clear()
+        if self.collection is not None:
+            try:
+                self.collection.delete_many({})
+            except Exception as e:
+                logger.warning(f"Analysis cache invalidation failed: {str(e)}")
+        logger.info("Analysis cache invalidated")
+
+    def stats(self):
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['memory_hits'] + counters['mongo_hits'] + counters['misses']
+        counters['hit_rate'] = round((lookups - counters['misses']) / lookups, 3) if lookups else 0
+        counters['memory_entries'] = len(self.memory)
+        counters['version'] = self.version
+        return counters
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
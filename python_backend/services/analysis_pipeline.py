@@ -0,0 +1,301 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime
+import logging
+import time
+import os
+from services.section_fingerprints import section_fingerprints, changed_sections, same_resume
+from services.analysis_store import AnalysisStore
+
+logger = logging.getLogger(__name__)
+
+# Bump when ML scoring changes in a way that should invalidate cached analyses
+# (2: drops entries cached from incremental analyses)
+ANALYSIS_VERSION = '2'
+
+def analysis_version(resume_parser, gemini_service):
+    """Version string covering the analyzers, the skills database and the Gemini prompt"""
+    return f"{ANALYSIS_VERSION}-{resume_parser.skills_fingerprint()}-{gemini_service.prompt_fingerprint()}"
+
+class AnalysisPipeline:
+    """Runs the parse -> ML -> Gemini -> persist stages for one uploaded resume"""
+
+    STAGES = ['parse', 'ml_analysis', 'gemini_analysis', 'persist']
+
+    def __init__(self, resume_parser, ml_analyzer, gemini_service, db, executor=None, cache=None, store=None):
+        self.resume_parser = resume_parser
+        self.ml_analyzer = ml_analyzer
+        self.gemini_service = gemini_service
+        self.db = db
+        self.cache = cache
+        self.store = store or AnalysisStore(db.resume_analyses)
+
+        # Shared executor so ML and Gemini analysis of one upload run side by side
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=int(os.getenv('ANALYSIS_WORKERS', '8')),
+            thread_name_prefix='resume-analysis'
+        )
+        self.incremental = os.getenv('INCREMENTAL_ANALYSIS', 'true').lower() == 'true'
+        self.incremental_min_similarity = float(os.getenv('INCREMENTAL_MIN_SIMILARITY', '0.5'))
+        self.stage_timeouts = {
+            'ml_analysis': float(os.getenv('ML_STAGE_TIMEOUT', '60')),
+            'gemini_analysis': float(os.getenv('GEMINI_STAGE_TIMEOUT', '30'))
+        }
+
+    def run(self, file, user_id, on_stage=None):
+        """Analyze an uploaded resume, reporting stage progress to on_stage(stage, status, result)"""
+        report = on_stage or (lambda stage, status, result=None: None)
+
+        # Serve re-uploads of identical files from the analysis cache
+        cache_key, cached = self._cached(file, user_id)
+        if cached:
+            for stage in ('parse', 'ml_analysis', 'gemini_analysis'):
+                report(stage, 'cached')
+            return self._persist(user_id, {**cached, 'recomputed_sections': []}, report, cached=True)
+
+        # Build on the user's last analysis so unchanged sections are not recomputed
+        previous = self._previous_analysis(user_id) if self.incremental else None
+
+        # Parse resume
+        logger.info(f"Parsing resume for user: {user_id}")
+        report('parse', 'running')
+        parsed_data = self.resume_parser.parse_resume(file, previous=previous['parsed_data'] if previous else None)
+
+        if not parsed_data['success']:
+            report('parse', 'failed', parsed_data)
+            return parsed_data
+        report('parse', 'completed', self._parse_summary(parsed_data['data']))
+
+        # Perform ML and Gemini AI analysis concurrently
+        logger.info("Performing ML and Gemini AI analysis")
+        report('ml_analysis', 'running')
+        report('gemini_analysis', 'running')
+        started = time.monotonic()
+        previous = self._revised(parsed_data['data'], previous)
+        fingerprints = section_fingerprints(parsed_data['data'], parsed_data.get('document'))
+        changed = self._changed_sections(fingerprints, previous)
+        ml_future = self._submit_ml(parsed_data, previous, changed)
+        if previous:
+            gemini_future = self.executor.submit(self.gemini_service.reanalyze_sections, parsed_data['data'],
+                                                 previous.get('gemini_analysis'), changed)
+        else:
+            gemini_future = self.executor.submit(self.gemini_service.analyze_resume, parsed_data['data'])
+
+        ml_analysis = self._stage_result('ml_analysis', ml_future, started)
+        report('ml_analysis', 'degraded' if ml_analysis.get('degraded') else 'completed', ml_analysis)
+
+        gemini_analysis = self._stage_result('gemini_analysis', gemini_future, started)
+        report('gemini_analysis', 'degraded' if gemini_analysis.get('degraded') else 'completed', gemini_analysis)
+
+        return self._finish(user_id, cache_key, parsed_data['data'], ml_analysis, gemini_analysis,
+                            fingerprints, previous, changed, report)
+
+    def stream(self, file, user_id):
+        """Analyze an upload like run(), yielding (event, data) as results become available.
+
+        Gemini fields are yielded one by one as the streamed answer is parsed, while ML
+        analysis runs alongside on the executor. Like run(), it builds on the user's last
+        analysis when incremental analysis is enabled.
+        """
+        cache_key, cached = self._cached(file, user_id)
+        if cached:
+            yield 'complete', self._persist(user_id, {**cached, 'recomputed_sections': []},
+                                            lambda *args: None, cached=True)
+            return
+
+        previous = self._previous_analysis(user_id) if self.incremental else None
+
+        logger.info(f"Parsing resume for user: {user_id}")
+        parsed_data = self.resume_parser.parse_resume(file, previous=previous['parsed_data'] if previous else None)
+        if not parsed_data['success']:
+            yield 'error', parsed_data
+            return
+        yield 'parsed', self._parse_summary(parsed_data['data'])
+
+        started = time.monotonic()
+        previous = self._revised(parsed_data['data'], previous)
+        fingerprints = section_fingerprints(parsed_data['data'], parsed_data.get('document'))
+        changed = self._changed_sections(fingerprints, previous)
+        ml_future = self._submit_ml(parsed_data, previous, changed)
+        ml_sent = False
+
+        gemini_analysis = None
+        gemini_timeout = self.stage_timeouts['gemini_analysis']
+        gemini_stream = self.gemini_service.stream_analysis(
+            parsed_data['data'],
+            previous.get('gemini_analysis') if previous else None,
+            changed if previous else None
+        )
+        for event, data in gemini_stream:
+            if event == 'field':
+                yield 'gemini_field', data
+            else:
+                gemini_analysis = data
+
+            if not ml_sent and ml_future.done():
+                ml_sent = True
+                yield 'ml_analysis', self._stage_result('ml_analysis', ml_future, started)
+
+            # The stream can only be abandoned between chunks
+            if gemini_analysis is None and time.monotonic() - started > gemini_timeout:
+                logger.warning(f"gemini_analysis exceeded {gemini_timeout}s timeout while streaming")
+                gemini_analysis = {
+                    'error': 'gemini_analysis timed out',
+                    'score': 0,
+                    'feedback': 'Analysis took too long and was skipped',
+                    'degraded': True
+                }
+                break
+
+        ml_analysis = self._stage_result('ml_analysis', ml_future, started)
+        if not ml_sent:
+            yield 'ml_analysis', ml_analysis
+        yield 'gemini_analysis', gemini_analysis
+
+        yield 'complete', self._finish(user_id, cache_key, parsed_data['data'], ml_analysis, gemini_analysis,
+                                       fingerprints, previous, changed, lambda *args: None)
+
+    def _cached(self, file, user_id):
+        """(cache key, cached analysis or None) for an upload; (None, None) without a cache"""
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.make_key(file)
+        cached = self.cache.get(cache_key)
+        if cached:
+            logger.info(f"Analysis cache hit for user: {user_id}")
+        return cache_key, cached
+
+    def _changed_sections(self, fingerprints, previous):
+        """Sections that differ from the previous analysis; all of them without one"""
+        if not previous:
+            return list(fingerprints)
+        changed = changed_sections(fingerprints, previous['section_fingerprints'])
+        logger.info(f"Incremental analysis, changed sections: {changed}")
+        return changed
+
+    def _submit_ml(self, parsed_data, previous, changed):
+        """Start the ML stage, reusing the previous ML analysis for unchanged sections"""
+        if previous:
+            return self.executor.submit(self.ml_analyzer.analyze_resume, parsed_data['data'],
+                                        parsed_data.get('document'), previous.get('ml_analysis'), changed)
+        return self.executor.submit(self.ml_analyzer.analyze_resume, parsed_data['data'], parsed_data.get('document'))
+
+    def _finish(self, user_id, cache_key, parsed_data, ml_analysis, gemini_analysis, fingerprints,
+                previous, changed, report):
+        """Assemble, cache and persist the analysis of one upload"""
+        analysis = self._assemble(parsed_data, ml_analysis, gemini_analysis, fingerprints)
+        # The cache is shared by every user, so only analyses built from this upload alone go in;
+        # an incremental one carries over parts of the uploader's previous analysis
+        if not previous:
+            self._cache_if_complete(cache_key, analysis)
+        analysis['recomputed_sections'] = changed
+        if previous:
+            analysis['based_on'] = str(previous['_id'])
+        return self._persist(user_id, analysis, report)
+
+    def _assemble(self, parsed_data, ml_analysis, gemini_analysis, fingerprints):
+        """Combine stage results into the stored analysis document"""
+        return {
+            'parsed_data': parsed_data,
+            'ml_analysis': ml_analysis,
+            'gemini_analysis': gemini_analysis,
+            'overall_score': calculate_overall_score(ml_analysis, gemini_analysis),
+            'degraded_stages': [stage for stage, result in (('ml_analysis', ml_analysis), ('gemini_analysis', gemini_analysis))
+                                if result.get('degraded')],
+            'section_fingerprints': fingerprints
+        }
+
+    def _previous_analysis(self, user_id):
+        """The user's most recent analysis that carries section fingerprints, or None"""
+        try:
+            return self.store.latest(
+                user_id,
+                {'section_fingerprints': {'$exists': True}},
+                ['parsed_data', 'ml_analysis', 'gemini_analysis', 'section_fingerprints'],
+                include_raw_text=True
+            )
+        except Exception as e:
+            logger.warning(f"Could not load previous analysis: {str(e)}")
+            return None
+
+    def _revised(self, parsed_data, previous):
+        """previous when the upload is a revision of the same resume, else None for a full analysis"""
+        if not previous or same_resume(parsed_data, previous['parsed_data'], self.incremental_min_similarity):
+            return previous
+        logger.info("Upload is not a revision of the previous resume, running a full analysis")
+        return None
+
+    def _cache_if_complete(self, cache_key, analysis):
+        """Only complete analyses are worth replaying for later uploads"""
+        if (cache_key and not analysis['degraded_stages']
+                and 'error' not in analysis['ml_analysis'] and 'error' not in analysis['gemini_analysis']):
+            self.cache.set(cache_key, analysis)
+
+    def _persist(self, user_id, analysis, report, cached=False):
+        """Save an analysis for the user and build the pipeline result"""
+        now = datetime.utcnow()
+        comprehensive_analysis = {
+            'user_id': user_id,
+            **analysis,
+            'cached': cached,
+            'created_at': now,
+            'timestamp': str(now)
+        }
+
+        # Save to database (insert a copy so the returned analysis stays free of ObjectIds)
+        report('persist', 'running')
+        analysis_id = self.store.insert(dict(comprehensive_analysis))
+        report('persist', 'completed', {
+            'analysis_id': analysis_id,
+            'overall_score': comprehensive_analysis['overall_score']
+        })
+        self.ml_analyzer.index_resume(analysis_id, user_id, analysis['parsed_data'].get('raw_text', ''))
+
+        return {
+            'success': True,
+            'analysis_id': analysis_id,
+            'analysis': comprehensive_analysis
+        }
+
+    def _stage_result(self, stage, future, started):
+        """Wait for a stage until its deadline, degrading it instead of failing the upload"""
+        remaining = max(self.stage_timeouts[stage] - (time.monotonic() - started), 0)
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            # The worker thread cannot be interrupted; its late result is discarded
+            logger.warning(f"{stage} exceeded {self.stage_timeouts[stage]}s timeout")
+            return {
+                'error': f'{stage} timed out',
+                'score': 0,
+                'overall_score': 0,
+                'feedback': 'Analysis took too long and was skipped',
+                'degraded': True
+            }
+
+    def _parse_summary(self, parsed_data):
+        """Lightweight view of the parsed resume for progress reporting"""
+        return {
+            'personal_info': parsed_data.get('personal_info', {}),
+            'skills': parsed_data.get('skills', []),
+            'education_count': len(parsed_data.get('education', [])),
+            'experience_count': len(parsed_data.get('experience', [])),
+            'metrics': parsed_data.get('metrics', [])
+        }
+
+def calculate_overall_score(ml_analysis, gemini_analysis):
+    """Calculate overall resume score from ML and Gemini analyses"""
+    try:
+        ml_score = ml_analysis.get('overall_score', 0)
+        gemini_score = gemini_analysis.get('score', 0)
+
+        # A degraded stage contributes nothing, so score on the other one alone
+        if gemini_analysis.get('degraded') and not ml_analysis.get('degraded'):
+            return round(ml_score, 2)
+        if ml_analysis.get('degraded') and not gemini_analysis.get('degraded'):
+            return round(gemini_score, 2)
+
+        # Weighted average (60% Gemini, 40% ML)
+        overall_score = (gemini_score * 0.6 + ml_score * 0.4)
+        return round(overall_score, 2)
+    except:
+        return 0
@@ -0,0 +1,285 @@
+from datetime import datetime
+import logging
+import base64
+import json
+import zlib
+from bson import ObjectId
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Newest first; _id breaks ties between analyses stored in the same millisecond
+HISTORY_SORT = [('created_at', DESCENDING), ('_id', DESCENDING)]
+HISTORY_INDEX = [('user_id', 1), ('created_at', DESCENDING), ('_id', DESCENDING)]
+HISTORY_PROJECTION = {'_id': 1, 'overall_score': 1, 'timestamp': 1, 'created_at': 1}
+
+# Split layout: the summary stays in resume_analyses, these go to the details collection and
+# parsed_data.raw_text goes, compressed, to the raw text collection
+DETAIL_FIELDS = ('parsed_data', 'ml_analysis', 'gemini_analysis')
+SPLIT = 'split'
+
+def compress_text(text, codec='zstd'):
+    """(codec, bytes); falls back to zlib when zstandard is not installed"""
+    data = text.encode('utf-8')
+    if codec == 'zstd' and zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=9).compress(data)
+    return 'zlib', zlib.compress(data, 6)
+
+def decompress_text(codec, data):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed resume text")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return zlib.decompress(data).decode('utf-8')
+
+class InvalidCursor(ValueError):
+    """A history cursor that was not issued by history_page()"""
+
+def encode_cursor(document):
+    """Opaque position after `document` in the history order"""
+    position = {'created_at': document['created_at'].isoformat(), 'id': str(document['_id'])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(position['created_at']), ObjectId(position['id'])
+    except Exception as e:
+        raise InvalidCursor(f"Invalid history cursor: {str(e)}")
+
+class AnalysisStore:
+    """Reads, writes and index setup for stored resume analyses.
+
+    With details and raw text collections, analyses are written split: a slim summary in
+    resume_analyses for history and list views, parsed data and analyses in the details
+    collection, and raw text compressed in its own collection, all under the same _id.
+    Legacy single documents are read as they are, so both layouts can coexist.
+    """
+
+    def __init__(self, collection, details_collection=None, raw_text_collection=None, split_writes=True,
+                 codec='zstd', default_page_size=20, max_page_size=100):
+        self.collection = collection
+        self.details = details_collection
+        self.raw_texts = raw_text_collection
+        self.split_writes = split_writes and details_collection is not None and raw_text_collection is not None
+        self.codec = codec
+        self.default_page_size = default_page_size
+        self.max_page_size = max_page_size
+
+    def ensure_indexes(self):
+        """Backfill created_at on legacy analyses and create the history index"""
+        try:
+            # Older analyses only have a string timestamp; their ObjectId holds the insert time
+            backfilled = self.collection.update_many(
+                {'created_at': {'$exists': False}},
+                [{'$set': {'created_at': {'$toDate': '$_id'}}}]
+            ).modified_count
+            if backfilled:
+                logger.info(f"Backfilled created_at on {backfilled} analyses")
+            self.collection.create_index(HISTORY_INDEX, name='user_history')
+        except Exception as e:
+            logger.warning(f"Analysis index setup failed: {str(e)}")
+
+    def page_size(self, requested):
+        """Clamp a requested page size to 1..max_page_size"""
+        try:
+            size = int(requested) if requested is not None else self.default_page_size
+        except (TypeError, ValueError):
+            size = self.default_page_size
+        return max(1, min(size, self.max_page_size))
+
+    def history_page(self, user_id, limit=None, cursor=None):
+        """One page of the user's analyses, newest first, continuing after `cursor`.
+
+        Keyset pagination: each page is an index range scan starting at the cursor,
+        so deep pages cost the same as the first one.
+        """
+        limit = self.page_size(limit)
+        query = {'user_id': user_id}
+        if cursor:
+            created_at, analysis_id = decode_cursor(cursor)
+            query['$or'] = [
+                {'created_at': {'$lt': created_at}},
+                {'created_at': created_at, '_id': {'$lt': analysis_id}}
+            ]
+
+        # One extra document tells whether another page exists without counting
+        documents = list(self.collection.find(query, HISTORY_PROJECTION).sort(HISTORY_SORT).limit(limit + 1))
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        return {
+            'analyses': documents,
+            'next_cursor': encode_cursor(documents[-1]) if has_more else None,
+            'has_more': has_more
+        }
+
+    def count(self, user_id):
+        """Total analyses for the user; a separate index-only count, only run when asked for"""
+        return self.collection.count_documents({'user_id': user_id})
+
+    def insert(self, document):
+        """Store one analysis and return its id as a string"""
+        return str(self.insert_many([document], ordered=True)[0])
+
+    def insert_many(self, documents, ordered=False):
+        """Store analyses, split when configured; returns the ids that were stored.
+
+        Unordered, documents that fail to insert are left out of the result instead of raising;
+        ordered, any failure raises. Either way no parts of a failed analysis are left behind.
+        """
+        for document in documents:
+            document.setdefault('_id', ObjectId())
+        ids = [document['_id'] for document in documents]
+        if not self.split_writes:
+            failed = self._insert(self.collection, documents, ordered)
+            return [analysis_id for analysis_id in ids if analysis_id not in failed]
+
+        parts = [self._split(document) for document in documents]
+        failed = set()
+        written = []
+        try:
+            # Details and text first, so any summary a reader can see is complete
+            for collection, position in ((self.details, 1), (self.raw_texts, 2), (self.collection, 0)):
+                batch = [part[position] for part in parts if part[position]['_id'] not in failed]
+                if not batch:
+                    break
+                batch_failed = self._insert(collection, batch, ordered)
+                written.append((collection, {part['_id'] for part in batch} - batch_failed))
+                failed |= batch_failed
+        except Exception:
+            self._remove(written, set(ids))
+            raise
+        if failed:
+            self._remove(written, failed)
+        return [analysis_id for analysis_id in ids if analysis_id not in failed]
+
+    def _insert(self, collection, documents, ordered):
+        """Insert documents and return the _ids that failed; raises unless it was a per-document unordered failure"""
+        try:
+            collection.insert_many(documents, ordered=ordered)
+            return set()
+        except BulkWriteError as e:
+            if ordered:
+                raise
+            errors = e.details.get('writeErrors', [])
+            logger.error(f"{len(errors)} of {len(documents)} analysis inserts failed: {errors[0].get('errmsg') if errors else ''}")
+            return {documents[error['index']]['_id'] for error in errors}
+
+    def _remove(self, written, ids):
+        """Delete the parts already written, per (collection, inserted ids), for analyses whose insert failed"""
+        for collection, inserted in written:
+            orphans = list(inserted & ids)
+            if not orphans:
+                continue
+            try:
+                collection.delete_many({'_id': {'$in': orphans}})
+            except Exception as e:
+                logger.error(f"Could not remove partially stored analyses: {str(e)}")
+
+    def _split(self, document):
+        """(summary, details, raw text) documents for one analysis"""
+        summary = {key: value for key, value in document.items() if key not in DETAIL_FIELDS}
+        summary['storage'] = SPLIT
+
+        details = {'_id': document['_id'], 'user_id': document.get('user_id')}
+        for key in DETAIL_FIELDS:
+            if key in document:
+                details[key] = document[key]
+        parsed_data = details.get('parsed_data') or {}
+        raw_text = parsed_data.get('raw_text', '')
+        if 'raw_text' in parsed_data:
+            details['parsed_data'] = {key: value for key, value in parsed_data.items() if key != 'raw_text'}
+
+        codec, data = compress_text(raw_text, self.codec)
+        raw_text_document = {
+            '_id': document['_id'],
+            'user_id': document.get('user_id'),
+            'codec': codec,
+            'size': len(raw_text),
+            'data': data
+        }
+        return summary, details, raw_text_document
+
+    def load(self, analysis_id, user_id, fields=None, include_raw_text=False):
+        """The user's analysis, or None.
+
+        fields limits the result to those dotted paths (every field when None). Raw text is only
+        read when include_raw_text is set or 'parsed_data.raw_text' is among the fields.
+        """
+        return self._find_one({'_id': ObjectId(analysis_id), 'user_id': user_id}, fields, include_raw_text)
+
+    def latest(self, user_id, query=None, fields=None, include_raw_text=False):
+        """The user's most recent analysis matching query, or None"""
+        return self._find_one({'user_id': user_id, **(query or {})}, fields, include_raw_text, sort=HISTORY_SORT)
+
+    def _find_one(self, query, fields, include_raw_text, sort=None):
+        fields = list(fields) if fields is not None else None
+        if fields is not None and 'parsed_data.raw_text' in fields:
+            fields.remove('parsed_data.raw_text')
+            include_raw_text = True
+
+        if fields is None:
+            projection = None if include_raw_text else {'parsed_data.raw_text': 0}
+        else:
+            projection = {field: 1 for field in fields}
+            projection['storage'] = 1
+            if include_raw_text and 'parsed_data' not in projection:
+                projection['parsed_data.raw_text'] = 1
+
+        document = self.collection.find_one(query, projection, sort=sort)
+        if document is None or document.pop('storage', None) != SPLIT:
+            return document
+
+        # Split analysis: only the parts the caller asked for are read
+        wanted = None if fields is None else [field for field in fields if field.split('.')[0] in DETAIL_FIELDS]
+        if wanted is None or wanted:
+            details = self.details.find_one(
+                {'_id': document['_id']},
+                {field: 1 for field in wanted} if wanted else {'_id': 0, 'user_id': 0}
+            ) or {}
+            for key in DETAIL_FIELDS:
+                if key in details:
+                    document[key] = details[key]
+        if include_raw_text:
+            document.setdefault('parsed_data', {})['raw_text'] = self._raw_text(document['_id'])
+        return document
+
+    def _raw_text(self, analysis_id):
+        raw_text = self.raw_texts.find_one({'_id': analysis_id}) if self.raw_texts is not None else None
+        if raw_text is None:
+            return ''
+        return decompress_text(raw_text['codec'], raw_text['data'])
+
+    def iter_raw_texts(self, after_id=None, batch_size=1000):
+        """Yield {'_id', 'user_id', 'raw_text'} for analyses after after_id in _id order, in either layout"""
+        query = {'_id': {'$gt': after_id}} if after_id is not None else {}
+        cursor = self.collection.find(query, {'user_id': 1, 'storage': 1, 'parsed_data.raw_text': 1}).sort('_id', 1)
+
+        batch = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield from self._with_raw_texts(batch)
+                batch = []
+        if batch:
+            yield from self._with_raw_texts(batch)
+
+    def _with_raw_texts(self, documents):
+        split_ids = [document['_id'] for document in documents if document.get('storage') == SPLIT]
+        texts = {}
+        if split_ids and self.raw_texts is not None:
+            for raw_text in self.raw_texts.find({'_id': {'$in': split_ids}}):
+                texts[raw_text['_id']] = decompress_text(raw_text['codec'], raw_text['data'])
+        for document in documents:
+            if document.get('storage') == SPLIT:
+                raw_text = texts.get(document['_id'], '')
+            else:
+                raw_text = document.get('parsed_data', {}).get('raw_text', '')
+            yield {'_id': document['_id'], 'user_id': document.get('user_id'), 'raw_text': raw_text}
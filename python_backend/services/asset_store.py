@@ -0,0 +1,85 @@
+import threading
+import hashlib
+import logging
+import time
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+ASSET_NAME = re.compile(r'^[0-9a-f]{64}\.(png|svg)$')
+
+class AssetStore:
+    """Content-addressed files for rendered chart images, named by the SHA-256 of their bytes.
+
+    A name always refers to the same bytes, so assets are served as immutable and the name
+    doubles as the ETag. Files are kept for retention_days after they were last stored or used.
+    """
+
+    def __init__(self, root='static/visualizations', url_prefix='/api/visualizations', retention_days=30):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip('/')
+        self.retention_seconds = int(retention_days * 86400)
+        os.makedirs(self.root, exist_ok=True)
+
+    def put(self, data, extension):
+        """Store bytes and return the asset name; storing the same bytes again only refreshes it"""
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = self.path(name)
+        if self.touch(name):
+            return name
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a unique temporary name and rename, so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return name
+
+    def path(self, name):
+        """File path of an asset; rejects anything that is not an asset name"""
+        if not ASSET_NAME.match(name):
+            raise ValueError(f"Invalid asset name: {name}")
+        return os.path.join(self.root, name[:2], name)
+
+    def url(self, name):
+        return f"{self.url_prefix}/{name}"
+
+    def touch(self, name):
+        """Mark an asset as used so garbage collection keeps it; False when it no longer exists"""
+        try:
+            os.utime(self.path(name))
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def collect_garbage(self):
+        """Delete assets (and stray temporary files) not stored or used within the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not (ASSET_NAME.match(filename) or filename.endswith('.tmp')):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        if removed:
+            logger.info(f"Removed {removed} visualization assets older than the retention window")
+        return removed
+
+    def start_garbage_collector(self, interval_seconds=3600):
+        """Collect garbage now and then every interval_seconds in a daemon thread"""
+        def run():
+            while True:
+                try:
+                    self.collect_garbage()
+                except Exception as e:
+                    logger.warning(f"Asset garbage collection failed: {str(e)}")
+                time.sleep(interval_seconds)
+
+        threading.Thread(target=run, daemon=True, name='asset-gc').start()
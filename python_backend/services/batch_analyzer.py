@@ -0,0 +1,279 @@
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from io import BytesIO
+import multiprocessing
+import logging
+import zipfile
+import uuid
+import os
+from bson import ObjectId
+from services.analysis_pipeline import calculate_overall_score
+from services.render_service import START_METHOD
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+# Per-process services, created once by the pool initializer
+_worker_parser = None
+_worker_analyzer = None
+
+def _init_worker():
+    """Build the parser and analyzer once per worker process"""
+    global _worker_parser, _worker_analyzer
+    from services.resume_parser import ResumeParser
+    from services.ml_analyzer import MLAnalyzer
+    _worker_parser = ResumeParser()
+    _worker_analyzer = MLAnalyzer()
+
+class _Upload:
+    """Minimal file object accepted by ResumeParser.parse_resume"""
+
+    def __init__(self, filename, data):
+        self.filename = filename
+        self._stream = BytesIO(data)
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def seek(self, offset, whence=0):
+        return self._stream.seek(offset, whence)
+
+def _analyze_upload(filename, data):
+    """Parse and ML-analyze one resume inside a worker process"""
+    try:
+        parsed = _worker_parser.parse_resume(_Upload(filename, data))
+        if not parsed['success']:
+            return {'filename': filename, 'success': False, 'error': parsed.get('error') or parsed.get('message')}
+
+        ml_analysis = _worker_analyzer.analyze_resume(parsed['data'], parsed['document'])
+        return {
+            'filename': filename,
+            'success': True,
+            'parsed_data': parsed['data'],
+            'ml_analysis': ml_analysis
+        }
+    except Exception as e:
+        return {'filename': filename, 'success': False, 'error': str(e)}
+
+def iter_uploads(files, max_entry_bytes=None, max_archive_bytes=None):
+    """Yield (filename, bytes) for each resume, expanding zip archives.
+
+    files holds (filename, bytes or binary file object) pairs; file objects are only read
+    when their turn comes, so a batch holds one upload's bytes at a time. Zip entries are
+    read up to max_entry_bytes each and max_archive_bytes per archive (uncompressed), so an
+    archive cannot expand far past the upload size limit; an entry over a limit is yielded
+    with an error instead of its bytes.
+    """
+    for filename, source in files:
+        if filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(source if hasattr(source, 'read') else BytesIO(source)) as archive:
+                    total = 0
+                    for entry in archive.infolist():
+                        name = entry.filename
+                        if entry.is_dir() or name.startswith('__MACOSX/') or os.path.basename(name).startswith('.'):
+                            continue
+                        if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                            continue
+                        if max_entry_bytes and entry.file_size > max_entry_bytes:
+                            yield name, ValueError(f'File is too large ({entry.file_size} bytes uncompressed)')
+                            continue
+                        if max_archive_bytes and total + entry.file_size > max_archive_bytes:
+                            yield name, ValueError(f'Archive {filename} expands past {max_archive_bytes} bytes')
+                            continue
+                        # The declared size can lie, so never read more than the limit allows
+                        with archive.open(entry) as member:
+                            content = member.read(max_entry_bytes + 1) if max_entry_bytes else member.read()
+                        if max_entry_bytes and len(content) > max_entry_bytes:
+                            yield name, ValueError('File is too large')
+                            continue
+                        total += len(content)
+                        yield name, content
+            except zipfile.BadZipFile as e:
+                yield filename, e
+        else:
+            yield filename, source.read() if hasattr(source, 'read') else source
+
+class BatchAnalyzer:
+    """Fans resume parsing and ML analysis out across a process pool"""
+
+    def __init__(self, workers=None, store=None, insert_batch_size=50, gemini_service=None,
+                 max_entry_bytes=None, max_archive_bytes=None, ml_analyzer=None):
+        self.workers = workers or os.cpu_count() or 2
+        # A zip entry may be as large as a single upload
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv('MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
+        self.max_archive_bytes = max_archive_bytes or int(os.getenv('BATCH_MAX_ARCHIVE_BYTES', str(256 * 1024 * 1024)))
+        self.store = store
+        self.insert_batch_size = insert_batch_size
+        self.gemini_service = gemini_service
+        # Saved analyses are added to this analyzer's similarity corpus, like single uploads
+        self.ml_analyzer = ml_analyzer
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Forking the app's threaded process could hand workers a lock held mid-call
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             mp_context=multiprocessing.get_context(START_METHOD))
+        return self._pool
+
+    def analyze(self, files, user_id=None, with_gemini=False):
+        """Analyze (filename, bytes or file object) pairs, yielding one result per resume as soon as it finishes.
+
+        With with_gemini, parsed resumes are grouped and sent to Gemini several per call, so
+        results are yielded a group at a time. The last item yielded is a summary. Failures are
+        reported inline and never stop the batch; an analysis that could not be saved is
+        reported again, with success False, once its insert batch fails.
+        """
+        with_gemini = with_gemini and self.gemini_service is not None
+        batch_id = uuid.uuid4().hex
+        pool = self._get_pool()
+        pending = {}
+        pending_documents = []
+        gemini_pending = []
+        counts = {'total': 0, 'succeeded': 0, 'failed': 0}
+        uploads = iter_uploads(files, self.max_entry_bytes, self.max_archive_bytes)
+        exhausted = False
+
+        logger.info(f"Starting batch {batch_id} with {self.workers} workers")
+
+        while pending or not exhausted:
+            # Keep a bounded number of resumes in flight so large archives stay out of memory
+            while not exhausted and len(pending) < self.workers * 2:
+                try:
+                    filename, data = next(uploads)
+                except StopIteration:
+                    exhausted = True
+                    break
+                index = counts['total']
+                counts['total'] += 1
+                if isinstance(data, Exception):
+                    counts['failed'] += 1
+                    yield {'index': index, 'filename': filename, 'success': False, 'error': str(data)}
+                    continue
+                pending[pool.submit(_analyze_upload, filename, data)] = (index, filename)
+
+            if not pending:
+                continue
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, filename = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # e.g. a worker process died
+                    result = {'filename': filename, 'success': False, 'error': str(e)}
+
+                if not result['success']:
+                    counts['failed'] += 1
+                    yield {'index': index, **result}
+                    continue
+
+                counts['succeeded'] += 1
+                if not with_gemini:
+                    yield self._complete(index, result, None, user_id, batch_id, pending_documents)
+                else:
+                    gemini_pending.append((index, result))
+                    if len(gemini_pending) >= self.gemini_service.batch_size:
+                        yield from self._complete_with_gemini(gemini_pending, user_id, batch_id, pending_documents)
+                if len(pending_documents) >= self.insert_batch_size:
+                    yield from self._flush(pending_documents, counts)
+
+        if gemini_pending:
+            yield from self._complete_with_gemini(gemini_pending, user_id, batch_id, pending_documents)
+        if pending_documents:
+            yield from self._flush(pending_documents, counts)
+
+        logger.info(f"Batch {batch_id} finished: {counts['succeeded']}/{counts['total']} succeeded")
+        yield {'summary': {'batch_id': batch_id, **counts}}
+
+    def _complete_with_gemini(self, items, user_id, batch_id, pending_documents):
+        """Run one batched Gemini analysis for the buffered results and yield them"""
+        analyses = self.gemini_service.analyze_resumes_batch(
+            [result['parsed_data'] for _, result in items],
+            ids=[index for index, _ in items]
+        )
+        for (index, result), gemini_analysis in zip(items, analyses):
+            yield self._complete(index, result, gemini_analysis, user_id, batch_id, pending_documents)
+        items.clear()
+
+    def _complete(self, index, result, gemini_analysis, user_id, batch_id, pending_documents):
+        """Buffer the analysis for insertion and build the streamed result"""
+        document = self._build_document(result, user_id, batch_id, gemini_analysis)
+        if self.store is not None:
+            pending_documents.append((index, document))
+
+        streamed = {
+            'index': index,
+            'filename': result['filename'],
+            'success': True,
+            'analysis_id': str(document['_id']),
+            'overall_score': document['overall_score'],
+            'personal_info': result['parsed_data'].get('personal_info', {}),
+            'skills': result['parsed_data'].get('skills', []),
+            'ml_analysis': result['ml_analysis']
+        }
+        if gemini_analysis is not None:
+            streamed['gemini_analysis'] = gemini_analysis
+        return streamed
+
+    def _build_document(self, result, user_id, batch_id, gemini_analysis=None):
+        """Shape a batch result like an upload analysis; Gemini is degraded unless it was requested"""
+        if gemini_analysis is None:
+            gemini_analysis = {
+                'error': 'Gemini analysis is not run for batch imports',
+                'score': 0,
+                'degraded': True
+            }
+        degraded_stages = ['gemini_analysis'] if gemini_analysis.get('degraded') else []
+        now = datetime.utcnow()
+        return {
+            '_id': ObjectId(),
+            'user_id': user_id,
+            'batch_id': batch_id,
+            'source_filename': result['filename'],
+            'parsed_data': result['parsed_data'],
+            'ml_analysis': result['ml_analysis'],
+            'gemini_analysis': gemini_analysis,
+            'overall_score': calculate_overall_score(result['ml_analysis'], gemini_analysis),
+            'degraded_stages': degraded_stages,
+            'created_at': now,
+            'timestamp': str(now)
+        }
+
+    def _flush(self, pending_documents, counts):
+        """Bulk-insert buffered (index, document) pairs and index the saved ones for similarity search,
+        yielding an error result for each one not saved"""
+        documents = [document for _, document in pending_documents]
+        try:
+            saved = set(self.store.insert_many(documents, ordered=False))
+        except Exception as e:
+            logger.error(f"Batch insert error: {str(e)}")
+            saved = set()
+
+        if self.ml_analyzer is not None and saved:
+            indexed = [document for _, document in pending_documents if document['_id'] in saved]
+            self.ml_analyzer.index_resumes([str(document['_id']) for document in indexed],
+                                           [document['user_id'] for document in indexed],
+                                           [document['parsed_data'].get('raw_text', '') for document in indexed])
+
+        for index, document in pending_documents:
+            if document['_id'] in saved:
+                continue
+            counts['succeeded'] -= 1
+            counts['failed'] += 1
+            yield {
+                'index': index,
+                'filename': document['source_filename'],
+                'success': False,
+                'analysis_id': str(document['_id']),
+                'error': 'Analysis could not be saved'
+            }
+        pending_documents.clear()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,127 @@
+from collections import deque
+import threading
+import logging
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+class CircuitBreaker:
+    """Error-rate and latency circuit breaker for an external dependency.
+
+    closed:    calls go through; the last `window_size` outcomes are tracked and the circuit
+               opens once at least `min_calls` were seen and the share of failed or slow
+               calls reaches `failure_rate`.
+    open:      calls are refused until `open_seconds` have passed.
+    half_open: one probe call at a time is let through; success closes the circuit,
+               failure re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_rate=None, min_calls=None, window_size=None, open_seconds=None,
+                 slow_call_seconds=None, latency_samples=200):
+        prefix = f'{name.upper()}_CB'
+        self.name = name
+        self.failure_rate = failure_rate or float(os.getenv(f'{prefix}_FAILURE_RATE', '0.5'))
+        self.min_calls = min_calls or int(os.getenv(f'{prefix}_MIN_CALLS', '5'))
+        self.window_size = window_size or int(os.getenv(f'{prefix}_WINDOW', '20'))
+        self.open_seconds = open_seconds or float(os.getenv(f'{prefix}_OPEN_SECONDS', '30'))
+        self.slow_call_seconds = slow_call_seconds or float(os.getenv(f'{prefix}_SLOW_CALL_SECONDS', '20'))
+        self.state = self.CLOSED
+        self.opened_at = None
+        self._outcomes = deque(maxlen=self.window_size)
+        self._latencies = deque(maxlen=latency_samples)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {'calls': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0, 'opened': 0}
+
+    def is_open(self):
+        """True (and counted as a rejected call) while calls would be refused, without taking a
+        half-open probe slot; lets callers fail fast before queuing for a call"""
+        with self._lock:
+            self._maybe_half_open()
+            refused = self.state == self.OPEN or (self.state == self.HALF_OPEN and self._probe_in_flight)
+            self._counters['rejected'] += refused
+            return refused
+
+    def allow(self):
+        """Ask to make one call; in half-open state this claims the single probe slot"""
+        with self._lock:
+            self._maybe_half_open()
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"{self.name} circuit half-open, probing")
+                return True
+            self._counters['rejected'] += 1
+            return False
+
+    def record_success(self, latency):
+        self._record(latency, failed=False)
+
+    def record_failure(self, latency):
+        self._record(latency, failed=True)
+
+    def release(self):
+        """Give back a probe slot for a call that was abandoned before it finished"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _record(self, latency, failed):
+        with self._lock:
+            slow = latency >= self.slow_call_seconds
+            self._counters['calls'] += 1
+            self._counters['failures'] += failed
+            self._counters['slow_calls'] += slow
+            self._latencies.append(latency)
+            self._outcomes.append(failed or slow)
+
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed or slow:
+                    self._open()
+                else:
+                    logger.info(f"{self.name} circuit closed after successful probe")
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+            elif self.state == self.CLOSED and len(self._outcomes) >= self.min_calls \
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._counters['opened'] += 1
+        logger.warning(f"{self.name} circuit opened for {self.open_seconds}s")
+
+    def _maybe_half_open(self):
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            self._maybe_half_open()
+            latencies = sorted(self._latencies)
+            outcomes = list(self._outcomes)
+            stats = {
+                'state': self.state,
+                'failure_rate': round(sum(outcomes) / len(outcomes), 3) if outcomes else 0,
+                **self._counters
+            }
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+        stats['latency_seconds'] = {'p50': percentile(0.5), 'p95': percentile(0.95), 'p99': percentile(0.99),
+                                    'samples': len(latencies)}
+        return stats
@@ -1,64 +1,176 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import base64
-import io
+import hashlib
 import logging
+import json
 from typing import Dict, List, Any
-from wordcloud import WordCloud
-import os
+import threading
+from services.analysis_cache import LRUCache
+from services.render_service import IMAGE_FORMATS, render
 
 logger = logging.getLogger(__name__)
 
+# Chart name -> (version, analysis fields it reads). Bump a chart's version when its output
+# changes so renders cached under the old version are not served.
+CHARTS = {
+    'score_chart': (1, ['ml_analysis.overall_score', 'gemini_analysis.score']),
+    'skills_chart': (1, ['parsed_data.skills']),
+    'radar_chart': (1, ['gemini_analysis.category_scores']),
+    'timeline': (1, ['parsed_data.experience']),
+    'wordcloud': (2, ['parsed_data.skills']),
+    'text_metrics': (1, ['parsed_data.text_analysis']),
+    'industry_fit': (1, ['ml_analysis.industry_classification']),
+    'improvement_areas': (1, ['gemini_analysis.category_scores'])
+}
+
+# Charts rendered into the analysis response; the rest are fetched by name when shown
+DEFAULT_INITIAL_CHARTS = ['score_chart', 'radar_chart', 'skills_chart']
+
+# 'plotly' is the full figure JSON; 'compact' sends only the traces and relies on the layouts
+# from chart_layouts(), which clients fetch once per layout version
+CHART_FORMATS = ('plotly', 'compact')
+
+# Stand-in analysis used to build each chart's reference layout; the layouts carry no data
+LAYOUT_SAMPLE = {
+    'ml_analysis': {'overall_score': 50, 'industry_classification': {'industry_scores': {'technology': 1.0}}},
+    'gemini_analysis': {'score': 50, 'category_scores': {'content_quality': 50}},
+    'parsed_data': {
+        'skills': ['Python'],
+        'experience': [{'title': 'Engineer', 'company': 'Example'}],
+        'text_analysis': {'word_count': 1, 'unique_words': 1, 'sentence_count': 1, 'avg_sentence_length': 1}
+    }
+}
+
 class DataVisualizer:
-    def __init__(self):
-        # Set style for matplotlib
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
+    def __init__(self, initial_charts=None, cache_size=256, render_service=None, image_format='png', asset_store=None,
+                 chart_format='plotly'):
+        self.chart_format = chart_format if chart_format in CHART_FORMATS else 'plotly'
+        self._layouts = None
+        
+        # Matplotlib images are drawn by the render service's worker processes, or inline without one
+        self.render_service = render_service
+        self.image_format = image_format if image_format in IMAGE_FORMATS else 'png'
+        
+        # Images are written to the asset store and returned as URLs; without one they are inlined as data URLs
+        self.asset_store = asset_store
+        
+        self.initial_charts = [name for name in (initial_charts or DEFAULT_INITIAL_CHARTS) if name in CHARTS]
+        
+        # Analyses are never modified after insert, so a render is valid for as long as its chart version
+        self.cache = LRUCache(cache_size)
+        self._counters = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        
+        self._builders = {
+            'score_chart': lambda ml, gemini, parsed: self._create_score_visualization(ml, gemini),
+            'skills_chart': lambda ml, gemini, parsed: self._create_skills_visualization(parsed.get('skills', [])),
+            'radar_chart': lambda ml, gemini, parsed: self._create_radar_chart(gemini.get('category_scores', {})),
+            'timeline': lambda ml, gemini, parsed: self._create_experience_timeline(parsed.get('experience', [])),
+            'wordcloud': lambda ml, gemini, parsed: self._create_skills_wordcloud(parsed.get('skills', [])),
+            'text_metrics': lambda ml, gemini, parsed: self._create_text_metrics_chart(parsed.get('text_analysis', {})),
+            'industry_fit': lambda ml, gemini, parsed: self._create_industry_fit_chart(ml.get('industry_classification', {})),
+            'improvement_areas': lambda ml, gemini, parsed: self._create_improvement_chart(gemini.get('category_scores', {}))
+        }
+    
+    def chart_fields(self, name):
+        """MongoDB projection with just the analysis fields a chart reads"""
+        return {field: 1 for field in CHARTS[name][1]}
+    
+    def cached_chart(self, analysis_id, name, chart_format=None):
+        """Previously rendered chart for this analysis, chart version and format, or None"""
+        chart = self.cache.get(self._cache_key(analysis_id, name, chart_format))
+        if chart is not None and not self._asset_available(chart):
+            chart = None
+        with self._lock:
+            self._counters['hits' if chart is not None else 'misses'] += 1
+        return chart
+    
+    def _cache_key(self, analysis_id, name, chart_format):
+        return (str(analysis_id), name, CHARTS[name][0], chart_format or self.chart_format)
+    
+    def _asset_available(self, chart):
+        """False when a cached image chart points at an asset garbage collection has removed"""
+        if not isinstance(chart, dict) or 'asset' not in chart or self.asset_store is None:
+            return True
+        return self.asset_store.touch(chart['asset'])
+    
+    def create_chart(self, name, analysis_data, analysis_id=None, check_cache=True, chart_format=None):
+        """Render one chart by name, reusing the cached render when the analysis id is known"""
+        chart_format = chart_format or self.chart_format
+        analysis_id = analysis_id or analysis_data.get('_id')
+        if analysis_id is not None and check_cache:
+            chart = self.cached_chart(analysis_id, name, chart_format)
+            if chart is not None:
+                return chart
+        
+        chart = self._build_chart(name, analysis_data)
+        if isinstance(chart, go.Figure):
+            chart = self._compact_figure(name, chart) if chart_format == 'compact' else chart.to_json()
+        
+        # Charts without data (or that failed) come back as None and are cheap to retry
+        if analysis_id is not None and chart is not None:
+            self.cache.set(self._cache_key(analysis_id, name, chart_format), chart)
+        return chart
+    
+    def _build_chart(self, name, analysis_data):
+        return self._builders[name](
+            analysis_data.get('ml_analysis', {}),
+            analysis_data.get('gemini_analysis', {}),
+            analysis_data.get('parsed_data', {})
+        )
+    
+    def chart_layouts(self):
+        """Versioned layouts for compact charts: {'version', 'template', 'layouts': {chart: layout}}"""
+        if self._layouts is None:
+            layouts = {}
+            template = None
+            for name in CHARTS:
+                fig = self._build_chart(name, LAYOUT_SAMPLE)
+                if not isinstance(fig, go.Figure):
+                    continue
+                layout = json.loads(fig.to_json())['layout']
+                template = layout.pop('template', template)
+                layouts[name] = layout
+            body = json.dumps({'template': template, 'layouts': layouts}, sort_keys=True)
+            self._layouts = {
+                'version': hashlib.sha256(body.encode()).hexdigest()[:16],
+                'template': template,
+                'layouts': layouts
+            }
+        return self._layouts
+    
+    def _compact_figure(self, name, fig):
+        """Traces plus a chart id; the layout is only inlined when it differs from the shared one"""
+        reference = self.chart_layouts()
+        figure = json.loads(fig.to_json())
+        layout = figure.get('layout', {})
+        template = layout.pop('template', None)
         
-        # Create output directory for visualizations
-        self.output_dir = 'static/visualizations'
-        os.makedirs(self.output_dir, exist_ok=True)
+        chart = {
+            'type': 'plotly',
+            'format': 'compact',
+            'chart': name,
+            'layout_version': reference['version'],
+            'data': figure.get('data', [])
+        }
+        if layout != reference['layouts'].get(name):
+            chart['layout'] = layout
+        if template != reference['template']:
+            chart.setdefault('layout', layout)['template'] = template
+        return chart
     
-    def create_resume_visualizations(self, analysis_data):
-        """Create comprehensive visualizations for resume analysis"""
+    def create_resume_visualizations(self, analysis_data, charts=None, chart_format=None):
+        """Create visualizations for resume analysis, all charts unless a list of names is given"""
         try:
             logger.info("Creating resume visualizations")
             
             visualizations = {}
-            
-            # Extract data from analysis
-            ml_analysis = analysis_data.get('ml_analysis', {})
-            gemini_analysis = analysis_data.get('gemini_analysis', {})
-            parsed_data = analysis_data.get('parsed_data', {})
-            
-            # 1. Overall Score Visualization
-            visualizations['score_chart'] = self._create_score_visualization(ml_analysis, gemini_analysis)
-            
-            # 2. Skills Analysis
-            visualizations['skills_chart'] = self._create_skills_visualization(parsed_data.get('skills', []))
-            
-            # 3. Category Scores Radar Chart
-            visualizations['radar_chart'] = self._create_radar_chart(gemini_analysis.get('category_scores', {}))
-            
-            # 4. Experience Timeline
-            visualizations['timeline'] = self._create_experience_timeline(parsed_data.get('experience', []))
-            
-            # 5. Skills Word Cloud
-            visualizations['wordcloud'] = self._create_skills_wordcloud(parsed_data.get('skills', []))
-            
-            # 6. Text Analysis Metrics
-            visualizations['text_metrics'] = self._create_text_metrics_chart(parsed_data.get('text_analysis', {}))
-            
-            # 7. Industry Fit Analysis
-            visualizations['industry_fit'] = self._create_industry_fit_chart(ml_analysis.get('industry_classification', {}))
-            
-            # 8. Improvement Areas
-            visualizations['improvement_areas'] = self._create_improvement_chart(gemini_analysis.get('category_scores', {}))
+            for name in (charts if charts is not None else CHARTS):
+                visualizations[name] = self.create_chart(name, analysis_data, chart_format=chart_format)
             
             logger.info("Visualizations created successfully")
             return visualizations
@@ -67,6 +179,15 @@ class DataVisualizer:
             logger.error(f"Visualization creation error: {str(e)}")
             return {'error': str(e)}
     
+    def stats(self):
+        """Render cache counters"""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        counters['entries'] = len(self.cache)
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else 0
+        return counters
+    
     def _create_score_visualization(self, ml_analysis, gemini_analysis):
         """Create overall score comparison visualization"""
         try:
@@ -103,7 +224,7 @@ class DataVisualizer:
                 font={'size': 14}
             )
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Score visualization error: {str(e)}")
@@ -148,7 +269,7 @@ class DataVisualizer:
             
             fig.update_layout(height=400)
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Skills visualization error: {str(e)}")
@@ -187,7 +308,7 @@ class DataVisualizer:
                 height=500
             )
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Radar chart error: {str(e)}")
@@ -221,7 +342,7 @@ class DataVisualizer:
             
             fig.update_layout(height=400)
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Timeline visualization error: {str(e)}")
@@ -233,34 +354,24 @@ class DataVisualizer:
             if not skills:
                 return None
             
-            # Create word frequency dictionary
-            skills_text = ' '.join(skills)
-            
-            # Generate word cloud
-            wordcloud = WordCloud(
-                width=800, 
-                height=400, 
-                background_color='white',
-                colormap='viridis',
-                max_words=50
-            ).generate(skills_text)
-            
-            # Convert to base64 for web display
-            img_buffer = io.BytesIO()
-            plt.figure(figsize=(10, 5))
-            plt.imshow(wordcloud, interpolation='bilinear')
-            plt.axis('off')
-            plt.title('Skills Word Cloud')
-            plt.tight_layout()
-            plt.savefig(img_buffer, format='png', bbox_inches='tight', dpi=150)
-            img_buffer.seek(0)
-            
-            img_base64 = base64.b64encode(img_buffer.read()).decode()
-            plt.close()
+            if self.render_service is not None:
+                image = self.render_service.submit('wordcloud', skills, self.image_format).result()
+            else:
+                image = render('wordcloud', skills, self.image_format)
+            
+            if self.asset_store is not None:
+                asset = self.asset_store.put(image, self.image_format)
+                return {
+                    'type': 'image',
+                    'url': self.asset_store.url(asset),
+                    'asset': asset
+                }
+            
+            img_base64 = base64.b64encode(image).decode()
             
             return {
                 'type': 'image',
-                'data': f"data:image/png;base64,{img_base64}"
+                'data': f"data:{IMAGE_FORMATS[self.image_format]};base64,{img_base64}"
             }
             
         except Exception as e:
@@ -297,7 +408,7 @@ class DataVisualizer:
                 height=400
             )
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Text metrics chart error: {str(e)}")
@@ -317,7 +428,7 @@ class DataVisualizer:
             industries = [item[0] for item in sorted_industries]
             scores = [item[1] for item in sorted_industries]
             
-            fig = px.horizontal_bar(
+            fig = px.bar(
                 x=scores,
                 y=industries,
                 title='Industry Fit Analysis',
@@ -327,7 +438,7 @@ class DataVisualizer:
             
             fig.update_layout(height=400)
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Industry fit chart error: {str(e)}")
@@ -370,7 +481,7 @@ class DataVisualizer:
                 xaxis_tickangle=-45
             )
             
-            return fig.to_json()
+            return fig
             
         except Exception as e:
             logger.error(f"Improvement chart error: {str(e)}")
@@ -0,0 +1,191 @@
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+import asyncio
+import threading
+import hashlib
+import logging
+import json
+import time
+import os
+from services.analysis_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class GeminiResponseCache:
+    """Caches Gemini responses by prompt + generation config and coalesces identical in-flight calls.
+
+    The second tier is MongoDB when a collection is given, otherwise JSON files under cache_dir.
+    """
+
+    def __init__(self, max_entries=512, cache_dir='cache/gemini', collection=None, ttl_days=7):
+        self.memory = LRUCache(max_entries)
+        self.cache_dir = cache_dir
+        self.collection = collection
+        self.ttl_seconds = int(ttl_days * 86400)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'store_hits': 0, 'misses': 0, 'coalesced': 0, 'upstream_calls': 0}
+
+    def ensure_indexes(self):
+        """Create the TTL index for the MongoDB tier"""
+        if self.collection is None:
+            return
+        try:
+            self.collection.create_index('created_at', expireAfterSeconds=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Gemini cache index setup failed: {str(e)}")
+
+    def make_key(self, model_name, prompt, generation_config):
+        """Hash of everything that determines the model's answer"""
+        payload = json.dumps({
+            'model': model_name,
+            'prompt': prompt,
+            'generation_config': generation_config
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """Return a cached response text or None"""
+        text = self.memory.get(key)
+        if text is not None:
+            self._count('memory_hits')
+            return text
+
+        text = self._load(key)
+        if text is not None:
+            self.memory.set(key, text)
+            self._count('store_hits')
+            return text
+
+        self._count('misses')
+        return None
+
+    def set(self, key, text):
+        self.memory.set(key, text)
+        self._store(key, text)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached response, or run compute() once for all concurrent callers of key"""
+        text = self.get(key)
+        if text is not None:
+            return text
+
+        with self._lock:
+            # A leader may have finished between the lookup above and taking the lock
+            text = self.memory.get(key)
+            if text is not None:
+                return text
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._count('coalesced')
+            return future.result()
+
+        try:
+            self._count('upstream_calls')
+            text = compute()
+            if text is not None:
+                self.set(key, text)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def get_or_compute_async(self, key, compute):
+        """Async variant of get_or_compute; compute is a coroutine function.
+
+        Shares the in-flight table with sync callers, so a Flask thread and a coroutine
+        asking for the same prompt still produce a single upstream call.
+        """
+        text = await asyncio.to_thread(self.get, key)
+        if text is not None:
+            return text
+
+        with self._lock:
+            text = self.memory.get(key)
+            if text is not None:
+                return text
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            self._count('coalesced')
+            return await asyncio.wrap_future(future)
+
+        try:
+            self._count('upstream_calls')
+            text = await compute()
+            if text is not None:
+                await asyncio.to_thread(self.set, key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            # Includes cancellation, so waiting followers are released too
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError('Gemini request cancelled'))
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters['memory_entries'] = len(self.memory)
+        counters['in_flight'] = len(self._inflight)
+        return counters
+
+    def _load(self, key):
+        """Read from the persistent tier, ignoring expired entries"""
+        try:
+            if self.collection is not None:
+                document = self.collection.find_one({'_id': key})
+                if document and document['created_at'] > datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                    return document['text']
+                return None
+
+            path = self._path(key)
+            if not os.path.exists(path) or time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['text']
+        except Exception as e:
+            logger.warning(f"Gemini cache read failed: {str(e)}")
+            return None
+
+    def _store(self, key, text):
+        """Write to the persistent tier; failures only cost a future cache miss"""
+        try:
+            if self.collection is not None:
+                self.collection.replace_one(
+                    {'_id': key},
+                    {'_id': key, 'text': text, 'created_at': datetime.utcnow()},
+                    upsert=True
+                )
+                return
+
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text}, f)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Gemini cache write failed: {str(e)}")
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
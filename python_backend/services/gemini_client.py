@@ -0,0 +1,174 @@
+import google.generativeai as genai
+import concurrent.futures
+import threading
+import asyncio
+import logging
+import random
+import time
+import os
+from services.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+def is_rate_limited(error):
+    """True for quota errors (HTTP 429 / ResourceExhausted) from the Gemini SDK or a fake"""
+    return getattr(error, 'code', None) == 429 or type(error).__name__ == 'ResourceExhausted' or '429' in str(error)
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait without blocking the loop until a token is available"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def drain(self):
+        """Empty the bucket after the server reports we are over quota"""
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+class AsyncGeminiClient:
+    """Rate-limited, bounded-concurrency Gemini client running on its own event loop.
+
+    All callers share one loop thread, so the token bucket and concurrency limit are
+    global to the process. Async code awaits generate(); sync code (Flask routes) calls
+    generate_sync(), which blocks only the calling thread, never the retry waits of others.
+    """
+
+    def __init__(self, model, generation_config=None, requests_per_minute=None, max_concurrency=None,
+                 request_timeout=None, base_delay=1.0, max_delay=30.0, breaker=None):
+        self.model = model
+        self.breaker = breaker
+        self.generation_config = generation_config or {}
+        self.requests_per_minute = requests_per_minute or int(os.getenv('GEMINI_RPM', '60'))
+        self.max_concurrency = max_concurrency or int(os.getenv('GEMINI_MAX_CONCURRENCY', '4'))
+        self.request_timeout = request_timeout or float(os.getenv('GEMINI_REQUEST_TIMEOUT', '60'))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0, 'retries': 0}
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    def _get_loop(self):
+        """Start the client's event loop thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    # Loop-bound primitives must be created on the loop that uses them
+                    self._bucket = TokenBucket(self.requests_per_minute / 60, capacity=self.max_concurrency)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name='gemini-client', daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, prompt, max_retries=3, generation_config=None):
+        """Schedule a request on the client loop and return a concurrent.futures.Future"""
+        coroutine = self._generate(prompt, max_retries, generation_config or self.generation_config)
+        return asyncio.run_coroutine_threadsafe(coroutine, self._get_loop())
+
+    async def generate(self, prompt, max_retries=3, generation_config=None):
+        """Await a response from any event loop; cancelling the caller cancels the request"""
+        return await asyncio.wrap_future(self.submit(prompt, max_retries, generation_config))
+
+    def generate_sync(self, prompt, max_retries=3, timeout=None, generation_config=None):
+        """Blocking call for sync code; returns None if every attempt failed or timed out"""
+        future = self.submit(prompt, max_retries, generation_config)
+        try:
+            return future.result(timeout=timeout or self.request_timeout * max_retries + self.max_delay)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error("Gemini request timed out")
+            return None
+
+    def acquire_sync(self):
+        """Take one request slot from the shared token bucket, for calls made outside the client"""
+        loop = self._get_loop()
+        asyncio.run_coroutine_threadsafe(self._bucket.acquire(), loop).result()
+        self.stats['requests'] += 1
+
+    async def _generate(self, prompt, max_retries, generation_config):
+        for attempt in range(max_retries):
+            started = None
+            try:
+                # Checked per attempt so an outage stops retries that are already under way, and
+                # before waiting for a slot so refused calls neither queue nor spend tokens
+                if self.breaker is not None and self.breaker.is_open():
+                    raise CircuitOpenError('Gemini circuit breaker is open')
+                async with self._semaphore:
+                    await self._bucket.acquire()
+                    # The circuit may have opened while waiting; in half-open state this claims the probe
+                    if self.breaker is not None and not self.breaker.allow():
+                        raise CircuitOpenError('Gemini circuit breaker is open')
+                    self.stats['requests'] += 1
+                    logger.info(f"Gemini API attempt {attempt + 1}")
+                    started = time.monotonic()
+                    response = await asyncio.wait_for(self._call_model(prompt, generation_config), self.request_timeout)
+                    # .text raises for blocked responses; read it first so such a call is only
+                    # recorded once, as a failure
+                    text = response.text if response else None
+                    if self.breaker is not None:
+                        self.breaker.record_success(time.monotonic() - started)
+
+                if text:
+                    return text
+                logger.warning(f"Empty response from Gemini on attempt {attempt + 1}")
+
+            except CircuitOpenError:
+                raise
+            except asyncio.CancelledError:
+                if self.breaker is not None and started is not None:
+                    self.breaker.release()
+                raise
+            except Exception as e:
+                if self.breaker is not None and started is not None:
+                    self.breaker.record_failure(time.monotonic() - started)
+                self.stats['errors'] += 1
+                if is_rate_limited(e):
+                    self.stats['rate_limited'] += 1
+                    self._bucket.drain()
+                logger.error(f"Gemini API error on attempt {attempt + 1}: {str(e) or type(e).__name__}")
+
+            if attempt < max_retries - 1:
+                # Full jitter keeps retrying callers from synchronizing after an outage
+                self.stats['retries'] += 1
+                await asyncio.sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt)))
+
+        return None
+
+    async def _call_model(self, prompt, generation_config):
+        """Use the SDK's native async call when available, otherwise a worker thread"""
+        if hasattr(self.model, 'generate_content_async'):
+            return await self.model.generate_content_async(
+                prompt,
+                generation_config=genai.types.GenerationConfig(**generation_config)
+            )
+        return await asyncio.to_thread(self.model.generate_content, prompt, generation_config=generation_config)
+
+    def close(self):
+        with self._loop_lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
@@ -3,27 +3,109 @@ import json
 import logging
 from typing import Dict, Any
 import time
+import hashlib
+import os
+from services.gemini_cache import GeminiResponseCache
+from services.gemini_client import AsyncGeminiClient
+from services.partial_json import PartialJSONObjectParser
+from services.prompt_builder import PromptCompiler
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.section_fingerprints import TEXT_PREFIX
+from services.text_document import TokenizedDocument
 
 logger = logging.getLogger(__name__)
 
+# JSON shape requested from Gemini for every resume analysis
+ANALYSIS_RESPONSE_FORMAT = """{
+    "overall_score": <number between 0-100>,
+    "category_scores": {
+        "content_quality": <0-100>,
+        "structure_format": <0-100>,
+        "skills_relevance": <0-100>,
+        "experience_depth": <0-100>,
+        "achievements_impact": <0-100>,
+        "ats_compatibility": <0-100>
+    },
+    "strengths": [
+        "List specific strengths found in the resume",
+        "Include concrete examples"
+    ],
+    "weaknesses": [
+        "List areas for improvement",
+        "Be specific and actionable"
+    ],
+    "detailed_feedback": {
+        "content": "Detailed feedback on content quality and relevance",
+        "structure": "Feedback on resume structure and formatting",
+        "impact": "Feedback on achievement presentation and quantification",
+        "keywords": "Feedback on keyword usage and ATS optimization"
+    },
+    "recommendations": [
+        "Specific, actionable recommendations for improvement",
+        "Prioritized by impact"
+    ],
+    "industry_fit": {
+        "primary_industry": "Most suitable industry based on resume",
+        "alternative_industries": ["Other suitable industries"],
+        "industry_specific_advice": "Advice for target industry"
+    },
+    "missing_elements": [
+        "Key elements missing from the resume",
+        "Important sections that should be added"
+    ],
+    "keyword_analysis": {
+        "strong_keywords": ["Keywords that stand out positively"],
+        "missing_keywords": ["Important keywords that are missing"],
+        "ats_score": <0-100>
+    },
+    "career_level_assessment": {
+        "experience_level": "Entry/Mid/Senior/Executive",
+        "career_progression": "Assessment of career progression shown",
+        "leadership_indicators": "Evidence of leadership and growth"
+    },
+    "competitive_advantage": [
+        "Unique selling points identified",
+        "Differentiators from other candidates"
+    ]
+}"""
+
 class GeminiService:
-    def __init__(self, api_key):
+    MODEL_NAME = 'gemini-pro'
+    GENERATION_CONFIG = {'temperature': 0.3, 'max_output_tokens': 4000}
+    BATCH_GENERATION_CONFIG = {'temperature': 0.3, 'max_output_tokens': 8192}
+    # Fingerprinted sections Gemini sees -> prompt heading. Free text outside the structured
+    # sections (header, summary, projects...) is tracked by its raw-text span fingerprint.
+    REANALYSIS_SECTIONS = {'personal_info': 'PERSONAL INFORMATION',
+                           'education': 'EDUCATION',
+                           'experience': 'WORK EXPERIENCE',
+                           'skills': 'SKILLS',
+                           'metrics': 'QUANTIFIABLE ACHIEVEMENTS',
+                           TEXT_PREFIX + 'preamble': 'RESUME HEADER TEXT',
+                           TEXT_PREFIX + 'other': 'OTHER SECTIONS TEXT (SUMMARY, PROJECTS, CERTIFICATIONS...)'}
+    REANALYSIS_FIELDS = ('category_scores', 'strengths', 'weaknesses', 'detailed_feedback', 'recommendations',
+                         'industry_fit', 'missing_elements', 'keyword_analysis', 'career_level_assessment',
+                         'competitive_advantage')
+
+    def __init__(self, api_key, response_cache=None):
         self.api_key = api_key
+        self.response_cache = response_cache or GeminiResponseCache()
+        self.breaker = CircuitBreaker('gemini')
+        self.prompt_compiler = PromptCompiler()
+        self.batch_size = int(os.getenv('GEMINI_BATCH_SIZE', '4'))
+        self.batch_compiler = PromptCompiler(token_budget=int(os.getenv('GEMINI_BATCH_ITEM_TOKENS', '800')))
         if api_key:
             genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = genai.GenerativeModel(self.MODEL_NAME)
+            self.client = AsyncGeminiClient(self.model, self.GENERATION_CONFIG, breaker=self.breaker)
         else:
             self.model = None
+            self.client = None
             logger.warning("Gemini API key not provided")
     
     def analyze_resume(self, parsed_data):
         """Analyze resume using Google Gemini AI"""
         if not self.model:
-            return {
-                'error': 'Gemini API not configured',
-                'score': 0,
-                'feedback': 'Gemini AI analysis unavailable'
-            }
+            return self._unavailable_analysis()
         
         try:
             logger.info("Starting Gemini AI analysis")
@@ -33,35 +115,234 @@ class GeminiService:
             
             # Get Gemini response with retry logic
             response = self._get_gemini_response(prompt)
-            
-            if response:
-                # Parse the structured response
-                analysis = self._parse_gemini_response(response)
-                logger.info(f"Gemini analysis completed with score: {analysis.get('score', 0)}")
-                return analysis
-            else:
-                return {
-                    'error': 'Failed to get response from Gemini',
-                    'score': 0,
-                    'feedback': 'AI analysis unavailable'
-                }
+            return self._analysis_from_response(response)
                 
+        except CircuitOpenError:
+            return self._degraded_analysis()
         except Exception as e:
             logger.error(f"Gemini analysis error: {str(e)}")
+            return self._error_analysis(e)
+    
+    def reanalyze_sections(self, parsed_data, previous_analysis, changed_sections):
+        """Update a previous Gemini analysis after some resume sections changed.
+        
+        Only the changed sections are sent, together with the previous assessment. Falls back
+        to a full analysis when there is nothing usable to build on or most sections changed.
+        """
+        changed = self._sections_to_reanalyze(previous_analysis, changed_sections)
+        if changed == []:
+            return self._reused_analysis(previous_analysis)
+        if changed is None or not self.model:
+            return self.analyze_resume(parsed_data)
+        
+        try:
+            logger.info(f"Starting incremental Gemini analysis of sections: {', '.join(changed)}")
+            response = self._get_gemini_response(self._create_reanalysis_prompt(parsed_data, previous_analysis, changed))
+            analysis = self._analysis_from_response(response)
+            if 'error' not in analysis:
+                analysis['recomputed_sections'] = changed
+            return analysis
+        
+        except CircuitOpenError:
+            return self._degraded_analysis()
+        except Exception as e:
+            logger.error(f"Gemini incremental analysis error: {str(e)}")
+            return self._error_analysis(e)
+    
+    def _sections_to_reanalyze(self, previous_analysis, changed_sections):
+        """Changed sections Gemini must see: [] to reuse previous_analysis as is, None for a full analysis"""
+        changed = [section for section in changed_sections if section in self.REANALYSIS_SECTIONS]
+        usable = previous_analysis and 'error' not in previous_analysis and not previous_analysis.get('degraded')
+        # Past half the sections, an update prompt costs about as much as a fresh analysis
+        # and the previous assessment says little about the new resume
+        if not usable or len(changed) * 2 > len(self.REANALYSIS_SECTIONS):
+            return None
+        return changed
+    
+    def _reused_analysis(self, previous_analysis):
+        """The previous analysis, for uploads where nothing Gemini sees changed"""
+        return {key: value for key, value in previous_analysis.items() if key != 'recomputed_sections'}
+    
+    def _create_reanalysis_prompt(self, parsed_data, previous_analysis, changed_sections):
+        """Create a prompt carrying the previous assessment and only the changed sections"""
+        sections, report = self.prompt_compiler.compile(parsed_data, names=changed_sections)
+        spans = [section for section in changed_sections if section.startswith(TEXT_PREFIX)]
+        if spans:
+            # Changed free text shares whatever budget the structured sections left
+            texts = TokenizedDocument(parsed_data.get('raw_text', '')).section_texts
+            budget = (self.prompt_compiler.token_budget - report['total_tokens']) // len(spans)
+            for section in spans:
+                sections[section] = self.prompt_compiler.clip_text(texts[section[len(TEXT_PREFIX):]], budget)
+        previous = {key: previous_analysis.get(key) for key in self.REANALYSIS_FIELDS}
+        previous['overall_score'] = previous_analysis.get('score', 0)
+        changed = '\n\n'.join(f"{self.REANALYSIS_SECTIONS[section]}:\n{sections[section]}"
+                                for section in changed_sections)
+
+        prompt = f"""
+You are an expert resume reviewer and career coach. You previously analyzed this candidate's resume.
+The candidate has since edited the sections below; every other section is unchanged.
+
+PREVIOUS ANALYSIS:
+{json.dumps(previous, separators=(',', ':'), ensure_ascii=False)}
+
+CHANGED SECTIONS:
+{changed}
+
+Update the previous analysis to reflect the changes: adjust the scores, strengths, weaknesses and
+recommendations that concern the changed sections and keep the rest consistent with the previous analysis.
+
+Respond ONLY with the complete updated analysis in the following JSON format:
+
+{ANALYSIS_RESPONSE_FORMAT}
+"""
+        
+        return prompt
+    
+    async def analyze_resume_async(self, parsed_data):
+        """Async variant of analyze_resume for event-loop servers"""
+        if not self.model:
+            return self._unavailable_analysis()
+        
+        try:
+            logger.info("Starting Gemini AI analysis")
+            prompt = self._create_analysis_prompt(parsed_data)
+            response = await self._get_gemini_response_async(prompt)
+            return self._analysis_from_response(response)
+                
+        except CircuitOpenError:
+            return self._degraded_analysis()
+        except Exception as e:
+            logger.error(f"Gemini analysis error: {str(e)}")
+            return self._error_analysis(e)
+    
+    def stream_analysis(self, parsed_data, previous_analysis=None, changed_sections=None):
+        """Stream a Gemini analysis, yielding ('field', {'key', 'value'}) as each top-level
+        field of the JSON answer completes, then ('analysis', parsed result) at the end.
+        
+        With a previous analysis and the sections changed since, this streams the incremental
+        update reanalyze_sections would return.
+        """
+        changed = None
+        if previous_analysis is not None:
+            changed = self._sections_to_reanalyze(previous_analysis, changed_sections or [])
+        if changed == []:
+            yield 'analysis', self._reused_analysis(previous_analysis)
+            return
+        if not self.model:
+            yield 'analysis', self._unavailable_analysis()
+            return
+        
+        try:
+            if changed:
+                logger.info(f"Starting streaming incremental Gemini analysis of sections: {', '.join(changed)}")
+                prompt = self._create_reanalysis_prompt(parsed_data, previous_analysis, changed)
+            else:
+                logger.info("Starting streaming Gemini AI analysis")
+                prompt = self._create_analysis_prompt(parsed_data)
+            key = self.response_cache.make_key(self.MODEL_NAME, prompt, self.GENERATION_CONFIG)
+            parser = PartialJSONObjectParser()
+        
+            cached = self.response_cache.get(key)
+            chunks = [cached] if cached else self._stream_chunks(prompt)
+        
+            parts = []
+            for text in chunks:
+                parts.append(text)
+                for field, value in parser.feed(text):
+                    yield 'field', {'key': field, 'value': value}
+        
+            response = ''.join(parts)
+            if response and not cached:
+                self.response_cache.set(key, response)
+            analysis = self._analysis_from_response(response)
+            if changed and 'error' not in analysis:
+                analysis['recomputed_sections'] = changed
+            yield 'analysis', analysis
+        
+        except CircuitOpenError:
+            yield 'analysis', self._degraded_analysis()
+        except Exception as e:
+            logger.error(f"Gemini streaming analysis error: {str(e)}")
+            yield 'analysis', self._error_analysis(e)
+    
+    def _stream_chunks(self, prompt):
+        """Yield text chunks of a streaming call, reporting time to first chunk to the circuit breaker"""
+        if not self.breaker.allow():
+            raise CircuitOpenError('Gemini circuit breaker is open')
+        self.client.acquire_sync()
+        started = time.monotonic()
+        first_chunk = True
+        try:
+            for chunk in self.model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(**self.GENERATION_CONFIG),
+                stream=True
+            ):
+                if first_chunk:
+                    self.breaker.record_success(time.monotonic() - started)
+                    first_chunk = False
+                yield chunk.text
+            if first_chunk:
+                self.breaker.record_success(time.monotonic() - started)
+        except GeneratorExit:
+            # The consumer stopped reading (e.g. stage timeout); not a Gemini failure
+            if first_chunk:
+                self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure(time.monotonic() - started)
+            raise
+    
+    def _analysis_from_response(self, response):
+        if response:
+            # Parse the structured response
+            analysis = self._parse_gemini_response(response)
+            logger.info(f"Gemini analysis completed with score: {analysis.get('score', 0)}")
+            return analysis
+        else:
             return {
-                'error': str(e),
+                'error': 'Failed to get response from Gemini',
                 'score': 0,
-                'feedback': 'AI analysis failed due to technical error'
+                'feedback': 'AI analysis unavailable'
             }
     
+    def _unavailable_analysis(self):
+        return {
+            'error': 'Gemini API not configured',
+            'score': 0,
+            'feedback': 'Gemini AI analysis unavailable'
+        }
+    
+    def _degraded_analysis(self):
+        """Returned without calling Gemini while its circuit breaker is open"""
+        return {
+            'error': 'Gemini is temporarily unavailable',
+            'score': 0,
+            'feedback': 'AI analysis skipped; showing ML analysis only',
+            'degraded': True
+        }
+    
+    def _error_analysis(self, error):
+        return {
+            'error': str(error),
+            'score': 0,
+            'feedback': 'AI analysis failed due to technical error'
+        }
+    
+    def prompt_fingerprint(self):
+        """Short hash of the analysis prompt template and token budget, used to version cached analyses"""
+        template = f"{self._create_analysis_prompt({})}:{self.prompt_compiler.token_budget}"
+        return hashlib.sha256(template.encode()).hexdigest()[:16]
+    
     def _create_analysis_prompt(self, parsed_data):
         """Create comprehensive analysis prompt for Gemini"""
-        raw_text = parsed_data.get('raw_text', '')
-        personal_info = parsed_data.get('personal_info', {})
-        education = parsed_data.get('education', [])
-        experience = parsed_data.get('experience', [])
-        skills = parsed_data.get('skills', [])
-        metrics = parsed_data.get('metrics', [])
+        return self.build_analysis_prompt(parsed_data)[0]
+    
+    def build_analysis_prompt(self, parsed_data):
+        """Build the analysis prompt and report its estimated tokens per section"""
+        sections, report = self.prompt_compiler.compile(parsed_data)
+        logger.info(f"Gemini prompt data ~{report['total_tokens']} tokens "
+                    f"(experience {report['experience']['items']} kept, {report['experience']['dropped']} dropped)")
         
         prompt = f"""
 You are an expert resume reviewer and career coach with extensive experience in hiring across multiple industries. 
@@ -71,80 +352,29 @@ RESUME DATA:
 =============
 
 PERSONAL INFORMATION:
-{json.dumps(personal_info, indent=2)}
+{sections['personal_info']}
 
 EDUCATION:
-{json.dumps(education, indent=2)}
+{sections['education']}
 
 WORK EXPERIENCE:
-{json.dumps(experience, indent=2)}
+{sections['experience']}
 
 SKILLS:
-{json.dumps(skills, indent=2)}
+{sections['skills']}
 
 QUANTIFIABLE ACHIEVEMENTS:
-{json.dumps(metrics, indent=2)}
+{sections['metrics']}
 
 FULL RESUME TEXT:
-{raw_text[:3000]}  # Limit to avoid token limits
+{sections['raw_text']}
 
 ANALYSIS REQUIREMENTS:
 =====================
 
 Please provide a comprehensive analysis in the following JSON format:
 
-{{
-    "overall_score": <number between 0-100>,
-    "category_scores": {{
-        "content_quality": <0-100>,
-        "structure_format": <0-100>,
-        "skills_relevance": <0-100>,
-        "experience_depth": <0-100>,
-        "achievements_impact": <0-100>,
-        "ats_compatibility": <0-100>
-    }},
-    "strengths": [
-        "List specific strengths found in the resume",
-        "Include concrete examples"
-    ],
-    "weaknesses": [
-        "List areas for improvement",
-        "Be specific and actionable"
-    ],
-    "detailed_feedback": {{
-        "content": "Detailed feedback on content quality and relevance",
-        "structure": "Feedback on resume structure and formatting",
-        "impact": "Feedback on achievement presentation and quantification",
-        "keywords": "Feedback on keyword usage and ATS optimization"
-    }},
-    "recommendations": [
-        "Specific, actionable recommendations for improvement",
-        "Prioritized by impact"
-    ],
-    "industry_fit": {{
-        "primary_industry": "Most suitable industry based on resume",
-        "alternative_industries": ["Other suitable industries"],
-        "industry_specific_advice": "Advice for target industry"
-    }},
-    "missing_elements": [
-        "Key elements missing from the resume",
-        "Important sections that should be added"
-    ],
-    "keyword_analysis": {{
-        "strong_keywords": ["Keywords that stand out positively"],
-        "missing_keywords": ["Important keywords that are missing"],
-        "ats_score": <0-100>
-    }},
-    "career_level_assessment": {{
-        "experience_level": "Entry/Mid/Senior/Executive",
-        "career_progression": "Assessment of career progression shown",
-        "leadership_indicators": "Evidence of leadership and growth"
-    }},
-    "competitive_advantage": [
-        "Unique selling points identified",
-        "Differentiators from other candidates"
-    ]
-}}
+{ANALYSIS_RESPONSE_FORMAT}
 
 EVALUATION CRITERIA:
 ===================
@@ -182,35 +412,156 @@ EVALUATION CRITERIA:
 Please be thorough, specific, and constructive in your analysis. Focus on actionable feedback that will help improve the resume's effectiveness.
 
 Respond ONLY with the JSON format specified above.
+"""
+        
+        return prompt, report
+    
+    def analyze_resumes_batch(self, parsed_resumes, ids=None):
+        """Analyze several resumes with one Gemini call per batch_size resumes.
+        
+        Returns analyses in input order. Items missing or malformed in a batch answer are
+        retried individually through analyze_resume.
+        """
+        if not self.model:
+            return [self._unavailable_analysis() for _ in parsed_resumes]
+        
+        ids = [str(item_id) for item_id in (ids if ids is not None else range(len(parsed_resumes)))]
+        items = list(zip(ids, parsed_resumes))
+        analyses = {}
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            if len(chunk) > 1:
+                analyses.update(self._analyze_chunk(chunk))
+        
+        retry = [(item_id, parsed_data) for item_id, parsed_data in items if item_id not in analyses]
+        if retry:
+            logger.info(f"Retrying {len(retry)} of {len(items)} resumes individually")
+        for item_id, parsed_data in retry:
+            analyses[item_id] = self.analyze_resume(parsed_data)
+        
+        return [analyses[item_id] for item_id in ids]
+    
+    def _analyze_chunk(self, chunk):
+        """One Gemini call for a chunk of (id, parsed_data); returns {id: analysis} for the items it parsed"""
+        try:
+            logger.info(f"Starting batched Gemini analysis of {len(chunk)} resumes")
+            response = self._get_gemini_response(
+                self._create_batch_prompt(chunk),
+                generation_config=self.BATCH_GENERATION_CONFIG
+            )
+            if not response:
+                return {}
+            
+            expected = {item_id for item_id, _ in chunk}
+            analyses = {}
+            for item in self._parse_batch_response(response):
+                if not isinstance(item, dict) or str(item.get('id')) not in expected or 'overall_score' not in item:
+                    continue
+                analysis = self._parse_gemini_response(json.dumps(item))
+                analysis['batched'] = True
+                analyses[str(item['id'])] = analysis
+            return analyses
+            
+        except Exception as e:
+            logger.error(f"Batched Gemini analysis error: {str(e)}")
+            return {}
+    
+    def _create_batch_prompt(self, chunk):
+        """Create a prompt asking for one analysis per resume, returned as a JSON array"""
+        resumes = []
+        for item_id, parsed_data in chunk:
+            sections, _ = self.batch_compiler.compile(parsed_data)
+            resumes.append('{"id":' + json.dumps(item_id) + ',' + ','.join(
+                f'"{name}":' + (json.dumps(text) if name == 'raw_text' else text) for name, text in sections.items()
+            ) + '}')
+        
+        prompt = f"""
+You are an expert resume reviewer and career coach with extensive experience in hiring across multiple industries.
+Analyze each of the following {len(chunk)} resumes independently.
+
+RESUMES (JSON, one object per resume):
+[{','.join(resumes)}]
+
+Respond ONLY with a JSON array containing exactly one object per resume, in the same order, each shaped as:
+
+{{
+    "id": "<id of the resume>",
+    "overall_score": <0-100>,
+    "category_scores": {{"content_quality": <0-100>, "structure_format": <0-100>, "skills_relevance": <0-100>,
+                         "experience_depth": <0-100>, "achievements_impact": <0-100>, "ats_compatibility": <0-100>}},
+    "strengths": ["..."],
+    "weaknesses": ["..."],
+    "detailed_feedback": {{"content": "...", "structure": "...", "impact": "...", "keywords": "..."}},
+    "recommendations": ["..."],
+    "industry_fit": {{"primary_industry": "...", "alternative_industries": ["..."], "industry_specific_advice": "..."}},
+    "missing_elements": ["..."],
+    "keyword_analysis": {{"strong_keywords": ["..."], "missing_keywords": ["..."], "ats_score": <0-100>}},
+    "career_level_assessment": {{"experience_level": "Entry/Mid/Senior/Executive", "career_progression": "...", "leadership_indicators": "..."}},
+    "competitive_advantage": ["..."]
+}}
+
+Weigh content quality 25%, structure 20%, skills relevance 15%, experience depth 20%, achievements 15%
+and ATS compatibility 5%. Keep lists to the 3-5 most important, specific and actionable points.
 """
         
         return prompt
     
-    def _get_gemini_response(self, prompt, max_retries=3):
-        """Get response from Gemini with retry logic"""
-        for attempt in range(max_retries):
+    def _parse_batch_response(self, response_text):
+        """Parse a JSON array of analyses, keeping every item before the first malformed one"""
+        response_text = response_text.strip()
+        if response_text.startswith('```json'):
+            response_text = response_text[7:]
+        if response_text.startswith('```'):
+            response_text = response_text[3:]
+        if response_text.endswith('```'):
+            response_text = response_text[:-3]
+        
+        start = response_text.find('[')
+        if start < 0:
+            return []
+        
+        # Decode item by item so one broken (e.g. truncated) item does not discard the rest
+        decoder = json.JSONDecoder()
+        items = []
+        position = start + 1
+        while position < len(response_text):
+            while position < len(response_text) and response_text[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(response_text) or response_text[position] == ']':
+                break
             try:
-                logger.info(f"Gemini API attempt {attempt + 1}")
-                
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.3,
-                        max_output_tokens=4000,
-                    )
-                )
-                
-                if response and response.text:
-                    return response.text
-                else:
-                    logger.warning(f"Empty response from Gemini on attempt {attempt + 1}")
-                    
-            except Exception as e:
-                logger.error(f"Gemini API error on attempt {attempt + 1}: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                
-        return None
+                item, position = decoder.raw_decode(response_text, position)
+            except ValueError:
+                logger.warning(f"Batched Gemini response is malformed after {len(items)} items")
+                break
+            items.append(item)
+        return items
+    
+    def _get_gemini_response(self, prompt, max_retries=3, generation_config=None):
+        """Get response from Gemini, served from the response cache when the same prompt was seen"""
+        generation_config = generation_config or self.GENERATION_CONFIG
+        key = self.response_cache.make_key(self.MODEL_NAME, prompt, generation_config)
+        
+        def compute():
+            self._check_breaker()
+            return self.client.generate_sync(prompt, max_retries, generation_config=generation_config)
+        
+        return self.response_cache.get_or_compute(key, compute)
+    
+    async def _get_gemini_response_async(self, prompt, max_retries=3):
+        """Async variant of _get_gemini_response; retries back off without blocking a thread"""
+        key = self.response_cache.make_key(self.MODEL_NAME, prompt, self.GENERATION_CONFIG)
+        
+        async def compute():
+            self._check_breaker()
+            return await self.client.generate(prompt, max_retries)
+        
+        return await self.response_cache.get_or_compute_async(key, compute)
+    
+    def _check_breaker(self):
+        """Fail fast while the circuit is open instead of queuing for the client's rate limits"""
+        if self.breaker.is_open():
+            raise CircuitOpenError('Gemini circuit breaker is open')
     
     def _parse_gemini_response(self, response_text):
         """Parse and validate Gemini response"""
@@ -315,9 +666,41 @@ Respond ONLY with the JSON format specified above.
             return {'error': 'Gemini API not configured'}
         
         try:
-            target_info = f"\nTARGET ROLE: {target_role}" if target_role else ""
-            
-            prompt = f"""
+            response = self._get_gemini_response(self._create_career_prompt(parsed_data, target_role))
+            return self._suggestions_from_response(response)
+                
+        except CircuitOpenError:
+            return {'error': 'Gemini is temporarily unavailable', 'degraded': True}
+        except Exception as e:
+            logger.error(f"Career suggestions error: {str(e)}")
+            return {'error': str(e)}
+    
+    async def get_career_suggestions_async(self, parsed_data, target_role=None):
+        """Async variant of get_career_suggestions"""
+        if not self.model:
+            return {'error': 'Gemini API not configured'}
+        
+        try:
+            response = await self._get_gemini_response_async(self._create_career_prompt(parsed_data, target_role))
+            return self._suggestions_from_response(response)
+                
+        except CircuitOpenError:
+            return {'error': 'Gemini is temporarily unavailable', 'degraded': True}
+        except Exception as e:
+            logger.error(f"Career suggestions error: {str(e)}")
+            return {'error': str(e)}
+    
+    def _suggestions_from_response(self, response):
+        if response:
+            return {'suggestions': response}
+        else:
+            return {'error': 'Failed to generate career suggestions'}
+    
+    def _create_career_prompt(self, parsed_data, target_role=None):
+        """Create career suggestions prompt for Gemini"""
+        target_info = f"\nTARGET ROLE: {target_role}" if target_role else ""
+        
+        prompt = f"""
 Based on this resume analysis, provide specific career advice and improvement suggestions:
 
 RESUME SUMMARY:
@@ -335,13 +718,5 @@ Please provide:
 
 Respond in JSON format with actionable advice.
 """
-            
-            response = self._get_gemini_response(prompt)
-            if response:
-                return {'suggestions': response}
-            else:
-                return {'error': 'Failed to generate career suggestions'}
-                
-        except Exception as e:
-            logger.error(f"Career suggestions error: {str(e)}")
-            return {'error': str(e)}
+        
+        return prompt
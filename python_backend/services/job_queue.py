@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+import logging
+import copy
+import uuid
+import os
+
+logger = logging.getLogger(__name__)
+
+class JobBackend:
+    """Storage and dispatch interface for background jobs"""
+
+    def save_job(self, job):
+        raise NotImplementedError
+
+    def load_job(self, job_id):
+        raise NotImplementedError
+
+    def update_job(self, job_id, changes):
+        raise NotImplementedError
+
+    def dispatch(self, func, *args):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+class InProcessJobBackend(JobBackend):
+    """Default backend: a thread pool plus an in-memory job table"""
+
+    def __init__(self, max_workers=4, retention_hours=24):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='resume-job')
+        self.retention = timedelta(hours=retention_hours)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save_job(self, job):
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job['job_id']] = job
+
+    def load_job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def update_job(self, job_id, changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            for key, value in changes.items():
+                # Dotted keys update nested fields, e.g. 'stages.parse.status'
+                target = job
+                parts = key.split('.')
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                target[parts[-1]] = value
+            job['updated_at'] = datetime.utcnow().isoformat()
+
+    def dispatch(self, func, *args):
+        self.executor.submit(func, *args)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def _evict_expired(self):
+        """Drop finished jobs older than the retention window"""
+        cutoff = (datetime.utcnow() - self.retention).isoformat()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['status'] in ('completed', 'failed') and job['updated_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+JOB_BACKENDS = {
+    'inprocess': InProcessJobBackend
+}
+
+def create_job_backend(name=None, **options):
+    """Create a job backend by name (JOB_BACKEND env var, defaults to in-process)"""
+    name = (name or os.getenv('JOB_BACKEND', 'inprocess')).lower()
+    if name not in JOB_BACKENDS:
+        raise ValueError(f"Unknown job backend: {name}")
+    return JOB_BACKENDS[name](**options)
+
+class JobQueue:
+    """Tracks multi-stage jobs and runs them on a pluggable backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_job_backend(
+            max_workers=int(os.getenv('JOB_WORKERS', '4'))
+        )
+
+    def enqueue(self, user_id, stages, func, *args):
+        """Queue func(*args, on_stage) and return the new job id"""
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow().isoformat()
+
+        self.backend.save_job({
+            'job_id': job_id,
+            'user_id': user_id,
+            'status': 'queued',
+            'stages': {stage: {'status': 'pending'} for stage in stages},
+            'results': {},
+            'error': None,
+            'created_at': now,
+            'updated_at': now
+        })
+        self.backend.dispatch(self._run, job_id, func, args)
+
+        logger.info(f"Queued job {job_id} for user: {user_id}")
+        return job_id
+
+    def get(self, job_id, user_id=None):
+        """Return the job record, optionally restricted to its owner"""
+        job = self.backend.load_job(job_id)
+        if job and user_id is not None and job['user_id'] != user_id:
+            return None
+        return job
+
+    def _run(self, job_id, func, args):
+        """Execute a job, recording stage transitions and partial results"""
+        self.backend.update_job(job_id, {'status': 'running'})
+
+        def on_stage(stage, status, result=None):
+            changes = {
+                f'stages.{stage}.status': status,
+                f'stages.{stage}.{"started_at" if status == "running" else "finished_at"}': datetime.utcnow().isoformat()
+            }
+            if result is not None:
+                changes[f'results.{stage}'] = result
+            self.backend.update_job(job_id, changes)
+
+        try:
+            outcome = func(*args, on_stage)
+            if outcome.get('success'):
+                self.backend.update_job(job_id, {'status': 'completed', 'analysis_id': outcome.get('analysis_id')})
+            else:
+                self.backend.update_job(job_id, {'status': 'failed', 'error': outcome.get('message')})
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            changes = {'status': 'failed', 'error': str(e)}
+            job = self.backend.load_job(job_id) or {}
+            for stage, state in job.get('stages', {}).items():
+                if state['status'] == 'running':
+                    changes[f'stages.{stage}.status'] = 'failed'
+            self.backend.update_job(job_id, changes)
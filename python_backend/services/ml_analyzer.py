@@ -5,14 +5,34 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+from scipy.sparse import csr_matrix
+from collections import Counter
 import re
 import logging
 from typing import Dict, List, Any
 import joblib
 import os
+from services.text_document import TokenizedDocument
+from services.resume_corpus import ResumeCorpus
+from services.patterns import PATTERNS, QUANTIFIABLE_PATTERNS
+from services.section_fingerprints import TEXT_PREFIX
+from services.section_segmenter import SECTION_NAMES
 
 logger = logging.getLogger(__name__)
 
+_single_token = re.compile(r'\w+')
+
+# Column order of the numeric features returned per resume
+FEATURE_COLUMNS = [
+    'text_length', 'word_count', 'line_count', 'experience_count', 'total_experience_mentions',
+    'education_count', 'degree_mentions', 'skills_count', 'technical_skills_count',
+    'contact_info_completeness', 'flesch_reading_ease', 'gunning_fog', 'quantifiable_achievements'
+]
+
+# Fingerprints of every section's span of the raw text; text length, word counts, readability
+# and keyword counts all read the whole text
+RAW_TEXT = tuple(TEXT_PREFIX + name for name in ('preamble',) + SECTION_NAMES)
+
 class MLAnalyzer:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
@@ -20,6 +40,9 @@ class MLAnalyzer:
         self.models_path = 'models'
         os.makedirs(self.models_path, exist_ok=True)
         
+        # Persisted TF-IDF index over stored resumes for similarity queries
+        self.corpus = ResumeCorpus(self.models_path)
+        
         # Industry-specific keywords for classification
         self.industry_keywords = {
             'Technology': ['software', 'programming', 'developer', 'engineer', 'python', 'java', 'javascript', 'react', 'angular', 'node.js', 'database', 'api', 'cloud', 'aws', 'azure'],
@@ -34,145 +57,345 @@ class MLAnalyzer:
         # Quality indicators
         self.quality_indicators = {
             'action_words': ['achieved', 'improved', 'increased', 'developed', 'managed', 'led', 'created', 'implemented', 'optimized', 'designed'],
-            'quantifiable_results': [r'\d+%', r'\$\d+', r'\d+\s*million', r'\d+\s*thousand', r'\d+\s*years?', r'\d+\s*people'],
+            'quantifiable_results': [pattern for _, pattern in QUANTIFIABLE_PATTERNS],
             'technical_skills': ['programming', 'software', 'database', 'framework', 'algorithm', 'architecture', 'development']
         }
         
-    def analyze_resume(self, parsed_data):
-        """Comprehensive ML analysis of resume data"""
-        try:
-            logger.info("Starting ML analysis of resume")
-            
-            # Extract features
-            features = self._extract_features(parsed_data)
-            
-            # Perform different types of analysis
-            analysis = {
-                'features': features,
-                'industry_classification': self._classify_industry(parsed_data),
-                'quality_score': self._calculate_quality_score(parsed_data),
-                'skills_analysis': self._analyze_skills(parsed_data),
-                'experience_analysis': self._analyze_experience(parsed_data),
-                'education_analysis': self._analyze_education(parsed_data),
-                'text_complexity': self._analyze_text_complexity(parsed_data),
-                'keyword_relevance': self._analyze_keyword_relevance(parsed_data),
-                'recommendations': self._generate_ml_recommendations(parsed_data)
-            }
-            
-            # Calculate overall ML score
-            analysis['overall_score'] = self._calculate_overall_ml_score(analysis)
-            
+        # Common ATS keywords
+        self.ats_keywords = [
+            'experience', 'skills', 'education', 'achievements', 'results',
+            'leadership', 'management', 'development', 'project', 'team',
+            'analysis', 'communication', 'problem solving', 'innovation'
+        ]
+        
+        self._build_keyword_vocabulary()
+        
+    # Sections each sub-analysis reads (see section_fingerprints)
+    ANALYSIS_DEPENDENCIES = {
+        'features': RAW_TEXT + ('personal_info', 'education', 'experience', 'skills', 'metrics'),
+        'industry_classification': RAW_TEXT,
+        'quality_score': RAW_TEXT + ('personal_info', 'education', 'experience', 'skills'),
+        'skills_analysis': ('skills',),
+        'experience_analysis': ('experience',),
+        'education_analysis': ('education',),
+        'text_complexity': RAW_TEXT,
+        'keyword_relevance': RAW_TEXT,
+        'recommendations': RAW_TEXT + ('experience', 'skills', 'metrics')
+    }
+    
+    # Sub-analyses computed from the keyword scan in _vectorize
+    VECTORIZED_ANALYSES = ('features', 'industry_classification', 'quality_score', 'keyword_relevance')
+    
+    def analyze_resume(self, parsed_data, document=None, previous=None, changed_sections=None):
+        """Comprehensive ML analysis of resume data.
+        
+        Pass the TokenizedDocument built by ResumeParser to avoid re-scanning raw_text.
+        With the user's previous ML analysis and the list of changed sections, sub-analyses
+        whose inputs did not change are copied from previous instead of recomputed, and only
+        the changed spans of the raw text are scanned for keywords.
+        """
+        logger.info("Starting ML analysis of resume")
+        analysis = self.analyze_resumes([parsed_data], [document], [previous], [changed_sections])[0]
+        if 'error' not in analysis:
             logger.info(f"ML analysis completed with score: {analysis['overall_score']}")
-            return analysis
-            
-        except Exception as e:
-            logger.error(f"ML analysis error: {str(e)}")
-            return {
-                'error': str(e),
-                'overall_score': 0,
-                'recommendations': ['Unable to analyze resume due to processing error']
-            }
+        return analysis
     
-    def _extract_features(self, parsed_data):
-        """Extract numerical features from parsed resume data"""
-        features = {}
-        
-        # Text-based features
-        raw_text = parsed_data.get('raw_text', '')
-        features['text_length'] = len(raw_text)
-        features['word_count'] = len(raw_text.split())
-        features['line_count'] = len(raw_text.split('\n'))
-        
-        # Experience features
-        experience = parsed_data.get('experience', [])
-        features['experience_count'] = len(experience)
-        features['total_experience_mentions'] = sum(1 for exp in experience if exp.get('title'))
+    def analyze_resumes(self, parsed_resumes, documents=None, previous=None, changed_sections=None):
+        """ML analysis of many resumes at once.
+        
+        Keyword-driven features are computed for the whole batch from one feature matrix;
+        the optional lists documents, previous and changed_sections line up with parsed_resumes.
+        """
+        count = len(parsed_resumes)
+        if not count:
+            return []
+        documents = [document or TokenizedDocument(parsed_data.get('raw_text', ''))
+                     for parsed_data, document in zip(parsed_resumes, documents or [None] * count)]
+        changed_sections = changed_sections or [None] * count
+        previous = [prior if prior and 'error' not in prior and changed is not None else None
+                    for prior, changed in zip(previous or [None] * count, changed_sections)]
         
-        # Education features
-        education = parsed_data.get('education', [])
-        features['education_count'] = len(education)
-        features['degree_mentions'] = sum(1 for edu in education if edu.get('degree'))
-        
-        # Skills features
-        skills = parsed_data.get('skills', [])
-        features['skills_count'] = len(skills)
-        features['technical_skills_count'] = len([s for s in skills if any(tech in s.lower() for tech in self.quality_indicators['technical_skills'])])
-        
-        # Personal info completeness
-        personal_info = parsed_data.get('personal_info', {})
-        features['contact_info_completeness'] = sum(1 for key in ['email', 'phone', 'name'] if personal_info.get(key))
-        
-        # Readability features
-        readability = parsed_data.get('readability', {})
-        features['flesch_reading_ease'] = readability.get('flesch_reading_ease', 0)
-        features['gunning_fog'] = readability.get('gunning_fog', 0)
-        
-        # Metrics features
-        metrics = parsed_data.get('metrics', [])
-        features['quantifiable_achievements'] = len(metrics)
-        
-        return features
+        try:
+            if all(self._reused(name, prior, changed) for prior, changed in zip(previous, changed_sections)
+                   for name in self.VECTORIZED_ANALYSES):
+                # No span of the raw text changed, so the keyword scan would reproduce previous
+                vectorized = {'span_stats': [prior.get('span_stats') for prior in previous]}
+            else:
+                rows, features, counts, quantifiable, span_stats = self._vectorize(
+                    parsed_resumes, documents, previous, changed_sections)
+                vectorized = {
+                    'features': rows,
+                    'industry_classification': self._classify_industries(counts),
+                    'quality_score': self._calculate_quality_scores(features, counts, quantifiable),
+                    'keyword_relevance': self._analyze_keyword_relevance(features, counts),
+                    'span_stats': span_stats
+                }
+        except Exception as e:
+            if count > 1:
+                # Isolate the malformed resume(s) instead of failing the whole batch
+                logger.warning(f"Batch feature extraction failed, analyzing resumes one by one: {str(e)}")
+                return [self.analyze_resumes([parsed_data], [document], [prior], [changed])[0]
+                        for parsed_data, document, prior, changed in zip(parsed_resumes, documents, previous, changed_sections)]
+            logger.error(f"ML feature extraction error: {str(e)}")
+            return [self._error_analysis(e)]
+        
+        analyses = []
+        for index, parsed_data in enumerate(parsed_resumes):
+            try:
+                analyses.append(self._assemble_analysis(parsed_data, {name: values[index] for name, values in vectorized.items()},
+                                                        previous[index], changed_sections[index]))
+            except Exception as e:
+                logger.error(f"ML analysis error: {str(e)}")
+                analyses.append(self._error_analysis(e))
+        return analyses
     
-    def _classify_industry(self, parsed_data):
-        """Classify resume into industry categories"""
-        raw_text = parsed_data.get('raw_text', '').lower()
-        industry_scores = {}
-        
-        for industry, keywords in self.industry_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in raw_text)
-            industry_scores[industry] = score
-        
-        # Find top industries
-        sorted_industries = sorted(industry_scores.items(), key=lambda x: x[1], reverse=True)
-        
-        return {
-            'primary_industry': sorted_industries[0][0] if sorted_industries[0][1] > 0 else 'General',
-            'industry_scores': dict(sorted_industries),
-            'confidence': sorted_industries[0][1] / max(sum(industry_scores.values()), 1)
+    def extract_feature_matrix(self, parsed_resumes, documents=None):
+        """Numeric features of many resumes as a DataFrame, one row per resume, keyword counts included"""
+        documents = documents or [TokenizedDocument(parsed_data.get('raw_text', '')) for parsed_data in parsed_resumes]
+        _, features, counts, _, _ = self._vectorize(parsed_resumes, documents)
+        return pd.DataFrame(features).join(pd.DataFrame(counts, columns=self.keyword_vocabulary))
+    
+    def _assemble_analysis(self, parsed_data, vectorized, previous, changed_sections):
+        """Combine one resume's row of batch features with its per-resume sub-analyses"""
+        analysis = {}
+        computations = {
+            'features': lambda: vectorized['features'],
+            'industry_classification': lambda: vectorized['industry_classification'],
+            'quality_score': lambda: vectorized['quality_score'],
+            'skills_analysis': lambda: self._analyze_skills(parsed_data),
+            'experience_analysis': lambda: self._analyze_experience(parsed_data),
+            'education_analysis': lambda: self._analyze_education(parsed_data),
+            'text_complexity': lambda: self._analyze_text_complexity(parsed_data),
+            'keyword_relevance': lambda: vectorized['keyword_relevance'],
+            'recommendations': lambda: self._generate_ml_recommendations(
+                parsed_data, analysis['features'], analysis['industry_classification'])
         }
+        recomputed = []
+        for name, compute in computations.items():
+            if self._reused(name, previous, changed_sections):
+                analysis[name] = previous[name]
+            else:
+                analysis[name] = compute()
+                recomputed.append(name)
+        if previous is not None:
+            analysis['recomputed'] = recomputed
+        if vectorized['span_stats']:
+            analysis['span_stats'] = vectorized['span_stats']
+        
+        # Calculate overall ML score
+        analysis['overall_score'] = self._calculate_overall_ml_score(analysis)
+        return analysis
     
-    def _calculate_quality_score(self, parsed_data):
-        """Calculate resume quality score using ML features"""
-        raw_text = parsed_data.get('raw_text', '').lower()
-        score_components = {}
-        
-        # Action words score (0-25 points)
-        action_word_count = sum(1 for word in self.quality_indicators['action_words'] if word in raw_text)
-        score_components['action_words'] = min(action_word_count * 3, 25)
-        
-        # Quantifiable results score (0-25 points)
-        quantifiable_count = sum(1 for pattern in self.quality_indicators['quantifiable_results'] 
-                                if re.search(pattern, raw_text))
-        score_components['quantifiable_results'] = min(quantifiable_count * 5, 25)
-        
-        # Technical skills score (0-20 points)
-        tech_skills = parsed_data.get('skills', [])
-        tech_score = min(len(tech_skills) * 2, 20)
-        score_components['technical_skills'] = tech_score
-        
-        # Experience depth score (0-15 points)
-        experience = parsed_data.get('experience', [])
-        exp_score = min(len(experience) * 3, 15)
-        score_components['experience_depth'] = exp_score
-        
-        # Education score (0-10 points)
-        education = parsed_data.get('education', [])
-        edu_score = min(len(education) * 5, 10)
-        score_components['education'] = edu_score
-        
-        # Contact completeness score (0-5 points)
-        personal_info = parsed_data.get('personal_info', {})
-        contact_score = sum(1 for key in ['email', 'phone', 'name'] if personal_info.get(key))
-        score_components['contact_completeness'] = contact_score
-        
-        total_score = sum(score_components.values())
-        
+    def _reused(self, name, previous, changed_sections):
+        """Whether sub-analysis name can be copied from the previous analysis"""
+        return previous is not None and name in previous and \
+            not any(section in changed_sections for section in self.ANALYSIS_DEPENDENCIES[name])
+    
+    def _error_analysis(self, error):
         return {
-            'total_score': total_score,
-            'components': score_components,
-            'grade': self._score_to_grade(total_score)
+            'error': str(error),
+            'overall_score': 0,
+            'recommendations': ['Unable to analyze resume due to processing error']
         }
     
+    def index_resume(self, analysis_id, user_id, raw_text):
+        """Add a stored analysis to the similarity corpus"""
+        self.index_resumes([analysis_id], [user_id], [raw_text])
+    
+    def index_resumes(self, analysis_ids, user_ids, raw_texts):
+        """Add stored analyses to the similarity corpus in one pass"""
+        try:
+            self.corpus.partial_fit(raw_texts, analysis_ids, user_ids)
+        except Exception as e:
+            logger.error(f"Corpus indexing error: {str(e)}")
+    
+    def find_similar_resumes(self, raw_text, k=5, user_id=None, exclude_id=None):
+        """Find the k stored resumes most similar to raw_text"""
+        return self.corpus.most_similar(raw_text, k=k, user_id=user_id,
+                                        exclude_ids=[exclude_id] if exclude_id else None)
+    
+    def match_job_description(self, job_description, resume_text=None, k=10, user_id=None):
+        """Score one resume against a job description, or rank stored resumes for it"""
+        if resume_text is not None:
+            return self.corpus.score_against_job(resume_text, job_description)
+        return {'matches': self.corpus.match_job_description(job_description, k=k, user_id=user_id)}
+    
+    def _build_keyword_vocabulary(self):
+        """Fixed vocabulary shared by every keyword-count feature, with the column lookups derived from it"""
+        keywords = {keyword for keywords in self.industry_keywords.values() for keyword in keywords}
+        keywords.update(self.quality_indicators['action_words'], self.ats_keywords)
+        words = sorted(keyword for keyword in keywords if _single_token.fullmatch(keyword))
+        phrases = sorted((keyword for keyword in keywords if not _single_token.fullmatch(keyword)), key=lambda p: (-len(p), p))
+        
+        self.keyword_vocabulary = words + phrases
+        self.keyword_index = {keyword: column for column, keyword in enumerate(self.keyword_vocabulary)}
+        self._vocabulary_words = frozenset(words)
+        # Longest phrases first so the alternation prefers them at a shared position
+        self._phrase_pattern = re.compile('|'.join(re.escape(phrase) for phrase in phrases))
+        
+        # Keyword -> industry membership, so industry scores are one matrix product
+        self.industry_names = list(self.industry_keywords)
+        self.industry_matrix = np.zeros((len(self.keyword_vocabulary), len(self.industry_names)), dtype=np.int64)
+        for column, keywords in enumerate(self.industry_keywords.values()):
+            for keyword in keywords:
+                self.industry_matrix[self.keyword_index[keyword], column] = 1
+        
+        self.action_columns = [self.keyword_index[word] for word in self.quality_indicators['action_words']]
+        self.ats_columns = [self.keyword_index[keyword] for keyword in self.ats_keywords]
+        self._technical_pattern = re.compile('|'.join(re.escape(term) for term in self.quality_indicators['technical_skills']))
+        self._quantifiable_kinds = [kind for kind, _ in QUANTIFIABLE_PATTERNS]
+    
+    def _vectorize(self, parsed_resumes, documents, previous=None, changed_sections=None):
+        """Return (feature dicts, {feature: column array}, keyword count matrix, quantifiable pattern hits,
+        per-span stats).
+        
+        Plain NumPy columns rather than a DataFrame: pandas' per-call overhead would dominate
+        single-resume uploads, which go through this same path. With previous analyses and
+        changed sections, the stats of unchanged spans are carried over instead of rescanned.
+        """
+        previous = previous or [None] * len(documents)
+        changed_sections = changed_sections or [None] * len(documents)
+        span_stats = [self._span_stats(document, prior.get('span_stats') if prior else None, changed)
+                      for document, prior, changed in zip(documents, previous, changed_sections)]
+        counts = self._keyword_counts(span_stats).toarray()
+        
+        rows = []
+        for parsed_data, document in zip(parsed_resumes, documents):
+            experience = parsed_data.get('experience', [])
+            education = parsed_data.get('education', [])
+            skills = parsed_data.get('skills', [])
+            personal_info = parsed_data.get('personal_info', {})
+            readability = parsed_data.get('readability', {})
+            rows.append({
+                'text_length': len(document.text),
+                'word_count': document.whitespace_words,
+                'line_count': document.text.count('\n') + 1,
+                'experience_count': len(experience),
+                'total_experience_mentions': sum(1 for exp in experience if exp.get('title')),
+                'education_count': len(education),
+                'degree_mentions': sum(1 for edu in education if edu.get('degree')),
+                'skills_count': len(skills),
+                'technical_skills_count': sum(1 for skill in skills if self._technical_pattern.search(skill.lower())),
+                'contact_info_completeness': sum(1 for key in ['email', 'phone', 'name'] if personal_info.get(key)),
+                'flesch_reading_ease': readability.get('flesch_reading_ease', 0),
+                'gunning_fog': readability.get('gunning_fog', 0),
+                'quantifiable_achievements': len(parsed_data.get('metrics', []))
+            })
+        features = {column: np.array([row[column] for row in rows]) for column in FEATURE_COLUMNS}
+        
+        quantifiable = np.zeros((len(documents), len(self._quantifiable_kinds)), dtype=bool)
+        for row, stats in enumerate(span_stats):
+            found = {kind for span in stats.values() for kind in span['quantifiable']}
+            quantifiable[row] = [kind in found for kind in self._quantifiable_kinds]
+        return rows, features, counts, quantifiable, span_stats
+    
+    def _span_stats(self, document, previous_stats=None, changed_sections=None):
+        """Keyword counts and quantifiable result kinds found in each section's span of the raw text.
+        
+        Single words are counted as whole tokens and phrases as substrings, the same rules
+        TokenizedDocument.count applies. Spans whose fingerprint is not in changed_sections
+        are copied from previous_stats.
+        """
+        stats = {}
+        for name, text in document.section_texts.items():
+            if previous_stats and name in previous_stats and changed_sections is not None and \
+                    TEXT_PREFIX + name not in changed_sections:
+                stats[name] = previous_stats[name]
+                continue
+            if not text:
+                stats[name] = {'keywords': [], 'quantifiable': []}
+                continue
+            lower = text.lower()
+            counts = Counter(filter(self._vocabulary_words.__contains__, _single_token.findall(lower)))
+            counts.update(self._phrase_pattern.findall(lower))
+            # Pairs rather than a dict, since keywords like 'node.js' are not valid MongoDB field names
+            stats[name] = {
+                'keywords': sorted(counts.items()),
+                'quantifiable': sorted(PATTERNS.kinds_found('quantifiable', lower, self._quantifiable_kinds))
+            }
+        return stats
+    
+    def _keyword_counts(self, span_stats):
+        """Sparse resumes x keyword_vocabulary count matrix, in the manner of CountVectorizer.transform,
+        summed over each resume's span stats"""
+        indices = []
+        data = []
+        indptr = [0]
+        for stats in span_stats:
+            totals = Counter()
+            for span in stats.values():
+                totals.update({keyword: count for keyword, count in span['keywords']})
+            for keyword, count in totals.items():
+                # Stats carried over from before a vocabulary change may hold dropped keywords
+                if keyword in self.keyword_index:
+                    indices.append(self.keyword_index[keyword])
+                    data.append(count)
+            indptr.append(len(indices))
+        return csr_matrix((data, indices, indptr), shape=(len(span_stats), len(self.keyword_vocabulary)), dtype=np.int64)
+    
+    def _classify_industries(self, counts):
+        """Classify each resume into industry categories"""
+        industry_scores = ((counts > 0).astype(np.int64) @ self.industry_matrix).tolist()
+        classifications = []
+        for scores in industry_scores:
+            # Find top industries
+            sorted_industries = sorted(zip(self.industry_names, scores), key=lambda x: x[1], reverse=True)
+            classifications.append({
+                'primary_industry': sorted_industries[0][0] if sorted_industries[0][1] > 0 else 'General',
+                'industry_scores': dict(sorted_industries),
+                'confidence': sorted_industries[0][1] / max(sum(scores), 1)
+            })
+        return classifications
+    
+    def _calculate_quality_scores(self, features, counts, quantifiable):
+        """Calculate each resume's quality score from the batch features"""
+        components = {
+            # Action words score (0-25 points)
+            'action_words': np.minimum((counts[:, self.action_columns] > 0).sum(axis=1) * 3, 25),
+            # Quantifiable results score (0-25 points)
+            'quantifiable_results': np.minimum(quantifiable.sum(axis=1) * 5, 25),
+            # Technical skills score (0-20 points)
+            'technical_skills': np.minimum(features['skills_count'] * 2, 20),
+            # Experience depth score (0-15 points)
+            'experience_depth': np.minimum(features['experience_count'] * 3, 15),
+            # Education score (0-10 points)
+            'education': np.minimum(features['education_count'] * 5, 10),
+            # Contact completeness score (0-5 points)
+            'contact_completeness': features['contact_info_completeness']
+        }
+        
+        scores = []
+        for values in zip(*(column.tolist() for column in components.values())):
+            score_components = dict(zip(components, values))
+            total_score = sum(values)
+            scores.append({
+                'total_score': total_score,
+                'components': score_components,
+                'grade': self._score_to_grade(total_score)
+            })
+        return scores
+    
+    def _analyze_keyword_relevance(self, features, counts):
+        """Analyze keyword relevance for ATS systems"""
+        ats_counts = counts[:, self.ats_columns]
+        total_words = features['word_count'][:, None]
+        densities = np.divide(ats_counts * 100, total_words, out=np.zeros(ats_counts.shape), where=total_words > 0)
+        
+        relevance = []
+        for row_counts, row_densities, words in zip(ats_counts.tolist(), densities.tolist(), total_words[:, 0].tolist()):
+            keyword_density = {
+                keyword: {'count': count, 'density': round(density, 2) if words > 0 else 0}
+                for keyword, count, density in zip(self.ats_keywords, row_counts, row_densities)
+            }
+            found = sum(1 for count in row_counts if count > 0)
+            # Calculate ATS compatibility score
+            relevance.append({
+                'keyword_density': keyword_density,
+                'ats_compatibility_score': min(found * 5, 100),
+                'total_keywords_found': found
+            })
+        return relevance
+    
     def _analyze_skills(self, parsed_data):
         """Analyze skills using ML techniques"""
         skills = parsed_data.get('skills', [])
@@ -230,10 +453,11 @@ class MLAnalyzer:
         
         # Analyze experience descriptions
         all_descriptions = ' '.join([exp.get('description', '') for exp in experience])
+        descriptions_lower = all_descriptions.lower()
         
         # Count impact words
         impact_words = ['improved', 'increased', 'reduced', 'optimized', 'enhanced', 'streamlined', 'developed', 'created', 'led', 'managed']
-        impact_count = sum(1 for word in impact_words if word in all_descriptions.lower())
+        impact_count = sum(1 for word in impact_words if word in descriptions_lower)
         
         # Analyze job progression
         job_titles = [exp.get('title', '') for exp in experience]
@@ -252,7 +476,7 @@ class MLAnalyzer:
             'impact_words_count': impact_count,
             'progression_score': progression_score,
             'avg_description_length': len(all_descriptions) / len(experience) if experience else 0,
-            'has_leadership_experience': any(word in all_descriptions.lower() for word in ['led', 'managed', 'supervised', 'coordinated'])
+            'has_leadership_experience': any(word in descriptions_lower for word in ['led', 'managed', 'supervised', 'coordinated'])
         }
     
     def _analyze_education(self, parsed_data):
@@ -314,43 +538,11 @@ class MLAnalyzer:
             'assessment': 'Well-balanced' if 60 <= normalized_score <= 80 else 'Needs improvement'
         }
     
-    def _analyze_keyword_relevance(self, parsed_data):
-        """Analyze keyword relevance for ATS systems"""
-        raw_text = parsed_data.get('raw_text', '').lower()
-        
-        # Common ATS keywords
-        ats_keywords = [
-            'experience', 'skills', 'education', 'achievements', 'results',
-            'leadership', 'management', 'development', 'project', 'team',
-            'analysis', 'communication', 'problem solving', 'innovation'
-        ]
-        
-        keyword_density = {}
-        total_words = len(raw_text.split())
-        
-        for keyword in ats_keywords:
-            count = raw_text.count(keyword)
-            density = (count / total_words) * 100 if total_words > 0 else 0
-            keyword_density[keyword] = {
-                'count': count,
-                'density': round(density, 2)
-            }
-        
-        # Calculate ATS compatibility score
-        ats_score = min(sum(1 for kw, data in keyword_density.items() if data['count'] > 0) * 5, 100)
-        
-        return {
-            'keyword_density': keyword_density,
-            'ats_compatibility_score': ats_score,
-            'total_keywords_found': sum(1 for kw, data in keyword_density.items() if data['count'] > 0)
-        }
-    
-    def _generate_ml_recommendations(self, parsed_data):
+    def _generate_ml_recommendations(self, parsed_data, features, industry_analysis):
         """Generate ML-based recommendations"""
         recommendations = []
         
         # Analyze features and provide recommendations
-        features = self._extract_features(parsed_data)
         
         if features['quantifiable_achievements'] < 3:
             recommendations.append("Add more quantifiable achievements with specific numbers and percentages")
@@ -367,7 +559,6 @@ class MLAnalyzer:
             recommendations.append("Use shorter, more concise sentences for better readability")
         
         # Industry-specific recommendations
-        industry_analysis = self._classify_industry(parsed_data)
         if industry_analysis['confidence'] < 0.3:
             recommendations.append("Focus on industry-specific keywords to improve relevance")
         
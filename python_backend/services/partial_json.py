@@ -0,0 +1,97 @@
+import json
+
+# _load() result for text that is not valid JSON; None is a valid value (null)
+_INVALID = object()
+
+class PartialJSONObjectParser:
+    """Incremental parser for a streamed JSON object.
+
+    feed() accepts text chunks as they arrive and returns the (key, value) pairs of
+    top-level members that became complete, so callers can act on each field without
+    waiting for the closing brace. Every character is scanned once, and only the chunks
+    holding a member still being read are kept. Leading text before the first '{'
+    (e.g. a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        # Offsets count from the start of the stream; _chunks holds the text from _base on
+        self._chunks = []
+        self._base = 0
+        self.pos = 0
+        self.depth = 0
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        members = []
+        for char in chunk:
+            if self.done:
+                break
+
+            if not self.started:
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+            elif self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.value_start is None:
+                        key = self._load(self._text(self.key_start, self.pos + 1))
+                        self.key = key if isinstance(key, str) else None
+            elif char == '"':
+                self.in_string = True
+                if self.depth == 1 and self.value_start is None:
+                    self.key_start = self.pos
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+                if self.depth == 0:
+                    self._complete(members)
+                    self.done = True
+            elif char == ':' and self.depth == 1 and self.value_start is None:
+                self.value_start = self.pos + 1
+            elif char == ',' and self.depth == 1:
+                self._complete(members)
+
+            self.pos += 1
+        self._discard()
+        return members
+
+    def _text(self, start, end):
+        """Stream text between offsets start and end"""
+        if len(self._chunks) > 1:
+            self._chunks = [''.join(self._chunks)]
+        return self._chunks[0][start - self._base:end - self._base]
+
+    def _discard(self):
+        """Drop chunks that end before the text the current member still needs"""
+        needed = min(offset for offset in (self.key_start, self.value_start, self.pos) if offset is not None)
+        while self._chunks and self._base + len(self._chunks[0]) <= needed:
+            self._base += len(self._chunks.pop(0))
+
+    def _complete(self, members):
+        """Close the current top-level member; values that fail to parse are skipped"""
+        if self.key is not None and self.value_start is not None:
+            value = self._load(self._text(self.value_start, self.pos))
+            if value is not _INVALID:
+                members.append((self.key, value))
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+
+    def _load(self, text):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return _INVALID
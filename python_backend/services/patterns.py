@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+import threading
+import logging
+import time
+import re
+
+logger = logging.getLogger(__name__)
+
+# A pattern taking longer than this on one resume is logged as a likely pathological input
+SLOW_PATTERN_SECONDS = 0.05
+
+# Quantifiable metrics, one named alternative per kind; each kind has <kind>_value and <kind>_unit groups.
+# (?<!\d) keeps numeric alternatives from restarting inside a digit run: any such match also
+# matches from the run's start, and without it a long run without a unit backtracks quadratically.
+METRIC_PATTERNS = [
+    ('amount', r'(?<!\d)\$?(?P<amount_value>\d+(?:,\d{3})*(?:\.\d+)?)\s*(?P<amount_unit>million|billion|k|thousand|%|percent)'),
+    ('period', r'(?<!\d)(?P<period_value>\d+(?:\.\d+)?)\s*(?P<period_unit>years?|months?|weeks?)'),
+    ('team', r'(?<!\d)(?P<team_value>\d+)(?:\+|\s+or\s+more|\s+plus)?\s*(?P<team_unit>people|team|members|employees)'),
+    ('change', r'(?:improved?|increased?|reduced?)\s+by\s+(?P<change_value>\d+(?:\.\d+)?)(?P<change_unit>%|percent|times|x)')
+]
+
+# Quantifiable results MLAnalyzer looks for in lower-cased text, scored by how many kinds appear
+QUANTIFIABLE_PATTERNS = [
+    ('percent', r'(?<!\d)\d+%'),
+    ('dollars', r'\$\d+'),
+    ('millions', r'(?<!\d)\d+\s*million'),
+    ('thousands', r'(?<!\d)\d+\s*thousand'),
+    ('years', r'(?<!\d)\d+\s*years?'),
+    ('people', r'(?<!\d)\d+\s*people')
+]
+
+# Section headings, matched against a whole line; text after a colon is the section's first content
+SECTION_HEADINGS = [
+    ('experience', r'(?:(?:work|professional|relevant|industry)\s+)?experience|(?:work|employment|career)\s+history|employment'),
+    ('education', r'education(?:al\s+background)?|academic\s+(?:background|qualifications)|academics|qualifications'),
+    ('skills', r'(?:(?:technical|core|key)\s+)?skills(?:\s*(?:&|and)\s*\w+)?|competencies|technologies'),
+    ('other', r'(?:professional\s+)?summary|profile|objective|projects|certifications?|awards|honou?rs|publications|'
+              r'interests|references|volunteer(?:ing|\s+experience)?|languages|achievements|activities|'
+              r'contact(?:\s+information)?')
+]
+
+def _alternation(patterns):
+    return '|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns)
+
+def _lookahead_alternation(patterns):
+    # Zero-width alternatives consume nothing, so kinds overlapping in the text are all found
+    return '|'.join(f'(?=(?P<{name}>{pattern}))' for name, pattern in patterns)
+
+class PatternRegistry:
+    """Compiled regular expressions shared by the parser and analyzer, looked up by name.
+
+    Matching goes through the registry so that, inside timed(), the time spent in each
+    pattern is recorded for the calling thread; outside it the only cost is one lookup.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = {name: re.compile(pattern, flags) for name, (pattern, flags) in patterns.items()}
+        self._local = threading.local()
+
+    def __getitem__(self, name):
+        return self.patterns[name]
+
+    @contextmanager
+    def timed(self):
+        """Collect {pattern: {'calls', 'seconds'}} for the matches made in this thread"""
+        timings = {}
+        self._local.timings = timings
+        try:
+            yield timings
+        finally:
+            self._local.timings = None
+            for name, timing in timings.items():
+                timing['seconds'] = round(timing['seconds'], 6)
+                if timing['seconds'] >= SLOW_PATTERN_SECONDS:
+                    logger.warning(f"Slow pattern '{name}': {timing['seconds']:.3f}s over {timing['calls']} calls")
+
+    def _run(self, name, method, *args):
+        timings = getattr(self._local, 'timings', None)
+        if timings is None:
+            return method(*args)
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            timing = timings.setdefault(name, {'calls': 0, 'seconds': 0.0})
+            timing['calls'] += 1
+            timing['seconds'] += time.perf_counter() - start
+
+    def search(self, name, text):
+        return self._run(name, self.patterns[name].search, text)
+
+    def findall(self, name, text):
+        return self._run(name, self.patterns[name].findall, text)
+
+    def split(self, name, text):
+        return self._run(name, self.patterns[name].split, text)
+
+    def finditer(self, name, text):
+        """All matches as a list, so the whole scan is inside the timing"""
+        return self._run(name, lambda value: list(self.patterns[name].finditer(value)), text)
+
+    def kinds_found(self, name, text, kinds):
+        """Names of the alternatives in `kinds` that match anywhere, stopping once all were seen"""
+        def scan(value):
+            found = set()
+            for match in self.patterns[name].finditer(value):
+                found.add(match.lastgroup)
+                if len(found) == len(kinds):
+                    break
+            return found
+        return self._run(name, scan, text)
+
+PATTERNS = PatternRegistry({
+    'email': (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 0),
+    'phone': (r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', 0),
+    'linkedin': (r'linkedin\.com/in/[\w-]+', re.IGNORECASE),
+    # Bare 'ms'/'ba' are too common ("MS Office", "BA team"): abbreviations need dots, or 'in' after them
+    'degree': (r"\b(?:bachelor|master)(?:'?s)?\b|\b(?:ph\.?d|mba|[bm]\.[as]\.?|[bm]\.?sc|[bm][as](?=\s+in\b)|"
+               r"associate|diploma|doctorate)\b", 0),
+    'institution': (r'\b(?:university|college|institute|school|academy|polytechnic)\b', re.IGNORECASE),
+    'year': (r'\b(?:19|20)\d{2}\b', 0),
+    'duration': (r'(\d{4})\s*[-–]\s*(\d{4}|present|current)', re.IGNORECASE),
+    'skills_section': (r'skills?\s*:?\s*(.*?)(?=\n\s*\n|\n[A-Z]|$)', re.IGNORECASE | re.DOTALL),
+    'skill_separators': (r'[,;•\n\t]+', 0),
+    'section_heading': (r'^\W*(?:' + _alternation(SECTION_HEADINGS) + r')\s*(?::(?P<inline>.*)|\W*)$', re.IGNORECASE),
+    'job_title': (r'\b(?:engineer|developer|manager|analyst|specialist|coordinator|director|lead|senior|junior|'
+                  r'intern|consultant|architect|administrator|designer|scientist|officer|head|vp|president)s?\b', 0),
+    'metrics': (_alternation(METRIC_PATTERNS), re.IGNORECASE),
+    'quantifiable': (_lookahead_alternation(QUANTIFIABLE_PATTERNS), 0)
+})
@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_right
+import multiprocessing
+import threading
+import logging
+import os
+import fitz  # PyMuPDF
+from services.render_service import START_METHOD
+
+logger = logging.getLogger(__name__)
+
+def _extract_page_range(source, start, stop):
+    """Extract text for pages [start, stop); module-level so process pool workers can run it"""
+    doc = fitz.open(stream=source, filetype='pdf') if isinstance(source, bytes) else fitz.open(source)
+    try:
+        return [doc[number].get_text() for number in range(start, stop)]
+    finally:
+        doc.close()
+
+def page_for_offset(pages, offset):
+    """Return the page number whose span in raw_text contains offset, or None"""
+    starts = [page['start'] for page in pages]
+    index = bisect_right(starts, offset) - 1
+    if index >= 0 and offset < pages[index]['end']:
+        return pages[index]['page']
+    return None
+
+class PDFTextExtractor:
+    """Page-aware PDF text extraction with page/char budgets and optional process-pool fan-out"""
+
+    def __init__(self, max_pages=None, max_chars=None, parallel_threshold=None, workers=None):
+        self.max_pages = max_pages or int(os.getenv('PDF_MAX_PAGES', '50'))
+        self.max_chars = max_chars or int(os.getenv('PDF_MAX_CHARS', '200000'))
+        self.parallel_threshold = parallel_threshold or int(os.getenv('PDF_PARALLEL_PAGES', '20'))
+        self.workers = workers or int(os.getenv('PDF_WORKERS', '0')) or os.cpu_count() or 2
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def extract(self, source):
+        """Extract text from PDF bytes or a file path.
+
+        Returns the joined text plus per-page text with 1-based page numbers.
+        """
+        doc = fitz.open(stream=source, filetype='pdf') if isinstance(source, bytes) else fitz.open(source)
+        try:
+            page_count = doc.page_count
+            page_limit = min(page_count, self.max_pages)
+
+            if page_limit >= self.parallel_threshold and self.workers > 1:
+                page_texts = self._extract_parallel(source, page_limit)
+            else:
+                page_texts = []
+                chars = 0
+                for number in range(page_limit):
+                    page_texts.append(doc[number].get_text())
+                    chars += len(page_texts[-1])
+                    if chars >= self.max_chars:
+                        break
+        finally:
+            doc.close()
+
+        # Apply the character budget and collect pages before joining once
+        pages = []
+        chars = 0
+        truncated = page_limit < page_count
+        for number, page_text in enumerate(page_texts, start=1):
+            if chars + len(page_text) > self.max_chars:
+                page_text = page_text[:self.max_chars - chars]
+                truncated = True
+            pages.append({'page': number, 'text': page_text})
+            chars += len(page_text)
+            if chars >= self.max_chars:
+                truncated = truncated or number < page_count
+                break
+
+        if truncated:
+            logger.info(f"PDF extraction truncated at {len(pages)}/{page_count} pages, {chars} chars")
+
+        return {
+            'text': ''.join(page['text'] for page in pages),
+            'pages': pages,
+            'page_count': page_count,
+            'pages_extracted': len(pages),
+            'truncated': truncated
+        }
+
+    def _extract_parallel(self, source, page_limit):
+        """Spread contiguous page ranges across the process pool"""
+        chunk_size = -(-page_limit // self.workers)
+        ranges = [(start, min(start + chunk_size, page_limit)) for start in range(0, page_limit, chunk_size)]
+        pool = self._get_pool()
+        futures = [pool.submit(_extract_page_range, source, start, stop) for start, stop in ranges]
+
+        page_texts = []
+        for future in futures:
+            page_texts.extend(future.result())
+        return page_texts
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Forking the app's threaded process could hand workers a lock held mid-call
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(START_METHOD))
+            return self._pool
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,151 @@
+import logging
+import json
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Share of the token budget each structured section may use, in priority order.
+# Whatever the sections leave unused goes to the raw resume text.
+SECTION_SHARES = [
+    ('personal_info', 0.05),
+    ('skills', 0.10),
+    ('metrics', 0.05),
+    ('education', 0.10),
+    ('experience', 0.30)
+]
+
+_whitespace = re.compile(r'\s+')
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+def compact_json(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def _normalize(text):
+    return _whitespace.sub(' ', str(text)).strip().lower()
+
+def _is_empty(value):
+    if isinstance(value, dict):
+        return all(_is_empty(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_is_empty(item) for item in value)
+    return value is None or str(value).strip() == ''
+
+class PromptCompiler:
+    """Packs parsed resume sections into compact JSON within a token budget.
+
+    Sections are cleaned (empty and duplicate entries dropped, long strings clipped),
+    then list items are added until the section's share of the budget is used up.
+    """
+
+    def __init__(self, token_budget=None, max_field_chars=300):
+        self.token_budget = token_budget or int(os.getenv('PROMPT_TOKEN_BUDGET', '2500'))
+        self.max_field_chars = max_field_chars
+
+    def compile(self, parsed_data, names=None):
+        """Return ({section: compact text}, report) for the analysis prompt.
+
+        With names, only those structured sections are compiled and the raw text is left out.
+        """
+        sections = {}
+        report = {}
+        used = 0
+
+        segmented = parsed_data.get('segmented', False)
+        for name, share in SECTION_SHARES:
+            if names is not None and name not in names:
+                continue
+            budget = int(self.token_budget * share)
+            items, removed = self._clean(name, parsed_data.get(name), segmented)
+            text, stats = self._pack(items, budget)
+            stats['dropped'] += removed
+            sections[name] = text
+            report[name] = stats
+            used += stats['tokens']
+
+        if names is None:
+            raw_text = _whitespace.sub(' ', parsed_data.get('raw_text', '') or '').strip()
+            raw_budget = max(self.token_budget - used, 0) * CHARS_PER_TOKEN
+            sections['raw_text'] = raw_text[:raw_budget]
+            report['raw_text'] = {
+                'tokens': estimate_tokens(sections['raw_text']),
+                'items': 1 if sections['raw_text'] else 0,
+                'dropped': 0,
+                'truncated': len(raw_text) > raw_budget
+            }
+
+        report['total_tokens'] = sum(stats['tokens'] for stats in report.values())
+        return sections, report
+
+    def clip_text(self, text, tokens):
+        """Text with whitespace collapsed, cut to about tokens tokens"""
+        return _whitespace.sub(' ', text or '').strip()[:max(tokens, 0) * CHARS_PER_TOKEN]
+
+    def _clean(self, name, value, segmented=True):
+        """Drop empty/duplicate entries and clip long strings; returns (entries, duplicates removed)"""
+        if name == 'personal_info':
+            return {key: self._clip(item) for key, item in (value or {}).items() if not _is_empty(item)}, 0
+
+        items = []
+        seen = set()
+        removed = 0
+        for entry in value or []:
+            if _is_empty(entry):
+                continue
+            if isinstance(entry, dict):
+                entry = {key: self._clip(item) for key, item in entry.items() if not _is_empty(item)}
+            else:
+                entry = self._clip(entry)
+
+            if name == 'experience' and isinstance(entry, dict):
+                # The same title at two companies (or two stints) is two jobs
+                fingerprint = tuple(_normalize(entry.get(key, '')) for key in ('title', 'company', 'duration'))
+            else:
+                fingerprint = _normalize(compact_json(entry) if isinstance(entry, dict) else entry)
+            if fingerprint in seen:
+                removed += 1
+                continue
+            # Parses stored before section segmentation have an experience entry per description
+            # line; entries whose title already appears in a kept description add nothing
+            if (name == 'experience' and not segmented and isinstance(entry, dict) and fingerprint[0] and
+                    any(fingerprint[0] in _normalize(kept.get('description', '')) for kept in items)):
+                removed += 1
+                continue
+            seen.add(fingerprint)
+            items.append(entry)
+        return items, removed
+
+    def _clip(self, value):
+        if isinstance(value, str):
+            value = _whitespace.sub(' ', value).strip()
+            if len(value) > self.max_field_chars:
+                return value[:self.max_field_chars] + '…'
+        return value
+
+    def _pack(self, value, budget):
+        """Serialize as many items as fit in budget tokens"""
+        if isinstance(value, dict):
+            text = compact_json(value)
+            return text, {'tokens': estimate_tokens(text), 'items': len(value), 'dropped': 0, 'truncated': False}
+
+        kept = []
+        tokens = 1  # brackets
+        for item in value:
+            item_tokens = estimate_tokens(compact_json(item)) + 1
+            if tokens + item_tokens > budget:
+                break
+            kept.append(item)
+            tokens += item_tokens
+
+        text = compact_json(kept)
+        return text, {
+            'tokens': estimate_tokens(text),
+            'items': len(kept),
+            'dropped': len(value) - len(kept),
+            'truncated': len(kept) < len(value)
+        }
@@ -0,0 +1,181 @@
+from concurrent.futures import ProcessPoolExecutor, Future
+import multiprocessing
+import threading
+import logging
+import io
+
+logger = logging.getLogger(__name__)
+
+IMAGE_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+# forkserver where the platform has it (POSIX), spawn elsewhere
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+class RenderTimeout(Exception):
+    """A chart render did not finish within its timeout"""
+
+def _init_worker():
+    """Select the Agg backend and load fonts once per worker process"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    from matplotlib import style, font_manager
+    style.use('seaborn-v0_8')
+    # Build the font list and glyph caches now, not during the first request's render
+    font_manager.findfont(font_manager.FontProperties(family=['sans-serif']))
+    _render_wordcloud(['warm up'], 'png')
+
+def _render_wordcloud(skills, image_format='png', dpi=150):
+    """Skills word cloud as PNG or SVG bytes, drawn on a standalone Figure (no pyplot state)"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        colormap='viridis',
+        max_words=50
+    ).generate(' '.join(skills))
+
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.imshow(wordcloud, interpolation='bilinear')
+    ax.axis('off')
+    ax.set_title('Skills Word Cloud')
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=image_format, bbox_inches='tight', dpi=dpi)
+    return buffer.getvalue()
+
+RENDERERS = {
+    'wordcloud': _render_wordcloud
+}
+
+def _noop():
+    return None
+
+def render(kind, *args):
+    """Render in the current process; safe from any thread since no pyplot state is used"""
+    return RENDERERS[kind](*args)
+
+class RenderService:
+    """Renders matplotlib images in a pool of worker processes, off the Flask request threads.
+
+    At most one render per worker is in flight, so a render starts as soon as it is submitted
+    and `timeout` measures the render itself; submit() waits up to `timeout` for a free worker.
+    The returned Future fails with RenderTimeout when either limit passes. A worker cannot be
+    interrupted mid-render, so on a timeout the pool is replaced and its processes terminated;
+    renders still running in it fail and are retried on the next request.
+    """
+
+    def __init__(self, workers=2, timeout=20):
+        self.workers = workers
+        self.timeout = timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._counters = {'renders': 0, 'timeouts': 0, 'failures': 0, 'pool_restarts': 0}
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # The app process runs background threads (Gemini loop, corpus sync, asset GC, jobs);
+                # forking it could copy a lock some thread holds, so workers start from a clean process
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context(START_METHOD))
+            return self._pool
+
+    def start(self):
+        """Start every worker now so fonts are loaded before the first chart is requested"""
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(_noop)
+
+    def submit(self, kind, *args, timeout=None):
+        """Start a render; the returned Future resolves to the image bytes"""
+        timeout = timeout or self.timeout
+        result = Future()
+        if not self._slots.acquire(timeout=timeout):
+            self._count('timeouts')
+            result.set_exception(RenderTimeout(f"No render worker free for '{kind}' within {timeout}s"))
+            return result
+
+        # The render finishing and the timeout race; whichever claims the submission first settles it
+        claimed = []
+        def claim():
+            with self._lock:
+                if claimed:
+                    return False
+                claimed.append(True)
+            self._slots.release()
+            return True
+
+        pool = self._get_pool()
+        try:
+            inner = pool.submit(render, kind, *args)
+        except Exception as e:
+            # The pool broke (e.g. a worker was killed); start a fresh one for the next call
+            claim()
+            self._restart_pool(pool)
+            result.set_exception(e)
+            return result
+
+        timer = threading.Timer(timeout, self._expire, (result, pool, kind, timeout, claim))
+        timer.daemon = True
+        timer.start()
+
+        def finish(done):
+            timer.cancel()
+            if not claim():
+                return
+            error = done.exception() if not done.cancelled() else RenderTimeout(f"Render '{kind}' was cancelled")
+            if error is not None:
+                self._count('failures')
+                result.set_exception(error)
+            else:
+                self._count('renders')
+                result.set_result(done.result())
+
+        inner.add_done_callback(finish)
+        return result
+
+    def _expire(self, result, pool, kind, timeout, claim):
+        if not claim():
+            return
+        self._count('timeouts')
+        logger.warning(f"Render '{kind}' timed out; restarting render workers")
+        # Replace the pool before failing the future so the caller's next submit gets a working one
+        self._restart_pool(pool)
+        result.set_exception(RenderTimeout(f"Render '{kind}' took longer than {timeout}s"))
+
+    def _restart_pool(self, pool):
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        self._count('pool_restarts')
+        processes = list((getattr(pool, '_processes', None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self):
+        """Render counters"""
+        with self._lock:
+            counters = dict(self._counters)
+        counters['workers'] = self.workers
+        return counters
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
@@ -0,0 +1,324 @@
+from sklearn.feature_extraction.text import HashingVectorizer
+import scipy.sparse as sp
+import numpy as np
+import threading
+import logging
+import joblib
+import os
+
+logger = logging.getLogger(__name__)
+
+class ResumeCorpus:
+    """Incrementally fitted TF-IDF index over stored resumes, persisted under models/.
+
+    Term counts are hashed, so new resumes can be added without refitting a vocabulary.
+    Document frequencies are accumulated on every add; IDF weights and document norms are
+    refreshed whenever the index is compacted by save(). The saved index is a CSC matrix
+    (one column per term) that is memory-mapped on load, so a query only touches the
+    columns of its own terms. With run_sync() on a background thread, compaction happens
+    there instead of in the thread that added the documents.
+    """
+
+    def __init__(self, models_path='models', n_features=2 ** 18, autosave_every=100):
+        self.path = os.path.join(models_path, 'corpus')
+        self.n_features = n_features
+        self.autosave_every = autosave_every
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+            stop_words='english',
+            dtype=np.float32
+        )
+        self._analyzer = self.vectorizer.build_analyzer()
+        self._lock = threading.RLock()
+        # Serializes save(), which does its heavy work outside _lock
+        self._save_lock = threading.Lock()
+        self._compact_requested = threading.Event()
+        self._syncing = False
+        self._loaded = False
+
+    def _reset(self):
+        self.df = np.zeros(self.n_features, dtype=np.int64)
+        self.ids = []
+        self.user_ids = []
+        self._id_set = set()
+        self.watermark = None
+        self.idf = np.ones(self.n_features, dtype=np.float32)
+        self.matrix = sp.csc_matrix((0, self.n_features), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self._pending = []
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if not self._loaded:
+                self._reset()
+                self.load()
+                self._loaded = True
+
+    def load(self):
+        """Load the saved index, memory-mapping the sparse matrix arrays"""
+        meta_path = os.path.join(self.path, 'meta.joblib')
+        if not os.path.exists(meta_path):
+            return False
+        try:
+            meta = joblib.load(meta_path)
+            if meta['n_features'] != self.n_features:
+                logger.warning("Corpus index was built with a different feature size; ignoring it")
+                return False
+
+            self.matrix = self._open_matrix(len(meta['ids']))
+            self.df = meta['df']
+            self.idf = meta['idf']
+            self.norms = meta['norms']
+            self.ids = meta['ids']
+            self.user_ids = meta['user_ids']
+            self.watermark = meta['watermark']
+            self._id_set = set(self.ids)
+            logger.info(f"Loaded resume corpus with {len(self.ids)} documents")
+            return True
+        except Exception as e:
+            logger.error(f"Corpus load error: {str(e)}")
+            self._reset()
+            return False
+
+    def _open_matrix(self, n_docs):
+        """The saved index as a CSC matrix over memory-mapped arrays"""
+        arrays = {name: np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+                  for name in ('data', 'indices', 'indptr')}
+        return sp.csc_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(n_docs, self.n_features),
+            copy=False
+        )
+
+    def save(self):
+        """Compact pending documents into the index, refresh IDF/norms and persist atomically.
+
+        The index is rebuilt and written from a snapshot outside the lock, so queries and adds
+        only wait for the final swap; documents added meanwhile stay pending.
+        """
+        self._ensure_loaded()
+        with self._save_lock:
+            with self._lock:
+                pending = list(self._pending)
+                matrix = self.matrix
+                n_docs = matrix.shape[0] + sum(block.shape[0] for block in pending)
+                df = self.df.copy()
+                ids = self.ids[:n_docs]
+                user_ids = self.user_ids[:n_docs]
+                watermark = self.watermark
+
+            if pending:
+                matrix = sp.vstack([matrix] + pending, format='csc', dtype=np.float32)
+            idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+            # Squared norms of the IDF-weighted rows without materializing the weighted matrix
+            columns = np.repeat(np.arange(self.n_features), np.diff(matrix.indptr))
+            weighted = np.asarray(matrix.data) * idf[columns]
+            squared = np.bincount(matrix.indices, weights=weighted * weighted, minlength=n_docs)
+            norms = np.sqrt(squared).astype(np.float32)
+
+            os.makedirs(self.path, exist_ok=True)
+            for name in ('data', 'indices', 'indptr'):
+                temp_path = os.path.join(self.path, f'{name}.tmp.npy')
+                np.save(temp_path, np.asarray(getattr(matrix, name)))
+                os.replace(temp_path, os.path.join(self.path, f'{name}.npy'))
+            joblib.dump({
+                'n_features': self.n_features,
+                'df': df,
+                'idf': idf,
+                'norms': norms,
+                'ids': ids,
+                'user_ids': user_ids,
+                'watermark': watermark
+            }, os.path.join(self.path, 'meta.tmp.joblib'))
+            os.replace(os.path.join(self.path, 'meta.tmp.joblib'), os.path.join(self.path, 'meta.joblib'))
+
+            # Swap in memory maps of the arrays just written
+            saved = self._open_matrix(n_docs)
+            with self._lock:
+                self.matrix = saved
+                self.idf = idf
+                self.norms = norms
+                del self._pending[:len(pending)]
+            logger.info(f"Saved resume corpus with {n_docs} documents")
+
+    def partial_fit(self, texts, ids, user_ids=None):
+        """Add documents to the corpus, skipping ids that are already indexed"""
+        self._ensure_loaded()
+        user_ids = user_ids or [None] * len(ids)
+        with self._lock:
+            rows = [(text or '', str(doc_id), user_id) for text, doc_id, user_id in zip(texts, ids, user_ids)
+                    if str(doc_id) not in self._id_set]
+        if not rows:
+            return 0
+
+        # Vectorize outside the lock, then drop ids another thread added meanwhile (or repeated here)
+        counts = self.vectorizer.transform([text for text, _, _ in rows]).tocsr()
+        with self._lock:
+            seen = set()
+            keep = []
+            for position, (_, doc_id, _) in enumerate(rows):
+                if doc_id not in self._id_set and doc_id not in seen:
+                    seen.add(doc_id)
+                    keep.append(position)
+            if not keep:
+                return 0
+            if len(keep) < len(rows):
+                rows = [rows[position] for position in keep]
+                counts = counts[keep]
+
+            self.df += np.bincount(counts.indices, minlength=self.n_features)
+            self._pending.append(counts)
+            for _, doc_id, user_id in rows:
+                self.ids.append(doc_id)
+                self.user_ids.append(user_id)
+                self._id_set.add(doc_id)
+            due = sum(block.shape[0] for block in self._pending) >= self.autosave_every
+
+        if due:
+            if self._syncing:
+                # run_sync compacts on its own thread, so the caller is not held up
+                self._compact_requested.set()
+            else:
+                self.save()
+        return len(rows)
+
+    def run_sync(self, store):
+        """Background loop: index resumes stored since the last sync, then compact whenever
+        autosave_every documents are pending"""
+        self._syncing = True
+        try:
+            self.fit_from_store(store)
+        except Exception as e:
+            logger.error(f"Corpus sync error: {str(e)}")
+        while True:
+            self._compact_requested.wait()
+            self._compact_requested.clear()
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"Corpus compaction error: {str(e)}")
+
+    def fit_from_store(self, store, batch_size=1000):
+        """Incrementally index stored analyses added since the last sync"""
+        self._ensure_loaded()
+
+        added = 0
+        batch = []
+        for document in store.iter_raw_texts(self.watermark, batch_size):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                added += self._fit_batch(batch)
+                batch = []
+        if batch:
+            added += self._fit_batch(batch)
+
+        self.save()
+        logger.info(f"Corpus sync indexed {added} new resumes")
+        return added
+
+    def _fit_batch(self, documents):
+        added = self.partial_fit(
+            [document['raw_text'] for document in documents],
+            [document['_id'] for document in documents],
+            [document.get('user_id') for document in documents]
+        )
+        self.watermark = documents[-1]['_id']
+        return added
+
+    def _query_weights(self, text):
+        """Hashed term columns of the query and their IDF^2-scaled, L2-normalized weights"""
+        query = self.vectorizer.transform([text]).tocsr()
+        columns = query.indices
+        weighted = query.data * self.idf[columns]
+        norm = np.linalg.norm(weighted)
+        if not norm:
+            return columns, None
+        return columns, weighted * self.idf[columns] / norm
+
+    def _scores(self, text):
+        """Cosine similarity between text and every indexed document"""
+        columns, weights = self._query_weights(text)
+        n_saved = self.matrix.shape[0]
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        if weights is None:
+            return scores
+
+        # Saved documents: only the query's columns are read from the memory map
+        if n_saved:
+            saved = self.matrix[:, columns] @ weights
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores[:n_saved] = np.where(self.norms > 0, saved / self.norms, 0)
+
+        # Documents added since the last save are scored directly
+        offset = n_saved
+        for block in self._pending:
+            rows = np.repeat(np.arange(block.shape[0]), np.diff(block.indptr))
+            weighted = block.data * self.idf[block.indices]
+            block_norms = np.sqrt(np.bincount(rows, weights=weighted * weighted, minlength=block.shape[0]))
+            block_scores = block[:, columns] @ weights
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores[offset:offset + block.shape[0]] = np.where(block_norms > 0, block_scores / block_norms, 0)
+            offset += block.shape[0]
+        return scores
+
+    def most_similar(self, text, k=5, user_id=None, exclude_ids=None):
+        """Return the k indexed resumes most similar to text, optionally limited to one user"""
+        self._ensure_loaded()
+        with self._lock:
+            scores = self._scores(text)
+            if user_id is not None:
+                scores[self._owners() != user_id] = -1
+            for doc_id in exclude_ids or []:
+                if str(doc_id) in self._id_set:
+                    scores[self.ids.index(str(doc_id))] = -1
+
+            k = min(k, int((scores > 0).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [{'analysis_id': self.ids[i], 'score': round(float(scores[i]), 4)} for i in top]
+
+    def _owners(self):
+        """Owner of each indexed document as an array, rebuilt only when documents are added"""
+        if getattr(self, '_owner_array', None) is None or len(self._owner_array) != len(self.user_ids):
+            self._owner_array = np.array(self.user_ids, dtype=object)
+        return self._owner_array
+
+    def match_job_description(self, job_text, k=10, user_id=None):
+        """Rank indexed resumes against a job description"""
+        return self.most_similar(job_text, k=k, user_id=user_id)
+
+    def score_against_job(self, resume_text, job_text, top_terms=15):
+        """Cosine similarity of one resume to a job description, with matched and missing terms"""
+        self._ensure_loaded()
+        resume_columns, resume_weights = self._query_weights(resume_text)
+        job_columns, job_weights = self._query_weights(job_text)
+        if resume_weights is None or job_weights is None:
+            return {'score': 0, 'matched_terms': [], 'missing_terms': []}
+
+        # _query_weights carries an extra IDF factor; divide it back out for a true cosine
+        resume_vector = dict(zip(resume_columns, resume_weights / self.idf[resume_columns]))
+        job_vector = dict(zip(job_columns, job_weights / self.idf[job_columns]))
+        score = sum(weight * job_vector[column] for column, weight in resume_vector.items() if column in job_vector)
+
+        # Rank job terms by IDF so the rarest (most telling) terms come first
+        resume_terms = set(self._analyzer(resume_text))
+        job_terms = list(set(self._analyzer(job_text)))
+        term_columns = self.vectorizer.transform(job_terms).tocsr()
+        term_idf = [self.idf[term_columns.indices[term_columns.indptr[i]]]
+                    if term_columns.indptr[i + 1] > term_columns.indptr[i] else 0
+                    for i in range(len(job_terms))]
+        job_terms = [term for _, term in sorted(zip(term_idf, job_terms), reverse=True)]
+        return {
+            'score': round(float(score), 4),
+            'matched_terms': [term for term in job_terms if term in resume_terms][:top_terms],
+            'missing_terms': [term for term in job_terms if term not in resume_terms][:top_terms]
+        }
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self.ids)
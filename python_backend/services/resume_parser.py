@@ -1,6 +1,9 @@
 import os
 import re
 import json
+import tempfile
+from io import BytesIO
+import hashlib
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -14,6 +17,10 @@ from nltk.corpus import stopwords
 from nltk.chunk import ne_chunk
 from nltk.tag import pos_tag
 import textstat
+from services.skill_matcher import SkillMatcher
+from services.pdf_extractor import PDFTextExtractor
+from services.text_document import TokenizedDocument
+from services.patterns import PATTERNS
 
 # Download required NLTK data
 try:
@@ -47,30 +54,49 @@ class ResumeParser:
     def __init__(self):
         self.stop_words = set(stopwords.words('english'))
         self.skills_database = self._load_skills_database()
-        self.education_keywords = ['university', 'college', 'institute', 'school', 'bachelor', 'master', 'phd', 'degree', 'diploma', 'certificate']
-        self.experience_keywords = ['experience', 'work', 'employment', 'career', 'position', 'role', 'job']
+        self.skill_matcher = SkillMatcher(self.skills_database)
         
-    def parse_resume(self, file):
-        """Parse resume file and extract structured data"""
+        # Uploads are parsed from memory; only files above the memory limit are spooled to disk
+        self.max_upload_bytes = int(os.getenv('MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
+        self.memory_limit_bytes = int(os.getenv('PARSER_MEMORY_LIMIT', str(8 * 1024 * 1024)))
+        self.spool_dir = os.getenv('UPLOAD_FOLDER', 'uploads')
+        self.pdf_extractor = PDFTextExtractor()
+        # Record per-pattern regex timings in parsed_data['extraction'] to spot pathological inputs
+        self.pattern_timings = os.getenv('PARSER_PATTERN_TIMINGS', 'false').lower() == 'true'
+        
+    def parse_resume(self, file, previous=None):
+        """Parse resume file and extract structured data.
+        
+        previous is the user's last parsed_data; when the extracted text is unchanged its
+        sections and NLP statistics are reused instead of recomputed.
+        """
+        spool_path = None
         try:
-            # Save uploaded file temporarily
-            filename = file.filename
-            file_path = os.path.join('uploads', filename)
-            file.save(file_path)
+            filename = file.filename or ''
             
-            # Extract text based on file type
+            # Reject unsupported formats before reading anything
             if filename.lower().endswith('.pdf'):
-                text = self._extract_text_from_pdf(file_path)
+                extract = self._extract_text_from_pdf
             elif filename.lower().endswith(('.docx', '.doc')):
-                text = self._extract_text_from_docx(file_path)
+                extract = self._extract_text_from_docx
             else:
                 return {
                     'success': False,
                     'message': 'Unsupported file format. Please upload PDF or DOCX files.'
                 }
             
-            # Clean up temporary file
-            os.remove(file_path)
+            source = self._read_upload(file, filename)
+            if source is None:
+                return {
+                    'success': False,
+                    'message': f'File is too large. Maximum size is {self.max_upload_bytes // (1024 * 1024)} MB.'
+                }
+            if isinstance(source, str):
+                spool_path = source
+            
+            # Extract text based on file type
+            extracted = extract(source)
+            text = extracted['text']
             
             if not text.strip():
                 return {
@@ -78,12 +104,14 @@ class ResumeParser:
                     'message': 'Could not extract text from the resume. Please check the file.'
                 }
             
-            # Parse the extracted text
-            parsed_data = self._parse_resume_text(text)
+            # Parse the extracted text, keeping the tokenized document for the ML analyzer
+            document = TokenizedDocument(text)
+            parsed_data = self._parse_resume_text(text, extracted, document, previous)
             
             return {
                 'success': True,
-                'data': parsed_data
+                'data': parsed_data,
+                'document': document
             }
             
         except Exception as e:
@@ -93,166 +121,220 @@ class ResumeParser:
                 'message': 'Failed to parse resume',
                 'error': str(e)
             }
+        finally:
+            if spool_path and os.path.exists(spool_path):
+                os.remove(spool_path)
+    
+    def _read_upload(self, file, filename):
+        """Read an upload into bytes, spooling to a unique temp file past the memory limit.
+        
+        Returns bytes, a temp file path, or None when the upload exceeds max_upload_bytes.
+        """
+        buffer = BytesIO()
+        spool = None
+        total = 0
+        try:
+            while True:
+                chunk = file.read(64 * 1024)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > self.max_upload_bytes:
+                    return None
+                if spool is None and total > self.memory_limit_bytes:
+                    os.makedirs(self.spool_dir, exist_ok=True)
+                    spool = tempfile.NamedTemporaryFile(
+                        dir=self.spool_dir,
+                        suffix=os.path.splitext(filename)[1],
+                        delete=False
+                    )
+                    spool.write(buffer.getvalue())
+                    buffer = None
+                (spool or buffer).write(chunk)
+        finally:
+            if spool is not None:
+                spool.close()
+                if total > self.max_upload_bytes:
+                    os.remove(spool.name)
+        
+        return spool.name if spool is not None else buffer.getvalue()
     
-    def _extract_text_from_pdf(self, file_path):
-        """Extract text from PDF file"""
+    def _extract_text_from_pdf(self, source):
+        """Extract text and per-page text from PDF bytes or file path"""
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            return self.pdf_extractor.extract(source)
         except Exception as e:
             logger.error(f"PDF extraction error: {str(e)}")
-            return ""
+            return {'text': '', 'pages': []}
     
-    def _extract_text_from_docx(self, file_path):
-        """Extract text from DOCX file"""
+    def _extract_text_from_docx(self, source):
+        """Extract text from DOCX bytes or file path"""
         try:
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            doc = Document(BytesIO(source) if isinstance(source, bytes) else source)
+            text = ''.join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+            return {'text': text, 'pages': []}
         except Exception as e:
             logger.error(f"DOCX extraction error: {str(e)}")
-            return ""
+            return {'text': '', 'pages': []}
     
-    def _parse_resume_text(self, text):
+    def _parse_resume_text(self, text, extracted=None, document=None, previous=None):
         """Parse resume text and extract structured information"""
-        # Basic text preprocessing
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Extract different sections
-        personal_info = self._extract_personal_info(text)
-        education = self._extract_education(text, lines)
-        experience = self._extract_experience(text, lines)
-        skills = self._extract_skills(text)
-        
-        # Perform text analysis
-        text_analysis = self._analyze_text_quality(text)
+        extracted = extracted or {}
+        timings = None
         
-        # Calculate readability scores
-        readability = self._calculate_readability(text)
+        if previous and previous.get('raw_text') == text:
+            # Same text as the last upload (e.g. a re-exported file): nothing to re-extract
+            logger.info("Resume text unchanged, reusing previous parse")
+            sections = {key: previous.get(key) for key in
+                        ('personal_info', 'education', 'experience', 'skills', 'text_analysis', 'readability', 'metrics',
+                         'segmented')}
+        elif self.pattern_timings:
+            with PATTERNS.timed() as timings:
+                sections = self._extract_sections(text, document)
+        else:
+            sections = self._extract_sections(text, document)
         
-        # Extract key metrics
-        metrics = self._extract_metrics(text)
-        
-        return {
+        parsed_data = {
             'raw_text': text,
-            'personal_info': personal_info,
-            'education': education,
-            'experience': experience,
-            'skills': skills,
-            'text_analysis': text_analysis,
-            'readability': readability,
-            'metrics': metrics,
+            **sections,
+            'pages': self._page_spans(extracted.get('pages', [])),
+            'extraction': {
+                'page_count': extracted.get('page_count'),
+                'pages_extracted': extracted.get('pages_extracted'),
+                'truncated': extracted.get('truncated', False)
+            },
             'parsed_at': datetime.utcnow().isoformat()
         }
+        if timings is not None:
+            parsed_data['extraction']['pattern_timings'] = timings
+        return parsed_data
+    
+    def _extract_sections(self, text, document=None):
+        """Run every extractor over the text"""
+        # Tokenize once; every extractor reads from the same document
+        document = document or TokenizedDocument(text)
+        return {
+            # Extract different sections
+            'personal_info': self._extract_personal_info(document),
+            'education': self._extract_education(document),
+            'experience': self._extract_experience(document),
+            'skills': self._extract_skills(document),
+            # Perform text analysis
+            'text_analysis': self._analyze_text_quality(document),
+            # Calculate readability scores
+            'readability': self._calculate_readability(text),
+            # Extract key metrics
+            'metrics': self._extract_metrics(document),
+            # Education and experience come one entry per job/degree (older parses: one per line)
+            'segmented': True
+        }
     
-    def _extract_personal_info(self, text):
+    def profile_patterns(self, text):
+        """Per-pattern regex timings for extracting one resume text, to diagnose slow inputs"""
+        with PATTERNS.timed() as timings:
+            self._extract_sections(text)
+        return timings
+    
+    def _page_spans(self, pages):
+        """Map each extracted page to its [start, end) character span in raw_text"""
+        spans = []
+        offset = 0
+        for page in pages:
+            spans.append({'page': page['page'], 'start': offset, 'end': offset + len(page['text'])})
+            offset += len(page['text'])
+        return spans
+    
+    def _extract_personal_info(self, document):
         """Extract personal information using regex and NLP"""
+        text = document.text
         personal_info = {}
         
         # Extract email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = PATTERNS.findall('email', text)
         personal_info['email'] = emails[0] if emails else None
         
         # Extract phone number
-        phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-        phones = re.findall(phone_pattern, text)
+        phones = PATTERNS.findall('phone', text)
         personal_info['phone'] = ''.join(phones[0]) if phones else None
         
         # Extract name (first few words, likely to be name)
-        lines = text.split('\n')
-        for line in lines[:5]:  # Check first 5 lines
-            line = line.strip()
-            if line and not any(keyword in line.lower() for keyword in ['email', 'phone', 'address', '@']):
+        for line, line_lower in zip(document.lines[:5], document.lower_lines[:5]):  # Check first 5 lines
+            if not any(keyword in line_lower for keyword in ['email', 'phone', 'address', '@']):
                 words = line.split()
                 if 2 <= len(words) <= 4:  # Likely a name
                     personal_info['name'] = line
                     break
         
         # Extract LinkedIn
-        linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-        linkedin = re.findall(linkedin_pattern, text, re.IGNORECASE)
+        linkedin = PATTERNS.findall('linkedin', text)
         personal_info['linkedin'] = linkedin[0] if linkedin else None
         
         return personal_info
     
-    def _extract_education(self, text, lines):
-        """Extract education information"""
-        education = []
-        education_section = False
+    def _extract_education(self, document):
+        """Extract education information, one entry per degree in the education section"""
+        lines = document.lines
+        lower_lines = document.lower_lines
+        spans = self._entry_spans(document, 'education')
+        if spans is None:
+            # No education heading: degree lines that also name an institution
+            spans = [{'start': i, 'end': i + 1} for i in range(len(lines))
+                     if PATTERNS.search('degree', lower_lines[i]) and PATTERNS.search('institution', lines[i])]
         
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            
-            # Check if we're entering education section
-            if any(keyword in line_lower for keyword in ['education', 'academic', 'qualification']):
-                education_section = True
+        education = []
+        for span in spans:
+            entry_lines = lines[span['start']:span['end']]
+            degree_line = next((line for line, lower in zip(entry_lines, lower_lines[span['start']:span['end']])
+                                if PATTERNS.search('degree', lower)), None)
+            if degree_line is None:
                 continue
-            
-            # Check if we're leaving education section
-            if education_section and any(keyword in line_lower for keyword in self.experience_keywords):
-                education_section = False
-            
-            # Extract education entries
-            if education_section or any(keyword in line_lower for keyword in self.education_keywords):
-                degree_match = re.search(r'(bachelor|master|phd|b\.?[as]|m\.?[as]|ph\.?d)', line_lower)
-                if degree_match:
-                    education_entry = {
-                        'degree': line,
-                        'institution': self._find_institution(lines, i),
-                        'year': self._extract_year(line)
-                    }
-                    education.append(education_entry)
+            education.append({
+                'degree': degree_line,
+                'institution': self._find_institution(entry_lines, degree_line),
+                'year': self._extract_year(' '.join(entry_lines))
+            })
         
         return education
     
-    def _extract_experience(self, text, lines):
-        """Extract work experience"""
-        experience = []
-        experience_section = False
+    def _extract_experience(self, document):
+        """Extract work experience, one entry per job in the experience section"""
+        lines = document.lines
+        spans = self._entry_spans(document, 'experience')
+        if spans is None:
+            # No experience heading: jobs found by title lines before any other section
+            spans = document.sections[0]['entries']
         
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            
-            # Check if we're entering experience section
-            if any(keyword in line_lower for keyword in self.experience_keywords):
-                experience_section = True
-                continue
-            
-            # Extract job titles and companies
-            if experience_section or self._is_job_title(line):
-                job_entry = {
-                    'title': line,
-                    'company': self._find_company(lines, i),
-                    'duration': self._extract_duration(line),
-                    'description': self._extract_job_description(lines, i)
-                }
-                experience.append(job_entry)
+        experience = []
+        for span in spans:
+            header = lines[span['start']:span['body']]
+            duration = next((found for found in map(self._extract_duration, header) if found), None)
+            experience.append({
+                'title': header[0],
+                'company': header[1] if len(header) > 1 else self._company_from_title(header[0], duration),
+                'duration': duration,
+                'description': ' '.join(lines[span['body']:span['end']])
+            })
         
         return experience
     
-    def _extract_skills(self, text):
+    def _entry_spans(self, document, name):
+        """Entries of every section called name, or None when the resume has no such section"""
+        sections = [section for section in document.sections if section['name'] == name]
+        if not sections:
+            return None
+        return [entry for section in sections for entry in section['entries']]
+    
+    def _extract_skills(self, document):
         """Extract skills using keyword matching and NLP"""
-        text_lower = text.lower()
-        found_skills = []
-        
-        # Technical skills from database
-        for skill in self.skills_database:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
+        # Technical skills from database, matched in a single pass
+        found_skills = self.skill_matcher.find_skills(document.text, document.lower)
         
         # Extract skills from skills section
-        skills_section = re.search(r'skills?\s*:?\s*(.*?)(?=\n\s*\n|\n[A-Z]|$)', text, re.IGNORECASE | re.DOTALL)
+        skills_section = PATTERNS.search('skills_section', document.text)
         if skills_section:
             skills_text = skills_section.group(1)
             # Split by common delimiters
-            skills_list = re.split(r'[,;•\n\t]+', skills_text)
+            skills_list = PATTERNS.split('skill_separators', skills_text)
             for skill in skills_list:
                 skill = skill.strip()
                 if skill and len(skill) < 50:  # Reasonable skill length
@@ -260,11 +342,11 @@ class ResumeParser:
         
         return list(set(found_skills))  # Remove duplicates
     
-    def _analyze_text_quality(self, text):
+    def _analyze_text_quality(self, document):
         """Analyze text quality using NLP"""
-        # Tokenize and analyze
-        sentences = sent_tokenize(text)
-        words = word_tokenize(text.lower())
+        # Reuse the document's sentences and tokens
+        sentences = document.sentence_spans
+        words = document.tokens
         
         # Remove stopwords
         filtered_words = [word for word in words if word.isalpha() and word not in self.stop_words]
@@ -279,9 +361,8 @@ class ResumeParser:
         }
         
         # POS tagging analysis
-        pos_tags = pos_tag(words)
         pos_counts = {}
-        for word, pos in pos_tags:
+        for word, pos in document.pos_tags:
             pos_counts[pos] = pos_counts.get(pos, 0) + 1
         
         analysis['pos_distribution'] = pos_counts
@@ -297,73 +378,45 @@ class ResumeParser:
             'automated_readability_index': textstat.automated_readability_index(text)
         }
     
-    def _extract_metrics(self, text):
+    def _extract_metrics(self, document):
         """Extract quantifiable metrics from resume"""
         metrics = []
         
-        # Look for numbers followed by units or descriptors
-        metric_patterns = [
-            r'\$?(\d+(?:,\d{3})*(?:\.\d+)?)\s*(million|billion|k|thousand|%|percent)',
-            r'(\d+(?:\.\d+)?)\s*(years?|months?|weeks?)',
-            r'(\d+)(?:\+|\s+or\s+more|\s+plus)?\s*(people|team|members|employees)',
-            r'improved?\s+by\s+(\d+(?:\.\d+)?)(%|percent|times|x)',
-            r'increased?\s+by\s+(\d+(?:\.\d+)?)(%|percent|times|x)',
-            r'reduced?\s+by\s+(\d+(?:\.\d+)?)(%|percent|times|x)'
-        ]
-        
-        for pattern in metric_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    metrics.append(' '.join(match))
-                else:
-                    metrics.append(match)
+        # Look for numbers followed by units or descriptors; one scan covers every kind
+        for match in PATTERNS.finditer('metrics', document.text):
+            kind = match.lastgroup
+            metrics.append(f"{match.group(kind + '_value')} {match.group(kind + '_unit')}")
         
         return metrics
     
-    def _find_institution(self, lines, index):
-        """Find institution name near education entry"""
-        # Look in nearby lines for institution
-        for i in range(max(0, index-2), min(len(lines), index+3)):
-            if any(keyword in lines[i].lower() for keyword in self.education_keywords):
-                return lines[i]
-        return None
+    def _find_institution(self, entry_lines, degree_line):
+        """Institution named in an education entry, preferring a line of its own over the degree line"""
+        named = [line for line in entry_lines if PATTERNS.search('institution', line)]
+        return next((line for line in named if line != degree_line), named[0] if named else None)
     
-    def _find_company(self, lines, index):
-        """Find company name near job entry"""
-        # Look in nearby lines for company
-        for i in range(max(0, index-1), min(len(lines), index+2)):
-            if i != index and lines[i].strip():
-                return lines[i]
+    def _company_from_title(self, title, duration):
+        """Company from a one-line job header such as 'Senior Engineer, Example Corp 2019 - 2021'"""
+        if duration:
+            title = title.replace(duration, '')
+        for separator in (' | ', ', ', ' at ', ' @ ', ' - '):
+            if separator in title:
+                company = title.split(separator, 1)[1].strip(' ,|-–')
+                return company or None
         return None
     
     def _extract_year(self, text):
         """Extract year from text"""
-        year_pattern = r'(19|20)\d{2}'
-        years = re.findall(year_pattern, text)
-        return years[-1] + years[-1][2:] if years else None
+        years = PATTERNS.findall('year', text)
+        return years[-1] if years else None
     
     def _extract_duration(self, text):
         """Extract duration from text"""
-        duration_pattern = r'(\d{4})\s*[-–]\s*(\d{4}|present|current)'
-        duration = re.search(duration_pattern, text, re.IGNORECASE)
+        duration = PATTERNS.search('duration', text)
         return duration.group(0) if duration else None
     
-    def _is_job_title(self, line):
-        """Determine if line is likely a job title"""
-        job_keywords = ['engineer', 'developer', 'manager', 'analyst', 'specialist', 'coordinator', 'director', 'lead', 'senior', 'junior']
-        return any(keyword in line.lower() for keyword in job_keywords)
-    
-    def _extract_job_description(self, lines, index):
-        """Extract job description following the job title"""
-        description = []
-        for i in range(index + 1, min(len(lines), index + 5)):
-            line = lines[i].strip()
-            if line and not self._is_job_title(line):
-                description.append(line)
-            else:
-                break
-        return ' '.join(description)
+    def skills_fingerprint(self):
+        """Short hash of the skills database, used to version cached analyses"""
+        return hashlib.sha256('\n'.join(sorted(self.skills_database)).encode()).hexdigest()[:16]
     
     def _load_skills_database(self):
         """Load comprehensive skills database"""
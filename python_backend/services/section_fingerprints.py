@@ -0,0 +1,50 @@
+import hashlib
+import json
+from services.text_document import TokenizedDocument
+
+# Parsed sections tracked for incremental re-analysis
+SECTIONS = ('personal_info', 'education', 'experience', 'skills', 'metrics')
+
+# Prefix of the raw-text span fingerprints, e.g. 'text:experience'
+TEXT_PREFIX = 'text:'
+
+def _fingerprint(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def section_fingerprints(parsed_data, document=None):
+    """Short hash of each parsed section and of each section's span of the raw text.
+
+    Hashing the raw text per section means an edit to one bullet only marks that
+    section's text as changed, rather than everything derived from the raw text.
+    """
+    fingerprints = {section: _fingerprint(parsed_data.get(section)) for section in SECTIONS}
+    # Skills come out of a set, so their order is not stable between runs
+    fingerprints['skills'] = _fingerprint(sorted(parsed_data.get('skills') or [], key=str))
+    document = document or TokenizedDocument(parsed_data.get('raw_text', ''))
+    for name, text in document.section_texts.items():
+        fingerprints[TEXT_PREFIX + name] = _fingerprint(text)
+    return fingerprints
+
+def same_resume(parsed_data, previous_parsed, min_similarity):
+    """Whether an upload is a revision of the previously parsed resume.
+
+    Emails decide when both resumes carry one, then names; without either, the share of
+    lines the two raw texts have in common (Jaccard) must reach min_similarity.
+    """
+    info = parsed_data.get('personal_info') or {}
+    previous_info = previous_parsed.get('personal_info') or {}
+    for key in ('email', 'name'):
+        value, previous_value = info.get(key), previous_info.get(key)
+        if value and previous_value:
+            return str(value).strip().lower() == str(previous_value).strip().lower()
+    lines = set(TokenizedDocument(parsed_data.get('raw_text', '')).lower_lines)
+    previous_lines = set(TokenizedDocument(previous_parsed.get('raw_text', '')).lower_lines)
+    if not lines or not previous_lines:
+        return False
+    return len(lines & previous_lines) / len(lines | previous_lines) >= min_similarity
+
+def changed_sections(fingerprints, previous_fingerprints):
+    """Sections whose fingerprint differs from (or is missing in) the previous analysis"""
+    previous_fingerprints = previous_fingerprints or {}
+    return [section for section, fingerprint in fingerprints.items()
+            if previous_fingerprints.get(section) != fingerprint]
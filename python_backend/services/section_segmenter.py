@@ -0,0 +1,101 @@
+from services.patterns import PATTERNS
+
+SECTION_NAMES = ('experience', 'education', 'skills', 'other')
+
+# Entry header lines (job title, company, dates) are short and never bullets
+MAX_HEADER_WORDS = 10
+MAX_SUBHEADER_WORDS = 6
+MAX_HEADER_LINES = 3
+BULLETS = ('•', '-', '*', '–', '·', '▪', '●', '○', '►')
+
+def _new_section(name, start):
+    return {'name': name, 'start': start, 'end': start, 'entries': []}
+
+def segment_lines(lines, lower_lines=None):
+    """Label the lines of a resume with their sections and entries in a single pass.
+
+    Returns sections {'name', 'start', 'end', 'entries'}, each covering lines[start:end].
+    Lines before the first heading form a 'preamble' section. Experience entries are
+    {'start', 'body', 'end'}: header lines (title, company, dates) run from start to body,
+    the description from body to end. Education entries are {'start', 'end'}, one per degree.
+    Preamble entries start at job-title lines, for resumes that have no headings.
+    """
+    lower_lines = lower_lines if lower_lines is not None else [line.lower() for line in lines]
+    sections = [_new_section('preamble', 0)]
+    state = {}
+
+    for index, (line, lower) in enumerate(zip(lines, lower_lines)):
+        heading = PATTERNS.search('section_heading', line)
+        if heading:
+            name = next(name for name in SECTION_NAMES if heading.group(name))
+            # "Skills: Python, SQL" is a heading with content; the line belongs to its section
+            start = index if (heading.group('inline') or '').strip() else index + 1
+            sections[-1]['end'] = index
+            sections.append(_new_section(name, start))
+            state = {}
+            if start > index:
+                continue
+
+        section = sections[-1]
+        section['end'] = index + 1
+        if section['name'] in ('experience', 'preamble'):
+            _add_job_line(section, state, index, line, lower)
+        elif section['name'] == 'education':
+            _add_education_line(section, state, index, lower)
+
+    return sections
+
+def section_texts(lines, sections):
+    """Text of each section name, heading lines included, so together they cover every line.
+
+    Every name in SECTION_NAMES (and 'preamble') is present, empty when the resume lacks it;
+    repeated sections of the same name are joined.
+    """
+    spans = {name: [] for name in ('preamble',) + SECTION_NAMES}
+    start = 0
+    for section in sections:
+        # A section runs from the previous section's end, which is its heading line
+        spans[section['name']].extend(lines[start:section['end']])
+        start = section['end']
+    return {name: '\n'.join(span_lines) for name, span_lines in spans.items()}
+
+def _add_job_line(section, state, index, line, lower):
+    """Start a new job entry at a header line, or extend the current one"""
+    short = not line.startswith(BULLETS) and len(line.split()) <= MAX_HEADER_WORDS
+    has_duration = short and PATTERNS.search('duration', line) is not None
+    header_like = short and (has_duration or PATTERNS.search('job_title', lower) is not None)
+    entries = section['entries']
+    entry = entries[-1] if entries else None
+
+    if entry is None:
+        # A preamble only holds jobs when a title line shows up; its first line is the name
+        if section['name'] == 'experience' or (header_like and index > 0):
+            entries.append({'start': index, 'body': index + 1, 'end': index + 1})
+            state.update(header_lines=1, has_duration=has_duration)
+        return
+
+    in_header = entry['body'] == index
+    if header_like and (not in_header or (has_duration and state['has_duration'])):
+        # A title after a description, or a second date range, opens the next job
+        entries.append({'start': index, 'body': index + 1, 'end': index + 1})
+        state.update(header_lines=1, has_duration=has_duration)
+        return
+
+    if in_header and state['header_lines'] < MAX_HEADER_LINES and short and \
+            (header_like or (len(line.split()) <= MAX_SUBHEADER_WORDS and not line.endswith('.'))):
+        # Company, location or dates on the lines right under the title
+        entry['body'] = index + 1
+        state['header_lines'] += 1
+        state['has_duration'] = state['has_duration'] or has_duration
+    entry['end'] = index + 1
+
+def _add_education_line(section, state, index, lower):
+    """Start a new education entry at a degree line, or extend the current one"""
+    is_degree = PATTERNS.search('degree', lower) is not None
+    entries = section['entries']
+    if not entries or (is_degree and state.get('has_degree')):
+        entries.append({'start': index, 'end': index + 1})
+        state['has_degree'] = is_degree
+    else:
+        entries[-1]['end'] = index + 1
+        state['has_degree'] = state.get('has_degree') or is_degree
@@ -0,0 +1,95 @@
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SkillMatcher:
+    """Aho-Corasick automaton that finds every known skill in a single pass over the text"""
+
+    def __init__(self, skills):
+        # Trie transitions, failure links and the skills ending at each node
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.skills = []
+
+        seen = set()
+        for skill in skills:
+            pattern = skill.strip().lower()
+            if pattern and pattern not in seen:
+                seen.add(pattern)
+                self._add_pattern(pattern, skill.strip())
+                self.skills.append(skill.strip())
+
+        self._build_failure_links()
+        logger.info(f"Skill matcher compiled with {len(self.skills)} patterns and {len(self._goto)} states")
+
+    def _add_pattern(self, pattern, skill):
+        """Insert a lower-cased pattern into the trie"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append((skill, len(pattern)))
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque()
+        for state in self._goto[0].values():
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text, text_lower=None):
+        """Return (start, end, skill) for every whole-word skill occurrence in text"""
+        matches = []
+        if not text:
+            return matches
+
+        text_lower = text_lower if text_lower is not None else text.lower()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+
+        for index, char in enumerate(text_lower):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for skill, length in output[state]:
+                start = index - length + 1
+                if self._is_whole_word(text_lower, start, index + 1):
+                    matches.append((start, index + 1, skill))
+
+        matches.sort()
+        return matches
+
+    def find_skills(self, text, text_lower=None):
+        """Return the distinct skills found in text, in order of first appearance"""
+        found = {}
+        for start, end, skill in self.find_all(text, text_lower):
+            found.setdefault(skill, start)
+        return list(found)
+
+    def _is_whole_word(self, text, start, end):
+        """Reject matches that run into neighbouring letters or digits, e.g. 'Go' in 'Google'"""
+        if start > 0 and text[start].isalnum() and text[start - 1].isalnum():
+            return False
+        if end < len(text) and text[end - 1].isalnum() and text[end].isalnum():
+            return False
+        return True
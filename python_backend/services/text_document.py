@@ -0,0 +1,90 @@
+from collections import Counter
+from functools import cached_property
+import logging
+import re
+import nltk
+from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+from nltk.tag import pos_tag
+from services.section_segmenter import segment_lines, section_texts
+
+logger = logging.getLogger(__name__)
+
+_word_tokenizer = NLTKWordTokenizer()
+_single_token = re.compile(r'\w+')
+
+class TokenizedDocument:
+    """Tokenized view of one resume, built once and shared by ResumeParser and MLAnalyzer.
+
+    Every view is computed on first use and cached, so consumers only pay for what they read.
+    """
+
+    def __init__(self, text):
+        self.text = text or ''
+
+    @cached_property
+    def lower(self):
+        return self.text.lower()
+
+    @cached_property
+    def lines(self):
+        """Non-empty, stripped lines"""
+        return [line.strip() for line in self.text.split('\n') if line.strip()]
+
+    @cached_property
+    def lower_lines(self):
+        return [line.lower() for line in self.lines]
+
+    @cached_property
+    def sections(self):
+        """Section spans over lines, with experience and education entries (see segment_lines)"""
+        return segment_lines(self.lines, self.lower_lines)
+
+    @cached_property
+    def section_texts(self):
+        """Text of each section name, heading lines included (see section_texts)"""
+        return section_texts(self.lines, self.sections)
+
+    @cached_property
+    def sentence_spans(self):
+        """(start, end) offsets of each sentence in text"""
+        try:
+            tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
+            return list(tokenizer.span_tokenize(self.text))
+        except Exception as e:
+            logger.warning(f"Sentence span tokenization failed: {str(e)}")
+            return [(0, len(self.text))] if self.text.strip() else []
+
+    @cached_property
+    def sentences(self):
+        return [self.text[start:end] for start, end in self.sentence_spans]
+
+    @cached_property
+    def tokens(self):
+        """Lower-cased word tokens, reusing the sentence spans instead of re-splitting"""
+        if len(self.lower) != len(self.text):
+            # Lower-casing changed offsets (rare unicode), so spans no longer line up
+            return word_tokenize(self.lower)
+        return [token for start, end in self.sentence_spans
+                for token in _word_tokenizer.tokenize(self.lower[start:end])]
+
+    @cached_property
+    def token_counts(self):
+        return Counter(self.tokens)
+
+    @cached_property
+    def pos_tags(self):
+        return pos_tag(self.tokens)
+
+    @cached_property
+    def whitespace_words(self):
+        """Word count by whitespace split, as used for density features"""
+        return len(self.text.split())
+
+    def count(self, phrase):
+        """Occurrences of a lower-case keyword: whole tokens for single words, substrings for phrases"""
+        if _single_token.fullmatch(phrase):
+            return self.token_counts.get(phrase, 0)
+        return self.lower.count(phrase)
+
+    def contains(self, phrase):
+        return self.count(phrase) > 0
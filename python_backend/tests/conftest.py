@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Tests import services the way app.py does, and the fake Gemini model from benchmarks/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+import pytest
+
+from fake_gemini import FakeGeminiModel
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.gemini_client import AsyncGeminiClient, TokenBucket
+
+class FlakyModel(FakeGeminiModel):
+    """Fails the first `failures` calls with a 429, then answers"""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(latency=0, jitter=0, **kwargs)
+        self.failures = failures
+
+    def _next_outcome(self):
+        self.calls += 1
+        return 0, self.calls <= self.failures
+
+class BlockedModel(FakeGeminiModel):
+    """Answers with a response whose text raises, like one blocked by safety filters"""
+
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, jitter=0, **kwargs)
+
+    def _response(self, prompt):
+        return BlockedResponse()
+
+class BlockedResponse:
+    @property
+    def text(self):
+        raise ValueError('The response was blocked')
+
+@pytest.fixture
+def make_client():
+    clients = []
+
+    def make(model, **kwargs):
+        kwargs.setdefault('requests_per_minute', 60000)
+        kwargs.setdefault('base_delay', 0.01)
+        kwargs.setdefault('max_delay', 0.05)
+        client = AsyncGeminiClient(model, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+def test_retries_rate_limited_calls_until_one_succeeds(make_client):
+    model = FlakyModel(failures=2)
+    client = make_client(model)
+
+    assert client.generate_sync('resume', max_retries=3) is not None
+    assert model.calls == 3
+    assert client.stats['rate_limited'] == 2
+    assert client.stats['retries'] == 2
+
+def test_gives_up_after_max_retries(make_client):
+    model = FakeGeminiModel(latency=0, jitter=0, rate_limit_ratio=1.0)
+    client = make_client(model)
+
+    assert client.generate_sync('resume', max_retries=3) is None
+    assert model.calls == 3
+    assert client.stats['errors'] == 3
+    assert client.stats['retries'] == 2
+
+def test_request_timeout_cancels_the_call(make_client):
+    model = FakeGeminiModel(latency=1.0, jitter=0)
+    client = make_client(model, request_timeout=0.05)
+
+    start = time.monotonic()
+    assert client.generate_sync('resume', max_retries=2) is None
+    assert time.monotonic() - start < 0.5
+    assert model.calls == 2
+    assert client.stats['errors'] == 2
+    assert model.in_flight == 0
+
+def test_concurrency_is_limited(make_client):
+    model = FakeGeminiModel(latency=0.05, jitter=0)
+    client = make_client(model, max_concurrency=3)
+
+    async def run_all():
+        return await asyncio.gather(*(client.generate(f'resume {i}') for i in range(12)))
+
+    results = asyncio.run(run_all())
+    assert all(result is not None for result in results)
+    assert model.peak_in_flight == 3
+
+def test_requests_are_paced_by_the_token_bucket(make_client):
+    model = FakeGeminiModel(latency=0, jitter=0)
+    # 10 requests per second with a burst of 2: six requests need at least 0.4s
+    client = make_client(model, requests_per_minute=600, max_concurrency=2)
+
+    async def run_all():
+        return await asyncio.gather(*(client.generate(f'resume {i}') for i in range(6)))
+
+    start = time.monotonic()
+    asyncio.run(run_all())
+    assert time.monotonic() - start >= 0.35
+    assert model.calls == 6
+
+def test_token_bucket_bursts_then_waits():
+    async def acquire(bucket, count):
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(acquire(TokenBucket(rate=20, capacity=5), 5)) < 0.05
+    assert asyncio.run(acquire(TokenBucket(rate=20, capacity=5), 7)) >= 0.09
+
+def test_drained_bucket_waits_for_a_refill():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=5)
+        bucket.drain()
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    # One token at 20 per second takes 50ms to refill
+    assert asyncio.run(run()) >= 0.04
+
+def test_open_circuit_refuses_without_spending_tokens(make_client):
+    breaker = CircuitBreaker('test', min_calls=1, open_seconds=60)
+    breaker.record_failure(0.1)
+    model = FakeGeminiModel(latency=0, jitter=0)
+    client = make_client(model, requests_per_minute=60, max_concurrency=1, breaker=breaker)
+
+    with pytest.raises(CircuitOpenError):
+        client.generate_sync('resume')
+    assert model.calls == 0
+    assert client._bucket.tokens == 1
+
+def test_unreadable_response_is_recorded_once_as_a_failure(make_client):
+    breaker = CircuitBreaker('test', min_calls=10, open_seconds=60)
+    client = make_client(BlockedModel(), breaker=breaker)
+
+    assert client.generate_sync('resume', max_retries=1) is None
+    stats = breaker.stats()
+    assert stats['calls'] == 1
+    assert stats['failures'] == 1